@@ -5,12 +5,18 @@ Main Flask application with all configurations
 """
 
 import os
+import click
 from flask import Flask, jsonify
 from config import get_config
 from extensions import db, init_extensions
 from sqlalchemy import text
 from routes import all_blueprints
 from models.waypoint import Waypoint
+from routing import (
+    get_routing_graph, graph_cache, route_table_cache, RouteTable, verify_route_table,
+    hierarchy_cache, verify_hierarchy, compile_all, write_snapshot, aggregate_route_log, route_log
+)
+from routing.table import configured_workers
 from flask_cors import CORS
 
 def create_app(config_name='development'):
@@ -39,6 +45,19 @@ def create_app(config_name='development'):
     for blueprint in all_blueprints:
         app.register_blueprint(blueprint)
 
+    # Load the graph before serving so its rebuild listener starts the opted-in
+    # background builds (requests never build them; 'table' and 'ch' fall back
+    # to A* meanwhile). The route table is awaited so forked workers inherit it;
+    # after a graph change the listener rebuilds it in the background.
+    if app.config.get('ROUTE_TABLE_WARM_ON_START') or app.config.get('CH_WARM_ON_START'):
+        with app.app_context():
+            try:
+                snapshot = graph_cache.get()
+                if app.config.get('ROUTE_TABLE_WARM_ON_START'):
+                    route_table_cache.get(snapshot)
+            except Exception as e:
+                print(f"Routing warm-up skipped: {str(e)}")
+
     # Root route
     @app.route('/')
     def index():
@@ -117,6 +136,74 @@ def init_db():
         print("✓ Database tables created successfully!")
 
 
+@app.cli.command()
+@click.option('--pairs', default=500, help='Number of random building pairs')
+@click.option('--seed', default=0, help='Random seed for pair selection')
+def verify_table(pairs, seed):
+    """Time a route table build and check its lookups against plain Dijkstra
+
+    The table built here is discarded; servers build their own at startup
+    when ROUTE_TABLE_WARM_ON_START is set, so use this to size that
+    warm-up before turning it on.
+    """
+    with app.app_context():
+        table = RouteTable.build(get_routing_graph(), workers=configured_workers())
+        stats = table.to_dict()
+        print(f"✓ Route table for graph version {stats['version']}: "
+              f"{stats['buildings']} buildings, {stats['memory_bytes'] / 1024:.1f} KiB, "
+              f"built in {stats['build_ms']} ms using {stats['workers']} worker(s)")
+
+        result = verify_route_table(table, pairs=pairs, seed=seed)
+        if result['mismatches']:
+            for mismatch in result['mismatches'][:10]:
+                print(f"✗ {mismatch}")
+            raise SystemExit(f"✗ {len(result['mismatches'])} of {pairs} pairs differ from Dijkstra")
+        print(f"✓ All {pairs} pairs match Dijkstra")
+
+
+@app.cli.command()
+@click.option('--output', default=None, help='Snapshot file (defaults to ROUTING_SNAPSHOT_PATH)')
+def build_graph_snapshot(output):
+    """Compile the routing graph and its profile variants into a binary snapshot"""
+    with app.app_context():
+        output = output or app.config['ROUTING_SNAPSHOT_PATH']
+        # Path overrides are temporary and stay out of the snapshot
+        graphs = compile_all(graph_cache.get())
+        size = write_snapshot(output, graphs)
+        print(f"✓ Graph snapshot for graph version {graphs[0].version}: "
+              f"{graphs[0].node_count} nodes, {len(graphs)} profile/metric variants, "
+              f"{size / 1024:.1f} KiB written to {output}")
+
+
+@app.cli.command()
+@click.option('--pairs', default=500, help='Number of random origin/destination pairs')
+@click.option('--seed', default=0, help='Random seed for pair selection')
+def verify_ch(pairs, seed):
+    """Check contraction hierarchy routes against plain Dijkstra"""
+    with app.app_context():
+        hierarchy = hierarchy_cache.get(get_routing_graph())
+        stats = hierarchy.to_dict()
+        print(f"✓ Contraction hierarchy for graph version {stats['version']}: "
+              f"{stats['nodes']} nodes, {stats['shortcuts']} shortcuts, built in {stats['build_ms']} ms")
+
+        result = verify_hierarchy(hierarchy, pairs=pairs, seed=seed)
+        if result['mismatches']:
+            for mismatch in result['mismatches'][:10]:
+                print(f"✗ {mismatch}")
+            raise SystemExit(f"✗ {len(result['mismatches'])} of {pairs} pairs differ from Dijkstra")
+        print(f"✓ All {pairs} pairs match Dijkstra")
+
+
+@app.cli.command()
+def aggregate_route_requests():
+    """Fold the route request log into origin/destination popularity"""
+    with app.app_context():
+        route_log.flush()
+        result = aggregate_route_log()
+        db.session.commit()
+        print(f"✓ Aggregated {result['requests']} route requests into {result['pairs']} pairs")
+
+
 @app.cli.command()
 def drop_db():
     """Drop all database tables"""
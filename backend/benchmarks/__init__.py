@@ -0,0 +1,5 @@
+"""
+Routing Benchmarks
+Offline performance checks for the navigation engine
+Run from backend/: python -m benchmarks.<module>
+"""
@@ -0,0 +1,109 @@
+"""
+Dijkstra Benchmark - path-copy search vs the routing engine algorithms
+Location: backend/benchmarks/bench_dijkstra.py
+
+Usage (from backend/):
+    python -m benchmarks.bench_dijkstra [--sizes 20 50 100] [--repeat 5]
+"""
+
+import argparse
+import heapq
+import random
+import time
+from routing.graph import RoutingGraph
+from routing.search import ALGORITHMS, find_path
+
+
+def build_mesh(size, seed=42):
+    """
+    Dense size x size waypoint mesh with 8-neighbour walkways in both
+    directions and one building attached to each opposite corner
+    """
+    rng = random.Random(seed)
+    base_lat, base_lng = 12.9630, 77.5050
+    step = 0.00005  # roughly 5.5 m
+
+    waypoints = []
+    for row in range(size):
+        for col in range(size):
+            waypoint_id = row * size + col + 1
+            waypoints.append((waypoint_id, f"Node {row}-{col}", f"WP{waypoint_id}",
+                              base_lat + row * step, base_lng + col * step))
+
+    paths = []
+    for row in range(size):
+        for col in range(size):
+            here = row * size + col + 1
+            for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                r, c = row + d_row, col + d_col
+                if 0 <= r < size and 0 <= c < size:
+                    there = r * size + c + 1
+                    distance = (7.8 if d_row and d_col else 5.5) * rng.uniform(1.0, 1.3)
+                    paths.append((None, here, None, there, distance))
+                    paths.append((None, there, None, here, distance))
+
+    last = size * size
+    buildings = [(1, 'Start Block', 'START', base_lat, base_lng),
+                 (2, 'End Block', 'END', base_lat + size * step, base_lng + size * step)]
+    paths += [(1, None, None, 1, 3.0), (None, 1, 1, None, 3.0),
+              (2, None, None, last, 3.0), (None, last, 2, None, 3.0)]
+
+    return RoutingGraph.from_rows(0, buildings, waypoints, paths)
+
+
+def path_copy_dijkstra(graph, start_node, end_node):
+    """Previous WaypointRouter.dijkstra: copies the path on every heap push"""
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    pq = [(0, start_node, [start_node])]
+    visited = set()
+
+    while pq:
+        current_dist, current_node, path = heapq.heappop(pq)
+        if current_node in visited:
+            continue
+        visited.add(current_node)
+        if current_node == end_node:
+            return path, current_dist
+        for edge in range(offsets[current_node], offsets[current_node + 1]):
+            neighbor = targets[edge]
+            if neighbor not in visited:
+                heapq.heappush(pq, (current_dist + weights[edge], neighbor, path + [neighbor]))
+
+    return None, float('inf')
+
+
+def time_call(func, repeat):
+    """Best-of-N wall time in milliseconds plus the last result"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[20, 50, 100])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        graph = build_mesh(size)
+        start, end = graph.building_node(1), graph.building_node(2)
+        old_ms, (old_path, old_dist) = time_call(lambda: path_copy_dijkstra(graph, start, end), args.repeat)
+
+        print(f"\nmesh {size}x{size}: {graph.node_count} nodes, {graph.edge_count} edges, "
+              f"{len(old_path)} hops")
+        print(f"  {'algorithm':<22} {'ms':>9} {'settled':>8} {'speedup':>8}")
+        print(f"  {'path-copy (previous)':<22} {old_ms:>9.2f} {'-':>8} {'1.0x':>8}")
+        for algorithm in ALGORITHMS:
+            new_ms, (_, new_dist, settled) = time_call(
+                lambda: find_path(graph, start, end, algorithm), args.repeat)
+            assert abs(old_dist - new_dist) < 1e-6, (algorithm, old_dist, new_dist)
+            print(f"  {algorithm:<22} {new_ms:>9.2f} {settled:>8} {old_ms / new_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+"""
+Routing Benchmark Suite - synthetic campuses from 100 to 1M nodes
+Location: backend/benchmarks/bench_routing.py
+
+Times graph build, WaypointRouter.dijkstra, every registered engine in
+routing.search.ALGORITHMS (with its preprocessing) and, on a SQLite
+database, the utils.algorithms.dijkstra_shortest_path entry point
+(version check and graph cache lookup included). Reports p50/p99 latency over
+random building pairs and the peak Python memory of each stage. Runs
+fully offline: graphs are built in memory or in a scratch SQLite file.
+
+Usage (from backend/):
+    python -m benchmarks.bench_routing [--sizes 100 1000 10000 100000 1000000]
+        [--queries 200] [--backend memory|sqlite] [--schema campus|buildings]
+        [--engines dijkstra astar ...] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+from benchmarks.synthetic import generate_campus, load_into_database, od_pairs
+from routing.cache import graph_cache
+from routing.ch import hierarchy_cache
+from routing.graph import RoutingGraph
+from routing.search import ALGORITHMS, INF, find_path
+from routing.table import route_table_cache
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+
+# Engines that need a derived structure built first: name -> its DerivedCache
+PREPROCESSED = {'table': route_table_cache, 'ch': hierarchy_cache}
+
+# Stop an engine after this much query time and report the queries run so far
+TIME_BUDGET_SECONDS = 30.0
+
+# Queries run again under tracemalloc to measure peak memory
+MEMORY_SAMPLE = 5
+
+
+def percentile(samples, q):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def mismatches(distances, reference):
+    """Queries whose distance differs from the first engine's answer"""
+    return sum(1 for a, b in zip(distances, reference or [])
+               if a != b and abs(a - b) > 1e-6 * max(1.0, abs(b)))
+
+
+def measure_peak(func):
+    """Run func under tracemalloc; returns (result, peak bytes allocated)"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def timed(func):
+    """Wall time of one call in milliseconds plus its result (run outside tracemalloc)"""
+    started = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - started) * 1000, result
+
+
+class ScratchDatabase:
+    """Flask app bound to a throwaway SQLite file holding one campus"""
+
+    def __init__(self, campus):
+        from flask import Flask
+        from extensions import db
+        import models  # noqa: F401 - registers every table for create_all
+
+        self.directory = tempfile.TemporaryDirectory(prefix='campxplore-bench-')
+        self.app = Flask(__name__)
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(self.directory.name, 'bench.db')}"
+        self.app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        db.init_app(self.app)
+        self.db = db
+
+        with self.app.app_context():
+            db.create_all()
+            load_into_database(campus, db.session)
+
+    def close(self):
+        with self.app.app_context():
+            self.db.session.remove()
+            self.db.engine.dispose()
+        self.directory.cleanup()
+
+
+def run_engine(name, query, pairs, budget):
+    """
+    Time query(start, end) over the pairs
+
+    Returns:
+        dict: Latency percentiles, query count and the distances found
+    """
+    samples = []
+    distances = []
+    spent = 0.0
+    for start, end in pairs:
+        elapsed, distance = timed(lambda: query(start, end))
+        samples.append(elapsed)
+        distances.append(distance)
+        spent += elapsed / 1000
+        if spent >= budget:
+            break
+
+    sample_pairs = pairs[:MEMORY_SAMPLE]
+    _, peak = measure_peak(lambda: [query(start, end) for start, end in sample_pairs])
+
+    return {
+        'engine': name,
+        'queries': len(samples),
+        'p50_ms': percentile(samples, 50),
+        'p99_ms': percentile(samples, 99),
+        'mean_ms': sum(samples) / len(samples) if samples else None,
+        'peak_kib': peak / 1024,
+        'distances': distances
+    }
+
+
+def bench_size(size, args):
+    """Generate one campus and run every selected stage on it"""
+    campus = generate_campus(size, seed=args.seed, schema=args.schema)
+    pairs = od_pairs(campus, args.queries, seed=args.seed + 1)
+    results = {'size': size, 'nodes': campus.node_count, 'edges': campus.edge_count, 'stages': []}
+    stages = results['stages']
+
+    database = None
+    try:
+        if args.backend == 'sqlite':
+            load_ms, database = timed(lambda: ScratchDatabase(campus))
+            stages.append({'engine': 'sqlite load', 'build_ms': load_ms})
+            with database.app.app_context():
+                build_ms, graph = timed(lambda: RoutingGraph.from_database(0))
+                _, peak = measure_peak(lambda: RoutingGraph.from_database(0))
+        else:
+            build_ms, graph = timed(lambda: campus.graph())
+            _, peak = measure_peak(lambda: campus.graph())
+        stages.append({'engine': 'graph build', 'build_ms': build_ms, 'peak_kib': peak / 1024})
+
+        node = graph.building_node
+        node_pairs = [(node(start), node(end)) for start, end in pairs]
+
+        from routes.navigation import WaypointRouter
+        router = WaypointRouter()
+        router.graph = graph
+
+        engines = [('WaypointRouter.dijkstra', lambda start, end: router.dijkstra(start, end)[1])]
+        for algorithm in ALGORITHMS:
+            engines.append((algorithm, lambda start, end, algorithm=algorithm:
+                            find_path(graph, start, end, algorithm)[1]))
+        if args.engines:
+            engines = [(name, query) for name, query in engines if name in args.engines]
+
+        reference = None
+        for name, query in engines:
+            if name in PREPROCESSED:
+                if graph.node_count > args.prep_max_nodes:
+                    stages.append({'engine': name, 'skipped': f'more than {args.prep_max_nodes} nodes'})
+                    continue
+                # Untraced: a second build just for its memory peak would double the slowest stage
+                prep_ms, _ = timed(lambda: PREPROCESSED[name].get(graph))
+                stages.append({'engine': f'{name} build', 'build_ms': prep_ms})
+
+            stage = run_engine(name, query, node_pairs, args.budget)
+            if reference is None:
+                reference = stage['distances']
+            stage['mismatches'] = mismatches(stage['distances'], reference)
+            stages.append(stage)
+
+        if not args.engines or 'legacy' in args.engines:
+            if args.backend != 'sqlite':
+                stages.append({'engine': 'legacy', 'skipped': 'needs --backend sqlite'})
+            elif graph.node_count > args.legacy_max_nodes:
+                stages.append({'engine': 'legacy', 'skipped': f'more than {args.legacy_max_nodes} nodes'})
+            else:
+                from utils.algorithms import dijkstra_shortest_path
+
+                def legacy(start, end):
+                    _, distance = dijkstra_shortest_path(start, end)
+                    return INF if distance is None else distance
+
+                # Every scratch database is at graph version 0, so drop the previous size's graph
+                graph_cache.invalidate()
+                with database.app.app_context():
+                    stage = run_engine('legacy', legacy, pairs, args.budget)
+                stage['mismatches'] = mismatches(stage['distances'], reference)
+                stages.append(stage)
+    finally:
+        if database is not None:
+            database.close()
+
+    return results
+
+
+def print_results(results):
+    print(f"\n{results['size']} nodes requested: {results['nodes']} nodes, {results['edges']} edges")
+    print(f"  {'stage':<24} {'build ms':>10} {'p50 ms':>9} {'p99 ms':>9} {'queries':>8} "
+          f"{'peak KiB':>10} {'wrong':>6}")
+    for stage in results['stages']:
+        if 'skipped' in stage:
+            print(f"  {stage['engine']:<24} skipped ({stage['skipped']})")
+            continue
+
+        def cell(key, width, fmt='.2f'):
+            value = stage.get(key)
+            return f"{value:>{width}{fmt}}" if value is not None else f"{'-':>{width}}"
+
+        print(f"  {stage['engine']:<24} {cell('build_ms', 10)} {cell('p50_ms', 9, '.3f')} "
+              f"{cell('p99_ms', 9, '.3f')} {cell('queries', 8, 'd')} {cell('peak_kib', 10, '.0f')} "
+              f"{cell('mismatches', 6, 'd')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='approximate node counts (up to 1000000)')
+    parser.add_argument('--queries', type=int, default=200, help='random building pairs per size')
+    parser.add_argument('--backend', choices=('memory', 'sqlite'), default='memory')
+    parser.add_argument('--schema', choices=('campus', 'buildings'), default='campus')
+    parser.add_argument('--engines', nargs='+', help='only run these stages (engine names or legacy)')
+    parser.add_argument('--budget', type=float, default=TIME_BUDGET_SECONDS,
+                        help='query seconds per engine and size')
+    parser.add_argument('--prep-max-nodes', type=int, default=5000,
+                        help='largest graph to build the route table / hierarchy for')
+    parser.add_argument('--legacy-max-nodes', type=int, default=5000,
+                        help='largest graph to run the legacy search on')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    all_results = []
+    for size in args.sizes:
+        results = bench_size(size, args)
+        print_results(results)
+        for stage in results['stages']:
+            stage.pop('distances', None)
+        all_results.append(results)
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"\nprocess max RSS: {max_rss / 1024:.0f} MiB")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'max_rss_kib': max_rss, 'results': all_results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
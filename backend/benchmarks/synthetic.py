@@ -0,0 +1,191 @@
+"""
+Synthetic Campus Graphs - generator for routing benchmarks
+Location: backend/benchmarks/synthetic.py
+
+Grid-like footpath networks with clustered buildings, sized from a
+hundred to a million nodes, as plain row tuples (see
+RoutingGraph.from_rows) or loaded into a SQLite database.
+"""
+
+import math
+import random
+from dataclasses import dataclass, field
+
+BASE_LAT, BASE_LNG = 12.9630, 77.5050
+STEP = 0.0001  # roughly 11 m between grid junctions
+
+# Share of grid nodes that are buildings, and buildings per cluster
+BUILDING_SHARE = 0.05
+CLUSTER_SIZE = 8
+
+# Off-spine footpaths dropped to break up the perfect grid
+DROP_RATE = 0.15
+
+# Path type mix: (type, share, accessible)
+PATH_MIX = (('walkway', 0.80, True), ('road', 0.12, True), ('stairs', 0.08, False))
+
+
+@dataclass
+class SyntheticCampus:
+    """Rows of one generated campus"""
+    buildings: list = field(default_factory=list)  # (building_id, name, code, lat, lng)
+    waypoints: list = field(default_factory=list)  # (waypoint_id, name, code, lat, lng)
+    paths: list = field(default_factory=list)  # from_rows path tuples with path_id/type/accessibility
+    schema: str = 'campus'
+
+    @property
+    def node_count(self):
+        return len(self.buildings) + len(self.waypoints)
+
+    @property
+    def edge_count(self):
+        return len(self.paths)
+
+    def graph(self, version=0):
+        """In-memory RoutingGraph built from the rows"""
+        from routing.graph import RoutingGraph
+        return RoutingGraph.from_rows(version, self.buildings, self.waypoints, self.paths)
+
+
+def _path_type(rng):
+    roll = rng.random()
+    for path_type, share, accessible in PATH_MIX:
+        if roll < share:
+            return path_type, accessible
+        roll -= share
+    return PATH_MIX[0][0], PATH_MIX[0][2]
+
+
+def generate_campus(node_count, seed=42, schema='campus'):
+    """
+    Generate a campus with roughly node_count nodes
+
+    The footpath grid keeps every north-south path and every fifth
+    east-west row (so the network stays connected) and drops DROP_RATE of
+    the other east-west paths. Path lengths are the jittered junction
+    distance. With schema 'campus' the junctions are waypoints and
+    buildings sit in clusters, each linked to its nearest junction by an
+    entrance path in both directions. With schema 'buildings' every
+    junction is itself a building (the pre-waypoint layout).
+
+    Args:
+        node_count (int): Approximate total node count (at least 4)
+        seed (int): Random seed; the same arguments give the same campus
+        schema (str): 'campus' or 'buildings'
+
+    Returns:
+        SyntheticCampus: Generated rows
+    """
+    if schema not in ('campus', 'buildings'):
+        raise ValueError("schema must be 'campus' or 'buildings'")
+
+    rng = random.Random(seed)
+    building_count = 0 if schema == 'buildings' else max(2, int(node_count * BUILDING_SHARE))
+    side = max(2, math.isqrt(max(4, node_count - building_count)))
+    campus = SyntheticCampus(schema=schema)
+
+    junction_rows = campus.buildings if schema == 'buildings' else campus.waypoints
+    coords = []
+    for row in range(side):
+        for col in range(side):
+            node_id = row * side + col + 1
+            lat = BASE_LAT + (row + rng.uniform(-0.2, 0.2)) * STEP
+            lng = BASE_LNG + (col + rng.uniform(-0.2, 0.2)) * STEP
+            junction_rows.append((node_id, f"Junction {row}-{col}", f"J{node_id}", lat, lng))
+            coords.append((lat, lng))
+
+    def endpoints(node_id):
+        return (node_id, None) if schema == 'buildings' else (None, node_id)
+
+    def link(a, b, distance, path_type, accessible):
+        src_building, src_waypoint = a
+        dst_building, dst_waypoint = b
+        for source, dest in (((src_building, src_waypoint), (dst_building, dst_waypoint)),
+                             ((dst_building, dst_waypoint), (src_building, src_waypoint))):
+            campus.paths.append((source[0], source[1], dest[0], dest[1], round(distance, 2),
+                                 len(campus.paths) + 1, path_type, accessible))
+
+    meters_per_step = STEP * 111_320
+    for row in range(side):
+        for col in range(side):
+            here = row * side + col
+            for d_row, d_col in ((1, 0), (0, 1)):
+                r, c = row + d_row, col + d_col
+                if r >= side or c >= side:
+                    continue
+                if d_col and row % 5 and rng.random() < DROP_RATE:
+                    continue
+                there = r * side + c
+                (lat_a, lng_a), (lat_b, lng_b) = coords[here], coords[there]
+                distance = math.hypot(lat_a - lat_b, (lng_a - lng_b) * math.cos(math.radians(lat_a))) * 111_320
+                path_type, accessible = _path_type(rng)
+                link(endpoints(here + 1), endpoints(there + 1),
+                     max(distance, 0.1 * meters_per_step), path_type, accessible)
+
+    clusters = max(1, building_count // CLUSTER_SIZE)
+    centres = [(rng.uniform(0, side - 1), rng.uniform(0, side - 1)) for _ in range(clusters)]
+    for index in range(building_count):
+        centre_row, centre_col = centres[index % clusters]
+        row = min(side - 1, max(0.0, rng.gauss(centre_row, 1.5)))
+        col = min(side - 1, max(0.0, rng.gauss(centre_col, 1.5)))
+        building_id = index + 1
+        lat, lng = BASE_LAT + row * STEP, BASE_LNG + col * STEP
+        campus.buildings.append((building_id, f"Building {building_id}", f"B{building_id}", lat, lng))
+
+        nearest = round(row) * side + round(col)
+        distance = math.hypot(row - round(row), col - round(col)) * meters_per_step
+        link((building_id, None), endpoints(nearest + 1), distance + 2.0, 'walkway', True)
+
+    return campus
+
+
+def od_pairs(campus, count, seed=7):
+    """
+    Random origin/destination building pairs (origin != destination)
+
+    Returns:
+        list: (start_building_id, end_building_id) tuples
+    """
+    rng = random.Random(seed)
+    building_ids = [row[0] for row in campus.buildings]
+    pairs = []
+    while len(pairs) < count:
+        start, end = rng.sample(building_ids, 2)
+        pairs.append((start, end))
+    return pairs
+
+
+def load_into_database(campus, session, batch_size=20000):
+    """
+    Insert the campus into the buildings/waypoints/paths tables
+
+    Meant for a scratch SQLite database created by the benchmark suite;
+    rows are bulk inserted in batches without touching the ORM identity
+    map.
+    """
+    from sqlalchemy import insert
+    from models.building import Building
+    from models.waypoint import Waypoint
+    from models.path import Path
+
+    def batches(table, rows):
+        for start in range(0, len(rows), batch_size):
+            session.execute(insert(table), rows[start:start + batch_size])
+
+    batches(Building.__table__, [
+        {'building_id': building_id, 'name': name, 'code': code, 'latitude': lat, 'longitude': lng}
+        for building_id, name, code, lat, lng in campus.buildings
+    ])
+    batches(Waypoint.__table__, [
+        {'waypoint_id': waypoint_id, 'name': name, 'code': code, 'latitude': lat,
+         'longitude': lng, 'waypoint_type': 'intersection'}
+        for waypoint_id, name, code, lat, lng in campus.waypoints
+    ])
+    batches(Path.__table__, [
+        {'source_building_id': src_building, 'source_waypoint_id': src_waypoint,
+         'destination_building_id': dst_building, 'destination_waypoint_id': dst_waypoint,
+         'distance': distance, 'path_id': path_id, 'path_type': path_type, 'accessibility': accessible}
+        for src_building, src_waypoint, dst_building, dst_waypoint, distance, path_id, path_type, accessible
+        in campus.paths
+    ])
+    session.commit()
@@ -8,5 +8,9 @@ from .building import Building
 from .path import Path
 from .complaint import Complaint
 from .feedback import Feedback
+from .graph_version import GraphVersion
+from .path_override import PathOverride
+from .route_request import RouteRequest, RoutePopularity
 
-__all__ = ['User', 'Building', 'Path', 'Complaint', 'Feedback']
\ No newline at end of file
+__all__ = ['User', 'Building', 'Path', 'Complaint', 'Feedback', 'GraphVersion', 'PathOverride',
+           'RouteRequest', 'RoutePopularity']
\ No newline at end of file
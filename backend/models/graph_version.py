@@ -0,0 +1,28 @@
+"""
+Graph Version Model
+Counters bumped whenever buildings, waypoints or paths (row 1) or path
+overrides (row 2) change
+"""
+
+from datetime import datetime
+from extensions import db
+
+
+class GraphVersion(db.Model):
+    """Version of the routing graph (or of its path overlay) shared by all workers"""
+
+    __tablename__ = 'graph_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert graph version object to dictionary"""
+        return {
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<GraphVersion {self.version}>'
@@ -0,0 +1,44 @@
+"""
+Path Override Model
+Temporary closures and re-weights of individual paths
+"""
+
+from datetime import datetime
+from extensions import db
+
+
+class PathOverride(db.Model):
+    """
+    Closure or cost factor laid over one path without editing the path row
+
+    Changes are applied through routing.overlay.apply_path_edits, which
+    bumps the overlay version so every worker patches its cached graph.
+    """
+
+    __tablename__ = 'path_overrides'
+
+    override_id = db.Column(db.Integer, primary_key=True)
+    path_id = db.Column(db.Integer, db.ForeignKey('paths.path_id', ondelete='CASCADE'),
+                        unique=True, nullable=False)
+    closed = db.Column(db.Boolean, nullable=False, default=False)
+    weight_factor = db.Column(db.Float, nullable=False, default=1.0)  # routing cost multiplier (>= 1)
+    reason = db.Column(db.String(200))
+    expires_at = db.Column(db.DateTime, nullable=True)  # UTC; null = until reopened
+    created_by = db.Column(db.Integer, db.ForeignKey('users.user_id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert path override object to dictionary"""
+        return {
+            'path_id': self.path_id,
+            'closed': self.closed,
+            'weight_factor': self.weight_factor,
+            'reason': self.reason,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'created_by': self.created_by,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def __repr__(self):
+        return f'<PathOverride path {self.path_id} closed={self.closed} x{self.weight_factor}>'
@@ -0,0 +1,68 @@
+"""
+Route Request Models
+Raw log of route lookups and the origin/destination popularity folded from it
+"""
+
+from datetime import datetime
+from extensions import db
+
+
+class RouteRequest(db.Model):
+    """
+    One served route lookup
+
+    Rows are written in batches by routing.request_log.RouteLog and
+    consumed by aggregate_route_log, which folds them into RoutePopularity.
+    """
+
+    __tablename__ = 'route_requests'
+
+    request_id = db.Column(db.Integer, primary_key=True)
+    requested_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    start_building_id = db.Column(db.Integer, nullable=True)  # null for GPS starts
+    end_building_id = db.Column(db.Integer, nullable=False)
+    profile = db.Column(db.String(20), nullable=False)
+    metric = db.Column(db.String(20), nullable=False)
+    algorithm = db.Column(db.String(30), nullable=False)
+    latency_ms = db.Column(db.Float, nullable=False)
+    cache_hit = db.Column(db.Boolean, nullable=False, default=False)
+
+    def __repr__(self):
+        return f'<RouteRequest {self.start_building_id} -> {self.end_building_id} {self.latency_ms:.1f} ms>'
+
+
+class RoutePopularity(db.Model):
+    """Request totals of one origin/destination pair per profile and cost metric"""
+
+    __tablename__ = 'route_popularity'
+    __table_args__ = (
+        db.UniqueConstraint('start_building_id', 'end_building_id', 'profile', 'metric',
+                            name='uq_route_popularity_pair'),
+    )
+
+    popularity_id = db.Column(db.Integer, primary_key=True)
+    start_building_id = db.Column(db.Integer, nullable=False)
+    end_building_id = db.Column(db.Integer, nullable=False)
+    profile = db.Column(db.String(20), nullable=False)
+    metric = db.Column(db.String(20), nullable=False)
+    requests = db.Column(db.Integer, nullable=False, default=0)
+    cache_hits = db.Column(db.Integer, nullable=False, default=0)
+    avg_latency_ms = db.Column(db.Float, nullable=False, default=0.0)
+    last_requested_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert popularity row to dictionary"""
+        return {
+            'start_building_id': self.start_building_id,
+            'end_building_id': self.end_building_id,
+            'profile': self.profile,
+            'metric': self.metric,
+            'requests': self.requests,
+            'cache_hit_rate': round(self.cache_hits / self.requests, 3) if self.requests else 0.0,
+            'avg_latency_ms': round(self.avg_latency_ms, 2),
+            'last_requested_at': self.last_requested_at.isoformat() if self.last_requested_at else None
+        }
+
+    def __repr__(self):
+        return f'<RoutePopularity {self.start_building_id} -> {self.end_building_id} x{self.requests}>'
@@ -13,6 +13,7 @@ from extensions import db
 from models.building import Building
 from models.waypoint import Waypoint
 from models.path import Path
+from routing import bump_graph_version
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     """
@@ -70,6 +71,7 @@ def load_waypoints_from_csv(csv_file='dr_ait_campus_waypoints.csv'):
                 waypoints_data.append(waypoint)
 
         db.session.bulk_save_objects(waypoints_data)
+        bump_graph_version()
         db.session.commit()
         print(f"✓ Loaded {len(waypoints_data)} waypoints from CSV")
 
@@ -209,6 +211,7 @@ def generate_realistic_paths():
         # Insert all paths into database
         print("\nInserting paths into database...")
         db.session.bulk_save_objects(paths)
+        bump_graph_version()
         db.session.commit()
 
         print(f"\n✓ Total paths created: {len(paths)}")
@@ -3,12 +3,14 @@ Analytics Routes - Fixed for Session-Based Authentication
 Location: backend/routes/analytics.py
 """
 
-from flask import Blueprint, jsonify, session
+from flask import Blueprint, jsonify, session, request, current_app
 from extensions import db
 from models.user import User
 from models.complaint import Complaint
 from models.feedback import Feedback
 from models.building import Building
+from models.route_request import RoutePopularity
+from routing.request_log import edge_usage, popular_pairs, route_log
 from sqlalchemy import func
 
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
@@ -195,4 +197,47 @@ def get_feedback_analytics():
 
     except Exception as e:
         print(f"Error in feedback analytics: {str(e)}")
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/routes', methods=['GET'])
+@login_required
+def get_route_analytics():
+    """
+    Route popularity for the admin dashboard
+    Query params: limit (most requested pairs, default 50)
+    Popularity comes from the aggregated route request log (flask
+    aggregate-route-requests); the path heatmap routes the most popular
+    pairs on the current graph and weights each path by their requests.
+    """
+    try:
+        user_id = session.get('user_id')
+        user = User.query.get(user_id)
+
+        if not user or user.role != 'admin':
+            return jsonify({'error': 'Admin access required'}), 403
+
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 1000)
+        heatmap_count = current_app.config.get('ROUTE_HEATMAP_PAIRS', 200)
+        pairs = popular_pairs(max(limit, heatmap_count))
+
+        totals = db.session.query(
+            func.sum(RoutePopularity.requests),
+            func.sum(RoutePopularity.cache_hits),
+            func.count(RoutePopularity.popularity_id)
+        ).one()
+        total_requests, cache_hits, pair_count = totals
+
+        route_data = {
+            'total_requests': int(total_requests or 0),
+            'cache_hit_rate': round(cache_hits / total_requests, 3) if total_requests else 0.0,
+            'distinct_pairs': pair_count,
+            'popular_pairs': [pair.to_dict() for pair in pairs[:limit]],
+            'path_usage': edge_usage(pairs[:heatmap_count]),
+            'log': route_log.to_dict()
+        }
+
+        return jsonify(route_data), 200
+
+    except Exception as e:
+        print(f"Error in route analytics: {str(e)}")
+        return jsonify({'error': str(e)}), 500
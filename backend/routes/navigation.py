@@ -3,19 +3,82 @@ PHASE 2: Enhanced Navigation API with Waypoints
 Location: backend/routes/navigation.py
 """
 
-from flask import Blueprint, request, jsonify, session
+import hashlib
+import json
+import threading
+from datetime import datetime
+from functools import wraps
+from flask import Blueprint, request, jsonify, session, current_app, make_response, has_app_context
 from extensions import db
-from models.building import Building
 from models.waypoint import Waypoint
-from models.path import Path
-import heapq
+from models.path_override import PathOverride
+from routing import (
+    get_routing_graph, graph_cache, route_table_cache, hierarchy_cache, spatial_index_cache,
+    facility_index_cache, evacuation_cache, profile_graphs_cache, nearest_targets,
+    get_profile_graph, alternative_routes, plan_tour, PROFILES, DEFAULT_PROFILE, METRICS, DEFAULT_METRIC,
+    WALKING_SPEED, LRUCache, RoutingEngine, apply_path_edits, base_graph
+)
+from routing.geo import encode_polyline, simplify_polyline
+from routing.metrics import QueryStats, current_query, finish_query, metrics_registry, start_query
+from routing.request_log import popular_pairs, route_log
+from routing.search import ALGORITHMS, INF, bounded_dijkstra, one_to_many
+from utils.decorators import admin_required
 
 navigation_bp = Blueprint('navigation', __name__, url_prefix='/api/navigation')
 
+ROUTE_FORMATS = ('full', 'compact')
+
+# Fully built route responses keyed by (start, end, algorithm, profile, metric, alternatives, graph version),
+# stored as (overlay fingerprint, response) so a route computed before an overlay change is never served after it
+route_cache = LRUCache()
+
+
+@navigation_bp.record_once
+def configure_route_cache(state):
+    """Size the route cache and set up the request log from the app config"""
+    route_cache.resize(state.app.config.get('ROUTE_CACHE_SIZE', 1024))
+    if state.app.config.get('ROUTE_LOG_ENABLED', True):
+        route_log.configure(state.app)
+
+
+def invalidate_routes(previous, overlay):
+    """
+    Drop cached routes a path overlay change can affect
+
+    A path that got more expensive only invalidates the routes using it;
+    a cheaper or reopened path may shorten any route, so everything goes.
+    Surviving routes are re-stamped with the new overlay fingerprint in the
+    same pass. Anything stamped otherwise (a route computed on the old
+    overlay and stored after this ran) no longer matches and is dropped on
+    its next lookup.
+    """
+    raised, lowered = overlay.changes(previous)
+    if lowered:
+        route_cache.clear()
+        return
+
+    before = previous.fingerprint if previous is not None else None
+
+    def restamp(entry):
+        fingerprint, response = entry
+        if fingerprint != before or uses_paths(response, raised):
+            return None
+        return overlay.fingerprint, response
+
+    route_cache.replace_where(restamp)
+
+
+def uses_paths(response, path_ids):
+    """True if a cached route response (or one of its alternatives) uses any of path_ids"""
+    routes = [response['route']] + [alternative['route'] for alternative in response.get('alternatives', [])]
+    return any(segment['path_id'] in path_ids for route in routes for segment in route)
+
+
+graph_cache.add_overlay_listener(invalidate_routes)
+
 
 def session_required(f):
     """Custom decorator for session-based authentication"""
-    from functools import wraps
     @wraps(f)
     def decorated_function(*args, **kwargs):
         if 'user_id' not in session:
@@ -24,214 +87,933 @@ def session_required(f):
     return decorated_function
 
 
-class WaypointRouter:
-    """Enhanced router that handles buildings and waypoints"""
-
-    def __init__(self):
-        self.graph = {}
-        self.nodes = {}  # Store node info (type, name, coordinates)
-
-    def build_graph(self):
-        """Build graph with buildings and waypoints"""
-        # Get all buildings
-        buildings = Building.query.all()
-        for building in buildings:
-            node_id = f"B{building.building_id}"
-            self.nodes[node_id] = {
-                'type': 'building',
-                'id': building.building_id,
-                'name': building.name,
-                'code': building.code,
-                'lat': float(building.latitude),
-                'lng': float(building.longitude)
-            }
-            self.graph[node_id] = []
+def instrumented(endpoint):
+    """Collect per-query stats for a view and add them to the routing histograms"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            start_query()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                finish_query(endpoint)
+        return decorated_function
+    return decorator
 
-        # Get all waypoints
-        waypoints = Waypoint.query.all()
-        for waypoint in waypoints:
-            node_id = f"W{waypoint.waypoint_id}"
-            self.nodes[node_id] = {
-                'type': 'waypoint',
-                'id': waypoint.waypoint_id,
-                'name': waypoint.name,
-                'code': waypoint.code,
-                'lat': float(waypoint.latitude),
-                'lng': float(waypoint.longitude)
-            }
-            self.graph[node_id] = []
-
-        # Get all paths
-        paths = Path.query.all()
-        for path in paths:
-            # Determine source node
-            if path.source_building_id:
-                source = f"B{path.source_building_id}"
-            elif path.source_waypoint_id:
-                source = f"W{path.source_waypoint_id}"
-            else:
-                continue
 
-            # Determine destination node
-            if path.destination_building_id:
-                dest = f"B{path.destination_building_id}"
-            elif path.destination_waypoint_id:
-                dest = f"W{path.destination_waypoint_id}"
-            else:
-                continue
+def debug_requested():
+    """True if the caller asked for query stats (?debug=true or "debug": true in the body)"""
+    value = request.args.get('debug')
+    if value is None and request.is_json:
+        value = (request.get_json(silent=True) or {}).get('debug')
+    return str(value).lower() in ('1', 'true')
 
-            # Add edge to graph
-            distance = float(path.distance)
-            self.graph[source].append((dest, distance))
 
-    def dijkstra(self, start_node, end_node):
-        """Find shortest path using Dijkstra's algorithm"""
-        if start_node not in self.graph or end_node not in self.graph:
-            return None, float('inf')
+def respond(payload, status=200, headers=None):
+    """
+    jsonify a successful response of an instrumented view
 
-        # Priority queue: (distance, node, path)
-        pq = [(0, start_node, [start_node])]
-        visited = set()
+    Serialization is timed into the query stats, and the stats collected
+    so far are attached as "debug" when the caller asked for them.
+    """
+    stats = current_query()
+    if stats is None:
+        return jsonify(payload), status, headers or {}
 
-        while pq:
-            current_dist, current_node, path = heapq.heappop(pq)
+    if debug_requested():
+        payload = dict(payload, debug=stats.to_dict())
+    with stats.timer('serialize_ms'):
+        response = jsonify(payload)
+    return response, status, headers or {}
 
-            if current_node in visited:
-                continue
 
-            visited.add(current_node)
+class WaypointRouter(RoutingEngine):
+    """Enhanced router that handles buildings and waypoints (request-facing RoutingEngine)"""
 
-            if current_node == end_node:
-                return path, current_dist
+    def build_graph(self, profile=DEFAULT_PROFILE, metric=DEFAULT_METRIC):
+        """Attach the shared graph snapshot of a profile and cost metric for the current graph version"""
+        self.load(profile, metric)
 
-            for neighbor, edge_dist in self.graph[current_node]:
-                if neighbor not in visited:
-                    new_dist = current_dist + edge_dist
-                    new_path = path + [neighbor]
-                    heapq.heappush(pq, (new_dist, neighbor, new_path))
+    def dijkstra(self, start_node, end_node):
+        """Find shortest path between two dense node ids using Dijkstra's algorithm"""
+        path, distance, _ = self.route(start_node, end_node)
+        return path, distance
+
+    def find_route(self, start_node, end_node, algorithm='dijkstra'):
+        """
+        Find a route with the selected search algorithm
 
-        return None, float('inf')
+        Returns:
+            tuple: (path node ids or None, total distance, settled node count)
+        """
+        return self.route(start_node, end_node, algorithm)
 
     def get_route_details(self, path_nodes):
         """Convert node IDs to detailed route information"""
-        if not path_nodes:
-            return []
-
-        route_details = []
-        for i, node_id in enumerate(path_nodes):
-            node_info = self.nodes[node_id].copy()
-
-            # Calculate segment distance if not last node
-            if i < len(path_nodes) - 1:
-                next_node = path_nodes[i + 1]
-                segment_distance = self._get_segment_distance(node_id, next_node)
-                node_info['distance_to_next'] = segment_distance
-            else:
-                node_info['distance_to_next'] = 0
+        return self.route_details(path_nodes)
 
-            node_info['sequence'] = i + 1
-            route_details.append(node_info)
 
-        return route_details
+@navigation_bp.route('/route', methods=['POST'])
+@session_required
+@instrumented('route')
+def calculate_route():
+    """
+    Calculate route between two buildings using waypoints
+    JSON body as described in route_response.
+    """
+    return route_response(request.get_json() or {})
 
-    def _get_segment_distance(self, node1, node2):
-        """Get distance between two connected nodes"""
-        # Parse node IDs
-        if node1.startswith('B'):
-            source_building_id = int(node1[1:])
-            source_waypoint_id = None
-        else:
-            source_building_id = None
-            source_waypoint_id = int(node1[1:])
 
-        if node2.startswith('B'):
-            dest_building_id = int(node2[1:])
-            dest_waypoint_id = None
-        else:
-            dest_building_id = None
-            dest_waypoint_id = int(node2[1:])
+@navigation_bp.route('/route', methods=['GET'])
+@session_required
+@instrumented('route_get')
+def get_route():
+    """
+    Cacheable form of /route: ?from=<building id>&to=<building id>
+    Optional profile, metric, algorithm, alternatives, format and
+    directions work as in the POST body. Successful responses carry a
+    strong ETag derived from the graph version, the active path overrides
+    and the normalised parameters, so If-None-Match is answered with 304
+    before any search, and Cache-Control lets browsers and proxies reuse
+    them for ROUTE_HTTP_MAX_AGE seconds.
+    """
+    data = {
+        'start_building_id': request.args.get('from', type=int),
+        'end_building_id': request.args.get('to', type=int),
+        'algorithm': request.args.get('algorithm') or current_app.config.get('ROUTING_DEFAULT_ALGORITHM', 'dijkstra'),
+        'profile': request.args.get('profile') or DEFAULT_PROFILE,
+        'metric': request.args.get('metric') or DEFAULT_METRIC,
+        'alternatives': request.args.get('alternatives', 0, type=int),
+        'format': request.args.get('format') or 'full'
+    }
+    directions = request.args.get('directions')
+    if directions is not None:
+        data['directions'] = directions.lower() in ('1', 'true')
 
-        # Find path in database
-        path = Path.query.filter_by(
-            source_building_id=source_building_id,
-            source_waypoint_id=source_waypoint_id,
-            destination_building_id=dest_building_id,
-            destination_waypoint_id=dest_waypoint_id
-        ).first()
+    if debug_requested():
+        response = make_response(route_response(data))
+        response.headers['Cache-Control'] = 'no-store'
+        return response
 
-        return float(path.distance) if path else 0
+    etag, max_age = route_etag(data)
+    headers = {'Cache-Control': route_cache_control(max_age)}
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
 
+    response = make_response(route_response(data))
+    if response.status_code == 200:
+        response.headers.update(headers)
+        response.set_etag(etag)
+    return response
 
-@navigation_bp.route('/route', methods=['POST'])
-@session_required
-def calculate_route():
-    """Calculate route between two buildings using waypoints"""
+
+def route_etag(data):
+    """
+    Strong ETag of a route request and the seconds it may be reused
+
+    The tag covers everything the response depends on: graph version,
+    the active path overrides and the normalised request. Reuse is cut
+    short when a time-limited override expires sooner.
+
+    Returns:
+        tuple: (etag, max-age seconds)
+    """
+    base = graph_cache.get()
+    overlay = graph_cache.overlay
+    key = json.dumps([base.version, overlay.fingerprint if overlay else None, sorted(data.items())])
+    max_age = current_app.config.get('ROUTE_HTTP_MAX_AGE', 60)
+    if overlay is not None and overlay.next_expiry is not None:
+        remaining = (overlay.next_expiry - datetime.utcnow()).total_seconds()
+        max_age = max(0, min(max_age, int(remaining)))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest(), max_age
+
+
+def route_cache_control(max_age):
+    """Cache-Control for route responses (shared caches only with ROUTE_HTTP_PUBLIC)"""
+    scope = 'public' if current_app.config.get('ROUTE_HTTP_PUBLIC', False) else 'private'
+    return f'{scope}, max-age={max_age}'
+
+
+def route_response(data):
+    """
+    Calculate route between two buildings using waypoints
+    The start may be a building (start_building_id) or a raw GPS position
+    (start_lat/start_lng) snapped to the nearest waypoint or building.
+    An optional profile (see routing.profiles.PROFILES) filters or
+    re-weights the paths used, e.g. wheelchair avoids stairs, and metric
+    picks what is minimised: distance, time or a balanced mix.
+    alternatives (0 by default) asks for up to that many extra routes that
+    overlap the main route and each other by at most ROUTE_ALTERNATIVES_MAX_OVERLAP.
+    format: "compact" returns the route as an encoded polyline plus node
+    id/type arrays, with directions only when directions is true.
+    debug: true adds the query stats (timings, settled nodes, heap pushes).
+    """
     try:
-        data = request.get_json()
+        stats = current_query()
         start_building_id = data.get('start_building_id')
         end_building_id = data.get('end_building_id')
+        start_lat = data.get('start_lat')
+        start_lng = data.get('start_lng')
+        from_position = start_lat is not None and start_lng is not None
 
-        if not start_building_id or not end_building_id:
+        algorithm = data.get('algorithm') or current_app.config.get('ROUTING_DEFAULT_ALGORITHM', 'dijkstra')
+        profile = data.get('profile') or DEFAULT_PROFILE
+        metric = data.get('metric') or DEFAULT_METRIC
+        alternatives = data.get('alternatives')
+        if alternatives is None:
+            alternatives = 0
+
+        if not (start_building_id or from_position) or not end_building_id:
             return jsonify({'error': 'Start and end buildings required'}), 400
 
-        # Verify buildings exist
-        start_building = Building.query.get(start_building_id)
-        end_building = Building.query.get(end_building_id)
+        if algorithm not in ALGORITHMS:
+            return jsonify({'error': f"Algorithm must be one of: {', '.join(ALGORITHMS)}"}), 400
 
-        if not start_building or not end_building:
-            return jsonify({'error': 'Invalid building IDs'}), 404
+        if profile not in PROFILES:
+            return profile_error()
+
+        if metric not in METRICS:
+            return jsonify({'error': f"Metric must be one of: {', '.join(METRICS)}"}), 400
 
-        # Build routing graph
+        max_alternatives = current_app.config.get('ROUTE_MAX_ALTERNATIVES', 3)
+        if (not isinstance(alternatives, int) or isinstance(alternatives, bool)
+                or not 0 <= alternatives <= max_alternatives):
+            return jsonify({'error': f'Alternatives must be between 0 and {max_alternatives}'}), 400
+
+        response_format, with_directions, error = route_format(data)
+        if error:
+            return error
+
+        # Load the shared routing graph (rebuilt only when the graph version changes)
         router = WaypointRouter()
-        router.build_graph()
+        builds = graph_cache.builds
+        with stats.timer('graph_ms'):
+            router.build_graph(profile, metric)
+        stats.add(graph_builds=graph_cache.builds - builds)
 
         # Calculate shortest path
-        start_node = f"B{start_building_id}"
-        end_node = f"B{end_building_id}"
+        end_node = router.graph.building_node(end_building_id)
+        snap = None
+        if from_position:
+            with stats.timer('snap_ms'):
+                start_node, snap, error = snap_position(router.graph, start_lat, start_lng)
+            if error:
+                return error
+        else:
+            start_node = router.graph.building_node(start_building_id)
 
-        path_nodes, total_distance = router.dijkstra(start_node, end_node)
+        # Verify buildings exist
+        if start_node is None or end_node is None:
+            return jsonify({'error': 'Invalid building IDs'}), 404
 
-        if path_nodes is None:
+        # Serve repeated lookups from the route cache
+        cache_key = (start_node, end_node, algorithm, profile, metric, alternatives, router.version)
+        fingerprint = router.overlay_fingerprint
+        entry = route_cache.get(cache_key, valid=lambda entry: entry[0] == fingerprint)
+        cached = entry[1] if entry is not None else None
+        stats.add(route_cache_hits=int(cached is not None))
+        if cached is not None:
+            log_route(start_building_id if not from_position else None, end_building_id,
+                      profile, metric, algorithm, stats, cache_hit=True)
+            return respond(shape_route(with_snapped_start(cached, snap), response_format, with_directions),
+                           200, {'X-Route-Cache': 'HIT'})
+
+        response = build_route_response(router, start_node, end_node, algorithm, profile, metric,
+                                        alternatives, stats)
+        if response is None:
             return jsonify({'error': 'No route found between buildings'}), 404
 
+        route_cache.put(cache_key, (fingerprint, response))
+        log_route(start_building_id if not from_position else None, end_building_id,
+                  profile, metric, algorithm, stats, cache_hit=False)
+        return respond(shape_route(with_snapped_start(response, snap), response_format, with_directions),
+                       200, {'X-Route-Cache': 'MISS'})
+
+    except Exception as e:
+        print(f"Error calculating route: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/nearest', methods=['GET'])
+@session_required
+def get_nearest_nodes():
+    """
+    Nearest routable waypoints/buildings to a GPS position
+    Query params: lat, lng, k (default 1)
+    """
+    try:
+        lat = request.args.get('lat', type=float)
+        lng = request.args.get('lng', type=float)
+        k = min(request.args.get('k', 1, type=int), 50)
+
+        if lat is None or lng is None:
+            return jsonify({'error': 'lat and lng are required'}), 400
+
+        routing_graph = get_routing_graph()
+        index = spatial_index_cache.get(routing_graph)
+        nodes = []
+        for node, distance in index.nearest(lat, lng, k):
+            info = routing_graph.node_info(node)
+            info['distance'] = round(distance, 2)
+            nodes.append(info)
+
+        return jsonify({'nodes': nodes, 'graph_version': routing_graph.version}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/matrix', methods=['POST'])
+@session_required
+@instrumented('matrix')
+def calculate_matrix():
+    """
+    Distance/time matrix between lists of buildings
+    Body: sources (building ids), targets (building ids, defaults to sources)
+    """
+    try:
+        data = request.get_json() or {}
+        sources = data.get('sources')
+        targets = data.get('targets') or sources
+
+        if not isinstance(sources, list) or not isinstance(targets, list) or not sources:
+            return jsonify({'error': 'Source and target building lists required'}), 400
+
+        max_sources = current_app.config.get('MATRIX_MAX_SOURCES', 25)
+        max_targets = current_app.config.get('MATRIX_MAX_TARGETS', 100)
+        if len(sources) > max_sources or len(targets) > max_targets:
+            return jsonify({
+                'error': f'Matrix limited to {max_sources} sources and {max_targets} targets'
+            }), 400
+
+        routing_graph = get_routing_graph()
+        source_nodes = [routing_graph.building_node(b) for b in sources]
+        target_nodes = [routing_graph.building_node(b) for b in targets]
+
+        unknown = [b for b, node in zip(sources, source_nodes) if node is None]
+        if targets is not sources:
+            unknown += [b for b, node in zip(targets, target_nodes) if node is None and b not in unknown]
+        if unknown:
+            return jsonify({'error': 'Invalid building IDs', 'building_ids': unknown}), 404
+
+        # Reuse the building route table when it is already built, else one search per source.
+        # Times are summed per edge along each shortest path, as for /route.
+        table = route_table_cache.peek(routing_graph)
+        distances = []
+        times = []
+        for source in source_nodes:
+            if table is not None:
+                distances.append([table.distance(source, target) for target in target_nodes])
+                times.append([route_seconds(routing_graph, table.route(source, target)[0])
+                              for target in target_nodes])
+            else:
+                row_distances, row_times, _ = one_to_many(routing_graph, source, target_nodes, with_times=True)
+                distances.append(row_distances)
+                times.append(row_times)
+
+        return respond({
+            'sources': sources,
+            'targets': targets,
+            'distances': [[round(d, 2) if d != INF else None for d in row] for row in distances],
+            'times_minutes': [[eta_minutes(t) if t != INF else None for t in row] for row in times],
+            'graph_version': routing_graph.version
+        })
+
+    except Exception as e:
+        print(f"Error calculating matrix: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/tour', methods=['POST'])
+@session_required
+@instrumented('tour')
+def calculate_tour():
+    """
+    Best order to visit a set of buildings, with the stitched walking route
+    Body: building_ids (the first one is the start), round_trip (default
+    false), profile, metric
+    """
+    try:
+        data = request.get_json() or {}
+        building_ids = data.get('building_ids')
+        round_trip = bool(data.get('round_trip'))
+
+        response_format, with_directions, error = route_format(data)
+        if error:
+            return error
+        profile = data.get('profile') or DEFAULT_PROFILE
+        metric = data.get('metric') or DEFAULT_METRIC
+
+        if not isinstance(building_ids, list) or not building_ids:
+            return jsonify({'error': 'List of building IDs required'}), 400
+
+        # Visiting a building twice never shortens a tour
+        building_ids = list(dict.fromkeys(building_ids))
+        max_stops = current_app.config.get('TOUR_MAX_STOPS', 25)
+        if len(building_ids) > max_stops:
+            return jsonify({'error': f'Tour limited to {max_stops} buildings'}), 400
+
+        if profile not in PROFILES:
+            return profile_error()
+
+        if metric not in METRICS:
+            return jsonify({'error': f"Metric must be one of: {', '.join(METRICS)}"}), 400
+
+        router = WaypointRouter()
+        router.build_graph(profile, metric)
+        nodes = [router.graph.building_node(b) for b in building_ids]
+        unknown = [b for b, node in zip(building_ids, nodes) if node is None]
+        if unknown:
+            return jsonify({'error': 'Invalid building IDs', 'building_ids': unknown}), 404
+
+        tour = plan_tour(router.graph, nodes, round_trip)
+        if tour is None:
+            return jsonify({'error': 'No route connects all buildings'}), 404
+        current_query().timings.update(matrix_ms=tour['matrix_ms'], solve_ms=tour['solve_ms'])
+
+        route_details = router.get_route_details(tour['path'])
+        total_distance, estimated_time_seconds = route_totals(router.graph, tour['path'])
+
+        stops = []
+        for sequence, node in enumerate(tour['order'], start=1):
+            stop = endpoint_info(router.graph, node)
+            stop['sequence'] = sequence
+            stop['cost_to_next'] = round(tour['legs'][sequence - 1], 2) if sequence <= len(tour['legs']) else 0
+            stops.append(stop)
+
+        return respond(shape_route({
+            'stops': stops,
+            'order': [stop['building_id'] for stop in stops],
+            'round_trip': round_trip,
+            'route': route_details,
+            'total_distance': round(total_distance, 2),
+            'estimated_time_minutes': eta_minutes(estimated_time_seconds),
+            'estimated_time_seconds': round(estimated_time_seconds),
+            'directions': generate_directions(route_details),
+            'search': {
+                'method': tour['method'],
+                'profile': profile,
+                'metric': metric,
+                'cost': round(tour['cost'], 2),
+                'matrix_ms': tour['matrix_ms'],
+                'solve_ms': tour['solve_ms'],
+                'graph_version': router.version
+            }
+        }, response_format, with_directions))
+
+    except Exception as e:
+        print(f"Error planning tour: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/isochrone', methods=['GET'])
+@session_required
+@instrumented('isochrone')
+def get_isochrone():
+    """
+    Everything reachable on foot from a building within a cutoff
+    Query params: building_id, and minutes or max_distance (meters)
+
+    A minutes cutoff searches the 'time' metric graph, whose weights are
+    travel seconds in walkway-equivalent metres, so slow stairs count
+    against it; max_distance cuts off on walking metres.
+    """
+    try:
+        building_id = request.args.get('building_id', type=int)
+        minutes = request.args.get('minutes', type=float)
+        max_distance = request.args.get('max_distance', type=float)
+
+        if building_id is None:
+            return jsonify({'error': 'building_id is required'}), 400
+        if minutes is None and max_distance is None:
+            return jsonify({'error': 'minutes or max_distance is required'}), 400
+
+        max_minutes = current_app.config.get('ISOCHRONE_MAX_MINUTES', 30)
+        by_time = max_distance is None
+        cutoff = minutes * 60 * WALKING_SPEED if by_time else max_distance
+        if cutoff < 0 or cutoff > max_minutes * 60 * WALKING_SPEED:
+            return jsonify({'error': f'Cutoff must be between 0 and {max_minutes} minutes of walking'}), 400
+
+        routing_graph = get_profile_graph(DEFAULT_PROFILE, 'time' if by_time else DEFAULT_METRIC)
+        source = routing_graph.building_node(building_id)
+        if source is None:
+            return jsonify({'error': 'Invalid building ID'}), 404
+
+        reached, totals, settled = bounded_dijkstra(routing_graph, source, cutoff, with_totals=True)
+
+        buildings = []
+        waypoints = []
+        for node in reached:
+            metres, seconds = totals[node]
+            info = routing_graph.node_info(node)
+            info['distance'] = round(metres, 2)
+            info['time_minutes'] = round(seconds / 60, 1)
+            (buildings if info['type'] == 'building' else waypoints).append(info)
+
+        return respond({
+            'start': endpoint_info(routing_graph, source),
+            'cutoff': 'time' if by_time else 'distance',
+            'max_distance': None if by_time else round(max_distance, 2),
+            'max_minutes': round(minutes if by_time else max_distance / WALKING_SPEED / 60, 1),
+            'buildings': buildings,
+            'waypoints': waypoints,
+            'settled_nodes': settled,
+            'graph_version': routing_graph.version
+        })
+
+    except Exception as e:
+        print(f"Error calculating isochrone: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/nearest-facility', methods=['GET'])
+@session_required
+@instrumented('nearest_facility')
+def get_nearest_facility():
+    """
+    Closest buildings offering a facility, by walking distance
+    Query params: facility, building_id or lat/lng, k (default 1), profile
+    """
+    try:
+        facility = (request.args.get('facility') or '').strip()
+        k = max(1, min(request.args.get('k', 1, type=int), 10))
+        profile = request.args.get('profile', DEFAULT_PROFILE)
+        if not facility:
+            return jsonify({'error': 'facility is required'}), 400
+        if profile not in PROFILES:
+            return profile_error()
+
+        routing_graph = get_profile_graph(profile)
+        start_node, snap, error = resolve_start(routing_graph)
+        if error:
+            return error
+
+        candidates = facility_index_cache.get(routing_graph).buildings_with(facility)
+        if not candidates:
+            return jsonify({'error': f'No building offers {facility}'}), 404
+
+        # One search from the start settles candidates in distance order
+        with current_query().timer('search_ms'):
+            hits, settled = nearest_targets(routing_graph, start_node, candidates, k)
+        results = []
+        for node, _, path in hits:
+            distance = routing_graph.path_length(path)
+            results.append({
+                'building': endpoint_info(routing_graph, node),
+                'distance': round(distance, 2),
+                'estimated_time_minutes': eta_minutes(routing_graph.path_time(path)),
+                'path': [routing_graph.node_key(n) for n in path]
+            })
+
+        if not results:
+            return jsonify({'error': f'No reachable building offers {facility}'}), 404
+
+        return respond(with_snapped_start({
+            'start': endpoint_info(routing_graph, start_node),
+            'facility': facility,
+            'profile': profile,
+            'results': results,
+            'candidates': len(candidates),
+            'settled_nodes': settled,
+            'graph_version': routing_graph.version
+        }, snap))
+
+    except Exception as e:
+        print(f"Error finding facility: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/nearest-gate', methods=['GET'])
+@session_required
+@instrumented('nearest_gate')
+def get_nearest_gate():
+    """
+    Nearest campus exit from a building or GPS position
+    Served from the precomputed evacuation plan (no search per request)
+    Query params: building_id or lat/lng, profile
+    """
+    try:
+        profile = request.args.get('profile', DEFAULT_PROFILE)
+        if profile not in PROFILES:
+            return profile_error()
+
+        routing_graph = get_profile_graph(profile)
+        start_node, snap, error = resolve_start(routing_graph)
+        if error:
+            return error
+
+        plan = evacuation_cache.get(routing_graph)
+        if not plan.gates:
+            return jsonify({'error': 'No gates configured'}), 404
+
+        path, _ = plan.route(start_node)
+        if path is None:
+            return jsonify({'error': 'No gate reachable from this location'}), 404
+
+        distance = routing_graph.path_length(path)
+        return respond(with_snapped_start({
+            'start': endpoint_info(routing_graph, start_node),
+            'gate': endpoint_info(routing_graph, path[-1]),
+            'profile': profile,
+            'distance': round(distance, 2),
+            'estimated_time_minutes': eta_minutes(routing_graph.path_time(path)),
+            'path': [routing_graph.node_key(n) for n in path],
+            'graph_version': routing_graph.version
+        }, snap))
+
+    except Exception as e:
+        print(f"Error finding gate: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/evacuation', methods=['GET'])
+@session_required
+def get_evacuation_plan():
+    """Nearest exit of every node, for evacuation map overlays"""
+    try:
+        routing_graph = get_routing_graph()
+        plan = evacuation_cache.get(routing_graph)
+
+        nodes = []
+        for node in range(routing_graph.node_count):
+            exit_node = plan.exit_node[node]
+            nodes.append({
+                'node': routing_graph.node_key(node),
+                'exit': routing_graph.node_key(exit_node) if exit_node != -1 else None,
+                'next': routing_graph.node_key(plan.next_hop[node]) if plan.next_hop[node] != -1 else None,
+                'distance': round(plan.exit_dist[node], 2) if exit_node != -1 else None
+            })
+
+        return jsonify({
+            'gates': [endpoint_info(routing_graph, gate) for gate in plan.gates],
+            'nodes': nodes,
+            'graph_version': routing_graph.version
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+def profile_error():
+    """400 response listing the known routing profiles"""
+    return jsonify({'error': f"Profile must be one of: {', '.join(PROFILES)}"}), 400
+
+
+def resolve_start(graph):
+    """
+    Start node from building_id or lat/lng query params
+
+    Returns:
+        tuple: (node id, snap info or None, error response or None)
+    """
+    building_id = request.args.get('building_id')
+    lat = request.args.get('lat')
+    lng = request.args.get('lng')
+
+    if lat is not None and lng is not None:
+        return snap_position(graph, lat, lng)
+    if building_id is None:
+        return None, None, (jsonify({'error': 'building_id or lat/lng is required'}), 400)
+
+    node = graph.building_node(building_id)
+    if node is None:
+        return None, None, (jsonify({'error': 'Invalid building ID'}), 404)
+    return node, None, None
+
+
+def snap_position(graph, lat, lng):
+    """
+    Snap a GPS position to the nearest routable node within SNAP_MAX_DISTANCE
+
+    Returns:
+        tuple: (node id, snap info, error response or None)
+    """
+    try:
+        lat, lng = float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None, None, (jsonify({'error': 'Latitude and longitude must be numbers'}), 400)
+
+    max_snap = current_app.config.get('SNAP_MAX_DISTANCE', 250)
+    nearest = spatial_index_cache.get(graph).nearest(lat, lng, 1, max_snap)
+    if not nearest:
+        return None, None, (jsonify({'error': f'No walkway within {max_snap}m of your position'}), 404)
+
+    node, distance = nearest[0]
+    return node, {'lat': lat, 'lng': lng, 'snap_distance': round(distance, 2)}, None
+
+
+def endpoint_info(graph, node):
+    """Start/end block of a route response"""
+    info = graph.node_info(node)
+    endpoint = {
+        'building_id': info['id'] if info['type'] == 'building' else None,
+        'name': info['name'],
+        'code': info['code'],
+        'lat': info['lat'],
+        'lng': info['lng']
+    }
+    if info['type'] == 'waypoint':
+        endpoint['waypoint_id'] = info['id']
+    return endpoint
+
+
+def with_snapped_start(response, snap):
+    """Attach the raw GPS start to a (possibly cached) route response"""
+    if snap is None:
+        return response
+    start = dict(response['start'], snapped_from={'lat': snap['lat'], 'lng': snap['lng']},
+                 snap_distance=snap['snap_distance'])
+    return dict(response, start=start)
+
+
+def route_totals(graph, path_nodes):
+    """Walking metres and travel seconds along a node path, summed per edge"""
+    return RoutingEngine(graph).totals(path_nodes)
+
+
+def find_alternatives(router, start_node, end_node, path_nodes, count):
+    """
+    Extra routes beside the main one, shaped like the main route response
+
+    Returns:
+        tuple: (list of alternative routes, search stats)
+    """
+    routes, stats = alternative_routes(
+        router.graph, start_node, end_node, k=count + 1,
+        max_overlap=current_app.config.get('ROUTE_ALTERNATIVES_MAX_OVERLAP', 0.7),
+        max_spur_searches=current_app.config.get('ROUTE_SPUR_SEARCH_LIMIT', 40),
+        first=path_nodes
+    )
+
+    main_edges = set(router.graph.path_edges(path_nodes))
+    results = []
+    for nodes, cost in routes[1:]:
+        details = router.get_route_details(nodes)
+        distance, seconds = route_totals(router.graph, nodes)
+        edges = router.graph.path_edges(nodes)
+        shared = sum(router.graph.distances[edge] for edge in edges if edge in main_edges)
+        results.append({
+            'route': details,
+            'total_distance': round(distance, 2),
+            'estimated_time_minutes': max(1, int(seconds / 60)),
+            'estimated_time_seconds': round(seconds),
+            'cost': round(cost, 2),
+            'overlap': round(shared / distance, 2) if distance else 0.0,
+            'directions': generate_directions(details)
+        })
+    return results, stats
+
+
+def route_seconds(graph, path):
+    """Travel seconds along a node path (inf when there is none)"""
+    return graph.path_time(path) if path is not None else INF
+
+
+def eta_minutes(seconds):
+    """Travel time in whole minutes (at least 1 for any non-zero time)"""
+    if seconds == 0:
+        return 0
+    return max(1, int(seconds / 60))
+
+
+def build_route_response(router, start_node, end_node, algorithm, profile, metric, alternatives, stats):
+    """
+    Search a route and assemble the full (cacheable) route response
+
+    Returns:
+        dict: Route response, or None if the endpoints are not connected
+    """
+    with stats.timer('search_ms'):
+        path_nodes, cost, settled_nodes = router.find_route(start_node, end_node, algorithm)
+
+    if path_nodes is None:
+        return None
+
+    with stats.timer('details_ms'):
         # Get detailed route information
         route_details = router.get_route_details(path_nodes)
 
-        # Calculate estimated time (assuming 1.4 m/s walking speed)
-        walking_speed = 1.4  # meters per second
-        estimated_time_seconds = total_distance / walking_speed
+        # Walking distance and ETA summed per edge (the search cost depends on profile and metric)
+        total_distance, estimated_time_seconds = route_totals(router.graph, path_nodes)
         estimated_time_minutes = int(estimated_time_seconds / 60)
 
         # Generate turn-by-turn directions
         directions = generate_directions(route_details)
 
-        response = {
-            'start': {
-                'building_id': start_building.building_id,
-                'name': start_building.name,
-                'code': start_building.code,
-                'lat': float(start_building.latitude),
-                'lng': float(start_building.longitude)
-            },
-            'end': {
-                'building_id': end_building.building_id,
-                'name': end_building.name,
-                'code': end_building.code,
-                'lat': float(end_building.latitude),
-                'lng': float(end_building.longitude)
-            },
-            'route': route_details,
-            'total_distance': round(total_distance, 2),
-            'estimated_time_minutes': max(1, estimated_time_minutes),
-            'waypoints_count': len([r for r in route_details if r['type'] == 'waypoint']),
-            'directions': directions
+    response = {
+        'start': endpoint_info(router.graph, start_node),
+        'end': endpoint_info(router.graph, end_node),
+        'route': route_details,
+        'total_distance': round(total_distance, 2),
+        'estimated_time_minutes': max(1, estimated_time_minutes),
+        'estimated_time_seconds': round(estimated_time_seconds),
+        'waypoints_count': len([r for r in route_details if r['type'] == 'waypoint']),
+        'directions': directions,
+        'search': {
+            'algorithm': algorithm,
+            'profile': profile,
+            'metric': metric,
+            'cost': round(cost, 2),
+            'settled_nodes': settled_nodes,
+            'graph_version': router.version
         }
+    }
 
-        return jsonify(response), 200
+    if alternatives:
+        with stats.timer('alternatives_ms'):
+            response['alternatives'], response['search']['alternatives'] = find_alternatives(
+                router, start_node, end_node, path_nodes, alternatives)
+    return response
 
-    except Exception as e:
-        print(f"Error calculating route: {str(e)}")
-        return jsonify({'error': str(e)}), 500
+
+def log_route(start_building_id, end_building_id, profile, metric, algorithm, stats, cache_hit):
+    """Queue a served route for the request log (no-op unless ROUTE_LOG_ENABLED)"""
+    if current_app.config.get('ROUTE_LOG_ENABLED', True):
+        start_building_id = int(start_building_id) if start_building_id is not None else None
+        route_log.record(start_building_id, int(end_building_id), profile, metric, algorithm,
+                         stats.to_dict()['total_ms'], cache_hit)
+
+
+def prewarm_routes(snapshot):
+    """
+    Graph rebuild listener: refill the route cache with the most requested routes
+
+    Runs in a background thread so the request that triggered the rebuild
+    is not held up; each worker warms its own cache.
+    """
+    count = current_app.config.get('ROUTE_PREWARM_COUNT', 50) if has_app_context() else 0
+    if count:
+        threading.Thread(target=warm_route_cache, args=(current_app._get_current_object(), count),
+                         name='route-prewarm', daemon=True).start()
+
+
+def rebuild_precomputed(snapshot):
+    """
+    Graph rebuild listener: rebuild the opted-in search structures for the new snapshot
+
+    The building route table (ROUTE_TABLE_WARM_ON_START) and contraction
+    hierarchy (CH_WARM_ON_START) are built in background threads for the
+    default profile; 'table' and 'ch' requests fall back to A* until they
+    are ready.
+    """
+    if not has_app_context():
+        return
+    if current_app.config.get('ROUTE_TABLE_WARM_ON_START'):
+        route_table_cache.build_in_background(snapshot, name='route-table-build')
+    if current_app.config.get('CH_WARM_ON_START'):
+        hierarchy_cache.build_in_background(snapshot, name='ch-build')
+
+
+def warm_route_cache(app, count):
+    """
+    Compute the count most popular routes into the route cache
+
+    Routes are built with the default algorithm and no alternatives, the
+    shape most requests ask for.
+
+    Returns:
+        int: Routes added to the cache
+    """
+    warmed = 0
+    with app.app_context():
+        try:
+            algorithm = app.config.get('ROUTING_DEFAULT_ALGORITHM', 'dijkstra')
+            routers = {}
+            for pair in popular_pairs(count):
+                variant = (pair.profile, pair.metric)
+                if pair.profile not in PROFILES or pair.metric not in METRICS:
+                    continue
+                router = routers.get(variant)
+                if router is None:
+                    router = routers[variant] = WaypointRouter()
+                    router.build_graph(*variant)
+
+                start_node = router.graph.building_node(pair.start_building_id)
+                end_node = router.graph.building_node(pair.end_building_id)
+                if start_node is None or end_node is None:
+                    continue
+                cache_key = (start_node, end_node, algorithm, pair.profile, pair.metric, 0, router.version)
+                fingerprint = router.overlay_fingerprint
+                if route_cache.get(cache_key, valid=lambda entry: entry[0] == fingerprint) is not None:
+                    continue
+
+                response = build_route_response(router, start_node, end_node, algorithm,
+                                                pair.profile, pair.metric, 0, QueryStats())
+                if response is not None:
+                    route_cache.put(cache_key, (fingerprint, response))
+                    warmed += 1
+        except Exception as e:
+            print(f"Error pre-warming route cache: {str(e)}")
+        finally:
+            db.session.remove()
+    return warmed
+
+
+graph_cache.add_rebuild_listener(prewarm_routes)
+graph_cache.add_rebuild_listener(rebuild_precomputed)
+
+
+def route_format(data):
+    """
+    Response shape requested for a route: format ("full" or "compact") and directions
+
+    Directions are included by default in the full format only.
+
+    Returns:
+        tuple: (format, include directions, error response or None)
+    """
+    response_format = data.get('format') or 'full'
+    if response_format not in ROUTE_FORMATS:
+        return None, None, (jsonify({'error': f"Format must be one of: {', '.join(ROUTE_FORMATS)}"}), 400)
+    with_directions = data.get('directions')
+    if with_directions is None:
+        with_directions = response_format == 'full'
+    return response_format, bool(with_directions), None
+
+
+def shape_route(response, response_format, with_directions):
+    """
+    Full or compact copy of a route response (and its alternatives)
+
+    The route cache holds full responses; the compact form is derived
+    per request, so both formats share one cache entry.
+    """
+    if response_format == 'full' and with_directions:
+        return response
+
+    shaped = {key: value for key, value in response.items() if key not in ('route', 'directions', 'alternatives')}
+    if response_format == 'compact':
+        shaped.update(route_geometry(response['route']))
+    else:
+        shaped['route'] = response['route']
+    if with_directions:
+        shaped['directions'] = response['directions']
+    if 'alternatives' in response:
+        shaped['alternatives'] = [shape_route(alternative, response_format, with_directions)
+                                  for alternative in response['alternatives']]
+    return shaped
+
+
+def route_geometry(route_details):
+    """
+    Compact geometry of a route: encoded polyline and node id/type arrays
+
+    The polyline is simplified by ROUTE_GEOMETRY_TOLERANCE metres (nodes
+    stay complete in nodes/node_types); node_types has one letter per
+    node, B for a building and W for a waypoint.
+    """
+    tolerance = current_app.config.get('ROUTE_GEOMETRY_TOLERANCE', 1.0)
+    precision = current_app.config.get('ROUTE_POLYLINE_PRECISION', 5)
+    points = [(node['lat'], node['lng']) for node in route_details]
+    kept = simplify_polyline(points, tolerance)
+    return {
+        'geometry': encode_polyline([points[i] for i in kept], precision),
+        'geometry_precision': precision,
+        'nodes': [node['id'] for node in route_details],
+        'node_types': ''.join('B' if node['type'] == 'building' else 'W' for node in route_details)
+    }
 
 
 def generate_directions(route_details):
@@ -278,3 +1060,129 @@ def get_waypoints():
         }), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/paths/overrides', methods=['GET'])
+@admin_required
+def get_path_overrides():
+    """List path closures and re-weights (expired ones only with ?include_expired=true)"""
+    try:
+        include_expired = request.args.get('include_expired', 'false').lower() == 'true'
+        query = PathOverride.query
+        if not include_expired:
+            query = query.filter(db.or_(PathOverride.expires_at.is_(None),
+                                        PathOverride.expires_at > datetime.utcnow()))
+        overrides = query.order_by(PathOverride.path_id).all()
+        return jsonify({'overrides': [override.to_dict() for override in overrides]}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/paths/<int:path_id>/override', methods=['PUT'])
+@admin_required
+def set_path_override(path_id):
+    """
+    Close or re-weight one path without rebuilding the routing graph
+    Body: action (close/reweight), weight_factor (reweight, >= 1), reason,
+    expires_at (ISO 8601) or expires_in_minutes
+    """
+    data = dict(request.get_json() or {}, path_id=path_id)
+    return edit_paths([data])
+
+
+@navigation_bp.route('/paths/<int:path_id>/override', methods=['DELETE'])
+@admin_required
+def clear_path_override(path_id):
+    """Reopen a closed path / restore its normal weight"""
+    return edit_paths([{'path_id': path_id, 'action': 'reopen'}])
+
+
+@navigation_bp.route('/paths/overrides', methods=['POST'])
+@admin_required
+def batch_path_overrides():
+    """
+    Apply many path edits in one transaction with one overlay version bump
+    Body: edits (list of {path_id, action, ...} as for PUT /paths/<id>/override)
+    """
+    edits = (request.get_json() or {}).get('edits')
+    if not isinstance(edits, list) or not edits:
+        return jsonify({'error': 'List of edits required'}), 400
+
+    max_edits = current_app.config.get('PATH_EDIT_MAX_BATCH', 200)
+    if len(edits) > max_edits:
+        return jsonify({'error': f'Batch limited to {max_edits} edits'}), 400
+
+    return edit_paths(edits)
+
+
+def edit_paths(edits):
+    """Apply override edits and commit them (shared by the override endpoints)"""
+    try:
+        overrides = apply_path_edits(edits, user_id=session.get('user_id'))
+        db.session.commit()
+        return jsonify({'message': 'Path overrides updated', 'overrides': overrides}), 200
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        db.session.rollback()
+        return jsonify({'error': 'Path not found', 'path_ids': e.args[0]}), 404
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Failed to update path overrides: {str(e)}'}), 500
+
+
+@navigation_bp.route('/metrics', methods=['GET'])
+@admin_required
+def get_routing_metrics():
+    """
+    Histograms of per-query routing stats for this worker process
+    Query params: reset=true clears them after reading
+    """
+    try:
+        metrics = metrics_registry.to_dict()
+        metrics['graph_builds'] = graph_cache.builds
+        metrics['route_cache'] = route_cache.stats()
+        snapshot = graph_cache.peek()
+        metrics['precomputed'] = {
+            'route_table': route_table_cache.state(snapshot) if snapshot is not None else 'missing',
+            'contraction_hierarchy': hierarchy_cache.state(snapshot) if snapshot is not None else 'missing'
+        }
+        if request.args.get('reset', 'false').lower() == 'true':
+            metrics_registry.reset()
+        return jsonify(metrics), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@navigation_bp.route('/status', methods=['GET'])
+@session_required
+def get_routing_status():
+    """Report the cached routing graph and precomputed routing structures"""
+    try:
+        routing_graph = get_routing_graph()
+        base = base_graph(routing_graph)
+        table = route_table_cache.peek(base)
+        hierarchy = hierarchy_cache.peek(base)
+        spatial_index = spatial_index_cache.peek(routing_graph)
+        facility_index = facility_index_cache.peek(routing_graph)
+        evacuation = evacuation_cache.peek(routing_graph)
+        profile_graphs = profile_graphs_cache.peek(base)
+        return jsonify({
+            'graph': routing_graph.to_dict(),
+            'route_table': dict(table.to_dict() if table is not None else {},
+                                state=route_table_cache.state(base)),
+            'contraction_hierarchy': dict(hierarchy.to_dict() if hierarchy is not None else {},
+                                          state=hierarchy_cache.state(base)),
+            'spatial_index': spatial_index.to_dict() if spatial_index is not None else None,
+            'facility_index': facility_index.to_dict() if facility_index is not None else None,
+            'evacuation_plan': evacuation.to_dict() if evacuation is not None else None,
+            'route_cache': route_cache.stats(),
+            'compiled_graphs': profile_graphs.compiled() if profile_graphs is not None else None,
+            'path_overlay': graph_cache.overlay.to_dict() if graph_cache.overlay is not None else None,
+            'profiles': {name: spec['description'] for name, spec in PROFILES.items()},
+            'metrics': list(METRICS),
+            'algorithms': list(ALGORITHMS)
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
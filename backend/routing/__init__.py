@@ -0,0 +1,126 @@
+"""
+Routing Package
+Cached campus graph and shortest-path engine used by navigation
+"""
+
+from .metrics import QueryStats, MetricsRegistry, metrics_registry, start_query, finish_query, record_search
+from .version import get_graph_version, get_graph_versions, bump_graph_version, bump_overlay_version
+from .graph import RoutingGraph, WALKING_SPEED
+from .overlay import Overlay, OverlayCache, overlay_cache, base_graph, apply_path_edits
+from .snapshot import write_snapshot, load_snapshot, snapshot_version, load_graph
+from .cache import GraphCache, DerivedCache, graph_cache, get_routing_graph
+from .search import (
+    ALGORITHMS,
+    dijkstra,
+    astar,
+    bidirectional_dijkstra,
+    bidirectional_astar,
+    one_to_many,
+    bounded_dijkstra,
+    reconstruct_path,
+    find_path,
+    shortest_path,
+    register_algorithm
+)
+from .geo import haversine_distance, encode_polyline, decode_polyline, simplify_polyline
+from .lru import LRUCache
+from .table import RouteTable, route_table_cache, verify_route_table
+from .ch import ContractionHierarchy, hierarchy_cache, verify_hierarchy
+from .spatial import GridIndex, spatial_index_cache
+from .profiles import (
+    PROFILES,
+    DEFAULT_PROFILE,
+    METRICS,
+    DEFAULT_METRIC,
+    compile_profile,
+    compile_all,
+    profile_graphs_cache,
+    get_profile_graph
+)
+from .engine import RoutingEngine
+from .request_log import RouteLog, route_log, aggregate_route_log, popular_pairs, edge_usage
+from .alternatives import alternative_routes, reverse_tree
+from .tour import stop_matrix, solve_tour, plan_tour
+from .facilities import (
+    FacilityIndex,
+    EvacuationPlan,
+    facility_index_cache,
+    evacuation_cache,
+    nearest_targets
+)
+
+__all__ = [
+    'QueryStats',
+    'MetricsRegistry',
+    'metrics_registry',
+    'start_query',
+    'finish_query',
+    'record_search',
+    'get_graph_version',
+    'get_graph_versions',
+    'bump_graph_version',
+    'bump_overlay_version',
+    'Overlay',
+    'OverlayCache',
+    'overlay_cache',
+    'base_graph',
+    'apply_path_edits',
+    'RoutingGraph',
+    'WALKING_SPEED',
+    'write_snapshot',
+    'load_snapshot',
+    'snapshot_version',
+    'load_graph',
+    'GraphCache',
+    'DerivedCache',
+    'graph_cache',
+    'get_routing_graph',
+    'ALGORITHMS',
+    'dijkstra',
+    'astar',
+    'bidirectional_dijkstra',
+    'bidirectional_astar',
+    'one_to_many',
+    'bounded_dijkstra',
+    'reconstruct_path',
+    'find_path',
+    'shortest_path',
+    'register_algorithm',
+    'haversine_distance',
+    'encode_polyline',
+    'decode_polyline',
+    'simplify_polyline',
+    'LRUCache',
+    'RouteTable',
+    'route_table_cache',
+    'verify_route_table',
+    'ContractionHierarchy',
+    'hierarchy_cache',
+    'verify_hierarchy',
+    'GridIndex',
+    'spatial_index_cache',
+    'PROFILES',
+    'DEFAULT_PROFILE',
+    'METRICS',
+    'DEFAULT_METRIC',
+    'compile_profile',
+    'compile_all',
+    'profile_graphs_cache',
+    'get_profile_graph',
+    'RoutingEngine',
+    'RouteLog',
+    'route_log',
+    'aggregate_route_log',
+    'popular_pairs',
+    'edge_usage',
+    'alternative_routes',
+    'reverse_tree',
+    'stop_matrix',
+    'solve_tour',
+    'plan_tour',
+    'FacilityIndex',
+    'EvacuationPlan',
+    'facility_index_cache',
+    'evacuation_cache',
+    'nearest_targets'
+]
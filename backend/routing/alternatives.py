@@ -0,0 +1,331 @@
+"""
+Alternative Routes
+Loopless K-shortest alternatives (Yen) with limited overlap
+"""
+
+import heapq
+from array import array
+from routing.metrics import record_search
+from routing.search import INF
+
+# Spur searches allowed per query; keeps worst-case latency bounded
+MAX_SPUR_SEARCHES = 40
+
+# Largest share of an alternative's length that may run along a route
+# already returned
+MAX_OVERLAP = 0.7
+
+# Yen paths examined per requested route before giving up
+MAX_EXAMINED_FACTOR = 5
+
+# Penalty fallback: searches kept back per missing route, and the weight
+# factor applied to an edge each time a found route uses it
+PENALTY_SEARCHES_PER_ROUTE = 2
+PENALTY_FACTOR = 1.5
+
+
+def reverse_tree(graph, target):
+    """
+    Full backward Dijkstra from target over the reverse CSR
+
+    Returns:
+        tuple: (dist-to-target list, successor edge array, settled node count);
+            succ[v] is the forward edge index of v's next hop towards target
+    """
+    rev_offsets = graph.rev_offsets
+    rev_sources = graph.rev_sources
+    rev_weights = graph.rev_weights
+    rev_edges = graph.rev_edges
+
+    dist = [INF] * graph.node_count
+    succ = array('i', [-1]) * graph.node_count
+    dist[target] = 0.0
+    pq = [(0.0, target)]
+    settled = relaxed = 0
+    pushes = 1
+
+    while pq:
+        current_dist, node = heapq.heappop(pq)
+        if current_dist > dist[node]:
+            continue
+
+        settled += 1
+        relaxed += rev_offsets[node + 1] - rev_offsets[node]
+        for slot in range(rev_offsets[node], rev_offsets[node + 1]):
+            previous = rev_sources[slot]
+            new_dist = current_dist + rev_weights[slot]
+            if new_dist < dist[previous]:
+                dist[previous] = new_dist
+                succ[previous] = rev_edges[slot]
+                heapq.heappush(pq, (new_dist, previous))
+                pushes += 1
+
+    record_search(settled, relaxed, pushes)
+    return dist, succ, settled
+
+
+def tree_suffix(graph, succ, node, target, forbidden=()):
+    """
+    Follow the reverse tree from node to target
+
+    Returns:
+        tuple: (node list, edge list), or None if unreachable or the tree
+            path enters a forbidden node
+    """
+    nodes = [node]
+    edges = []
+    while node != target:
+        edge = succ[node]
+        if edge == -1:
+            return None
+        node = graph.targets[edge]
+        if node in forbidden:
+            return None
+        nodes.append(node)
+        edges.append(edge)
+    return nodes, edges
+
+
+def _spur_search(graph, spur, target, dist_to, succ, banned_nodes, banned_edges):
+    """
+    A* from the spur node with the reverse-tree distances as heuristic
+
+    The heuristic is the exact distance on the unrestricted graph, so it is
+    consistent on any subgraph, and the search finishes at the first popped
+    node whose tree path to target is still allowed.
+
+    Returns:
+        tuple: (node list, edge list, cost, settled node count) or None
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    forbidden = banned_nodes | {spur}
+
+    best = {spur: 0.0}
+    parent = {}  # node -> (previous node, edge)
+    pq = [(dist_to[spur], 0.0, spur)]
+    settled = relaxed = 0
+    pushes = 1
+
+    while pq:
+        _, current_dist, node = heapq.heappop(pq)
+        if current_dist > best[node]:
+            continue
+
+        settled += 1
+        if node != spur:
+            suffix = tree_suffix(graph, succ, node, target, forbidden)
+            if suffix is not None:
+                prefix_nodes, prefix_edges = [], []
+                step = node
+                while step != spur:
+                    step, edge = parent[step]
+                    prefix_nodes.append(step)
+                    prefix_edges.append(edge)
+                nodes = prefix_nodes[::-1] + suffix[0]
+                if len(set(nodes)) == len(nodes):
+                    record_search(settled, relaxed, pushes)
+                    return nodes, prefix_edges[::-1] + suffix[1], current_dist + dist_to[node], settled
+
+        relaxed += offsets[node + 1] - offsets[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            if edge in banned_edges:
+                continue
+            neighbor = targets[edge]
+            if neighbor in forbidden or dist_to[neighbor] == INF:
+                continue
+            new_dist = current_dist + weights[edge]
+            if new_dist < best.get(neighbor, INF):
+                best[neighbor] = new_dist
+                parent[neighbor] = (node, edge)
+                heapq.heappush(pq, (new_dist + dist_to[neighbor], new_dist, neighbor))
+                pushes += 1
+
+    record_search(settled, relaxed, pushes)
+    return None
+
+
+def _penalty_search(graph, source, target, dist_to, penalties):
+    """
+    A* from source with penalised edge weights
+
+    Penalties only raise weights, so the reverse-tree distances remain an
+    admissible and consistent heuristic.
+
+    Returns:
+        tuple: (node list, edge list, settled node count) or None
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    best = {source: 0.0}
+    parent = {}
+    pq = [(dist_to[source], 0.0, source)]
+    settled = relaxed = 0
+    pushes = 1
+
+    while pq:
+        _, current_dist, node = heapq.heappop(pq)
+        if current_dist > best[node]:
+            continue
+
+        settled += 1
+        if node == target:
+            record_search(settled, relaxed, pushes)
+            nodes, edges = [node], []
+            while node != source:
+                node, edge = parent[node]
+                nodes.append(node)
+                edges.append(edge)
+            return nodes[::-1], edges[::-1], settled
+
+        relaxed += offsets[node + 1] - offsets[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            if dist_to[neighbor] == INF:
+                continue
+            new_dist = current_dist + weights[edge] * penalties.get(edge, 1.0)
+            if new_dist < best.get(neighbor, INF):
+                best[neighbor] = new_dist
+                parent[neighbor] = (node, edge)
+                heapq.heappush(pq, (new_dist + dist_to[neighbor], new_dist, neighbor))
+                pushes += 1
+
+    record_search(settled, relaxed, pushes)
+    return None
+
+
+def overlap_ratio(graph, edges, routes):
+    """Largest share of the walking length of edges shared with any of routes"""
+    length = sum(graph.distances[edge] for edge in edges)
+    if length == 0:
+        return 0.0
+    worst = 0.0
+    for _, _, other in routes:
+        shared = set(other)
+        worst = max(worst, sum(graph.distances[edge] for edge in edges if edge in shared) / length)
+    return worst
+
+
+def alternative_routes(graph, source, target, k=3, max_overlap=MAX_OVERLAP,
+                       max_spur_searches=MAX_SPUR_SEARCHES, first=None):
+    """
+    Up to k loopless routes, the shortest first, with limited pairwise overlap
+
+    Yen's algorithm on top of one backward shortest-path tree from target:
+    a spur node whose tree path avoids the root and the banned edges needs
+    no search at all, and every other spur search is A* with exact tree
+    distances as heuristic. Candidates overlapping a returned route by more
+    than max_overlap still seed further deviations but are not returned.
+    Yen's deviations are often near-copies of the shortest route, so any
+    slots still open afterwards are filled by the penalty method: repeated
+    searches with the edges of earlier routes made more expensive.
+
+    Args:
+        graph (RoutingGraph): CSR graph snapshot
+        source (int): Dense id of the start node
+        target (int): Dense id of the goal node
+        k (int): Number of routes wanted, including the shortest
+        max_overlap (float): Largest shared length share (0-1)
+        max_spur_searches (int): Search budget for the query (Yen and penalty)
+        first (list): Shortest path already found by the caller, if any
+
+    Returns:
+        tuple: (list of (node path, cost), stats dict)
+    """
+    dist_to, succ, settled = reverse_tree(graph, target)
+    stats = {'spur_searches': 0, 'penalty_searches': 0, 'settled_nodes': settled, 'examined': 1}
+    if dist_to[source] == INF:
+        return [], stats
+
+    if first is None:
+        nodes, edges = tree_suffix(graph, succ, source, target)
+    else:
+        nodes, edges = list(first), graph.path_edges(first)
+    weights = graph.weights
+    shortest = (sum(weights[edge] for edge in edges), nodes, edges)
+
+    examined = [shortest]
+    accepted = [shortest]
+    candidates = []
+    seen = {tuple(edges)}
+    counter = 0
+    exhausted = False
+    yen_budget = max(0, max_spur_searches - PENALTY_SEARCHES_PER_ROUTE * (k - 1))
+
+    while len(accepted) < k and len(examined) < k * MAX_EXAMINED_FACTOR and not exhausted:
+        _, last_nodes, last_edges = examined[-1]
+        root_cost = 0.0
+
+        for i in range(len(last_edges)):
+            spur = last_nodes[i]
+            root = last_nodes[:i + 1]
+            banned_edges = {edges[i] for _, nodes, edges in examined
+                            if len(edges) > i and nodes[:i + 1] == root}
+            banned_nodes = set(root[:-1])
+
+            # The tree path from the spur node is optimal whenever it is allowed
+            spur_path = None
+            suffix = tree_suffix(graph, succ, spur, target, banned_nodes)
+            if suffix is not None and suffix[1] and suffix[1][0] not in banned_edges:
+                spur_path = suffix[0], suffix[1], dist_to[spur]
+            elif stats['spur_searches'] >= yen_budget:
+                exhausted = True
+                break
+            else:
+                stats['spur_searches'] += 1
+                found = _spur_search(graph, spur, target, dist_to, succ, banned_nodes, banned_edges)
+                if found is not None:
+                    stats['settled_nodes'] += found[3]
+                    spur_path = found[:3]
+
+            if spur_path is not None:
+                spur_nodes, spur_edges, spur_cost = spur_path
+                edges = last_edges[:i] + spur_edges
+                key = tuple(edges)
+                if key not in seen:
+                    seen.add(key)
+                    counter += 1
+                    heapq.heappush(candidates, (root_cost + spur_cost, counter,
+                                                root[:-1] + spur_nodes, edges))
+
+            root_cost += weights[last_edges[i]]
+
+        if not candidates:
+            break
+
+        cost, _, nodes, edges = heapq.heappop(candidates)
+        route = (cost, nodes, edges)
+        examined.append(route)
+        stats['examined'] += 1
+        if overlap_ratio(graph, edges, accepted) <= max_overlap:
+            accepted.append(route)
+
+    penalties = {}
+    for _, _, edges in examined:
+        for edge in edges:
+            penalties[edge] = penalties.get(edge, 1.0) * PENALTY_FACTOR
+
+    while len(accepted) < k and stats['spur_searches'] + stats['penalty_searches'] < max_spur_searches:
+        stats['penalty_searches'] += 1
+        found = _penalty_search(graph, source, target, dist_to, penalties)
+        if found is None:
+            break
+
+        nodes, edges, searched = found
+        stats['settled_nodes'] += searched
+        for edge in edges:
+            penalties[edge] = penalties.get(edge, 1.0) * PENALTY_FACTOR
+
+        key = tuple(edges)
+        if key in seen:
+            continue
+        seen.add(key)
+        stats['examined'] += 1
+        if overlap_ratio(graph, edges, accepted) <= max_overlap:
+            accepted.append((sum(weights[edge] for edge in edges), nodes, edges))
+
+    alternatives = sorted(accepted[1:], key=lambda route: route[0])
+    return [(nodes, cost) for cost, nodes, _ in [shortest] + alternatives], stats
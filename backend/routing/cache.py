@@ -0,0 +1,191 @@
+"""
+Routing Graph Cache
+Process-wide snapshot holder with version-based invalidation
+"""
+
+import threading
+from routing.overlay import Overlay, base_graph, overlay_cache
+from routing.snapshot import load_graph
+from routing.version import get_graph_versions
+
+
+class GraphCache:
+    """
+    Holds one RoutingGraph per worker process
+
+    Each lookup costs a single primary-key query for the graph and overlay
+    versions. When the graph version moved, one thread rebuilds the
+    snapshot under a lock and swaps the reference; readers keep using
+    whichever complete snapshot they already hold, so nobody ever sees a
+    half-built graph. The default loader maps a compiled snapshot file
+    when it matches the version and otherwise reads the database.
+    Path overrides (closures, re-weights) are tracked separately: a new
+    overlay version or an expiring override only reloads the small
+    override table, and listeners are told which paths changed.
+    Rebuild listeners run in the thread that loaded a new snapshot.
+    """
+
+    def __init__(self, loader=load_graph, overlay_loader=Overlay.from_database):
+        self._loader = loader
+        self._overlay_loader = overlay_loader
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._listeners = []
+        self._rebuild_listeners = []
+        self.overlay = None
+        self.builds = 0
+
+    def get(self):
+        """Return the base snapshot for the current graph version"""
+        version, overlay_version = get_graph_versions()
+        overlay = self.overlay
+        if overlay is None or overlay.version != overlay_version or overlay.expired():
+            self._refresh_overlay(overlay_version)
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        rebuilt = False
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._loader(version)
+                self._snapshot = snapshot
+                self.builds += 1
+                rebuilt = True
+
+        if rebuilt:
+            for listener in self._rebuild_listeners:
+                listener(snapshot)
+        return snapshot
+
+    def _refresh_overlay(self, overlay_version):
+        """Reload or re-evaluate the path overlay and notify listeners"""
+        with self._lock:
+            previous = self.overlay
+            if previous is None or previous.version != overlay_version:
+                overlay = self._overlay_loader(overlay_version)
+            elif previous.expired():
+                overlay = previous.refreshed()
+            else:
+                return
+            self.overlay = overlay
+
+        for listener in self._listeners:
+            listener(previous, overlay)
+
+    def add_overlay_listener(self, listener):
+        """Call listener(previous, overlay) whenever the active overrides change"""
+        self._listeners.append(listener)
+
+    def add_rebuild_listener(self, listener):
+        """Call listener(snapshot) after a new base snapshot was loaded (outside the lock)"""
+        self._rebuild_listeners.append(listener)
+
+    def peek(self):
+        """Return the cached snapshot without checking the version"""
+        return self._snapshot
+
+    def invalidate(self):
+        """Drop the cached snapshot so the next lookup rebuilds it"""
+        with self._lock:
+            self._snapshot = None
+            self.overlay = None
+
+
+class DerivedCache:
+    """
+    Keeps one structure derived from the most recent graph snapshot
+
+    Used for precomputed tables and indexes: the builder runs once per
+    snapshot (under a lock) and the result is dropped as soon as a newer
+    snapshot is passed in. Each routing profile / cost metric has its own
+    snapshot, so one entry is kept per graph variant. Structures that only
+    depend on nodes and adjacency pass weight_independent=True and are
+    keyed on the unpatched base graph, so path overrides do not rebuild them.
+    Expensive structures that requests only peek at are filled with
+    build_in_background.
+    """
+
+    def __init__(self, builder, weight_independent=False):
+        self._builder = builder
+        self._weight_independent = weight_independent
+        self._lock = threading.Lock()
+        self._entries = {}  # (profile, metric) -> (graph, value), swapped as one reference
+        self._building = {}  # variant -> thread of a running background build
+
+    def get(self, graph):
+        """Return the structure for this snapshot, building it on first use"""
+        if self._weight_independent:
+            graph = base_graph(graph)
+        cached_graph, value = self._entries.get(graph.variant, (None, None))
+        if cached_graph is graph:
+            return value
+
+        with self._lock:
+            cached_graph, value = self._entries.get(graph.variant, (None, None))
+            if cached_graph is not graph:
+                value = self._builder(graph)
+                self._entries[graph.variant] = (graph, value)
+        return value
+
+    def peek(self, graph=None):
+        """Return the cached structure (only if it matches graph, when given)"""
+        if graph is not None and self._weight_independent:
+            graph = base_graph(graph)
+        variant = graph.variant if graph is not None else ('default', 'distance')
+        cached_graph, value = self._entries.get(variant, (None, None))
+        if graph is not None and cached_graph is not graph:
+            return None
+        return value
+
+    def build_in_background(self, graph, name='derived-build'):
+        """
+        Build the structure for this snapshot in a daemon thread
+
+        Does nothing when it is already built or a build of the variant is
+        running; the thread has no app context, so the builder runs in-process.
+        """
+        if self._weight_independent:
+            graph = base_graph(graph)
+        def build():
+            try:
+                self.get(graph)
+            except Exception as e:
+                print(f"Error building {name} for graph version {graph.version}: {str(e)}")
+            finally:
+                with self._lock:
+                    self._building.pop(graph.variant, None)
+
+        with self._lock:
+            cached_graph, _ = self._entries.get(graph.variant, (None, None))
+            if cached_graph is graph or self._build_running(graph.variant):
+                return
+            # A thread inherited across fork is not alive, so the build starts again
+            thread = self._building[graph.variant] = threading.Thread(target=build, name=name, daemon=True)
+        thread.start()
+
+    def _build_running(self, variant):
+        thread = self._building.get(variant)
+        return thread is not None and (thread.is_alive() or not thread.ident)
+
+    def state(self, graph):
+        """'ready', 'building', 'stale' (only an older snapshot's) or 'missing' for this snapshot"""
+        if self._weight_independent:
+            graph = base_graph(graph)
+        cached_graph, _ = self._entries.get(graph.variant, (None, None))
+        if cached_graph is graph:
+            return 'ready'
+        if self._build_running(graph.variant):
+            return 'building'
+        return 'stale' if cached_graph is not None else 'missing'
+
+
+graph_cache = GraphCache()
+
+
+def get_routing_graph():
+    """Shared routing graph for the current graph version, with path overrides applied"""
+    base = graph_cache.get()
+    return overlay_cache.get(base, graph_cache.overlay)
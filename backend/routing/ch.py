@@ -0,0 +1,342 @@
+"""
+Contraction Hierarchies
+Preprocessed routing backend for large waypoint graphs
+"""
+
+import heapq
+import random
+import time
+from array import array
+from routing.cache import DerivedCache
+from routing.metrics import record_search
+from routing.overlay import avoids_overrides, base_graph
+from routing.search import INF, bidirectional_astar, dijkstra, reconstruct_path, register_algorithm
+
+# Settled-node caps for witness searches: a cheap one when estimating
+# node priorities, a thorough one when actually contracting
+PRIORITY_SETTLE_LIMIT = 40
+WITNESS_SETTLE_LIMIT = 500
+
+
+def _witness_search(out, source, excluded, max_dist, limit):
+    """Bounded Dijkstra over the remaining graph that avoids one node"""
+    dist = {source: 0.0}
+    pq = [(0.0, source)]
+    settled = 0
+
+    while pq and settled < limit:
+        current_dist, node = heapq.heappop(pq)
+        if current_dist > dist[node]:
+            continue
+        if current_dist > max_dist:
+            break
+        settled += 1
+
+        for neighbor, weight in out[node].items():
+            if neighbor == excluded:
+                continue
+            new_dist = current_dist + weight
+            if new_dist < dist.get(neighbor, INF):
+                dist[neighbor] = new_dist
+                heapq.heappush(pq, (new_dist, neighbor))
+
+    return dist
+
+
+def _pack(edge_lists, node_count):
+    """Turn per-node [(head, weight)] lists into CSR arrays"""
+    offsets = array('i', [0])
+    heads = array('i')
+    weights = array('d')
+    for node in range(node_count):
+        for head, weight in edge_lists[node]:
+            heads.append(head)
+            weights.append(weight)
+        offsets.append(len(heads))
+    return offsets, heads, weights
+
+
+class ContractionHierarchy:
+    """
+    Contraction hierarchy over one graph snapshot
+
+    Nodes are contracted in order of edge difference, contracted
+    neighbours and hierarchy level, re-evaluated lazily and for the
+    neighbours of every contracted node. Contracting v adds a shortcut u -> w for
+    every in/out neighbour pair unless a witness path avoiding v is at
+    least as short. Queries run a bidirectional Dijkstra that only climbs
+    to higher-ranked nodes; shortcuts are unpacked through their middle
+    node afterwards.
+    """
+
+    def __init__(self, graph, rank, up, down, middle, build_seconds=0.0):
+        self.graph = graph
+        self.version = graph.version
+        self.rank = rank
+        self.up_offsets, self.up_targets, self.up_weights = up
+        self.down_offsets, self.down_sources, self.down_weights = down
+        self.middle = middle
+        self.build_seconds = build_seconds
+
+    @classmethod
+    def build(cls, graph, witness_limit=WITNESS_SETTLE_LIMIT):
+        """Contract every node of the snapshot"""
+        started = time.perf_counter()
+        node_count = graph.node_count
+
+        # Mutable adjacency of the not-yet-contracted graph (min weight per pair)
+        out = [{} for _ in range(node_count)]
+        inn = [{} for _ in range(node_count)]
+        for node in range(node_count):
+            for target, weight in graph.neighbors(node):
+                if target != node and weight < out[node].get(target, INF):
+                    out[node][target] = weight
+                    inn[target][node] = weight
+
+        middle = {}
+        deleted_neighbors = [0] * node_count
+        rank = array('i', [0]) * node_count
+        up_edges = [None] * node_count
+        down_edges = [None] * node_count
+
+        def shortcuts(node, limit=witness_limit):
+            found = []
+            if not out[node]:
+                return found
+            max_out = max(out[node].values())
+            for source, in_weight in inn[node].items():
+                witness = _witness_search(out, source, node, in_weight + max_out, limit)
+                for target, out_weight in out[node].items():
+                    if target == source:
+                        continue
+                    total = in_weight + out_weight
+                    if witness.get(target, INF) > total:
+                        found.append((source, target, total))
+            return found
+
+        def priority(node):
+            return (2 * (len(shortcuts(node, PRIORITY_SETTLE_LIMIT)) - len(inn[node]) - len(out[node]))
+                    + deleted_neighbors[node] + level[node])
+
+        level = [0] * node_count
+        priorities = [priority(node) for node in range(node_count)]
+        queue = [(value, node) for node, value in enumerate(priorities)]
+        heapq.heapify(queue)
+        contracted = bytearray(node_count)
+        order = 0
+
+        while queue:
+            value, node = heapq.heappop(queue)
+            if contracted[node] or value != priorities[node]:
+                continue
+
+            # Lazy update: re-queue if the node is no longer the cheapest
+            current = priority(node)
+            if queue and current > queue[0][0]:
+                priorities[node] = current
+                heapq.heappush(queue, (current, node))
+                continue
+
+            added = shortcuts(node)
+            up_edges[node] = list(out[node].items())
+            down_edges[node] = list(inn[node].items())
+            neighbors = set(inn[node]) | set(out[node])
+
+            for source in inn[node]:
+                del out[source][node]
+            for target in out[node]:
+                del inn[target][node]
+            out[node].clear()
+            inn[node].clear()
+
+            for source, target, total in added:
+                if total < out[source].get(target, INF):
+                    out[source][target] = total
+                    inn[target][source] = total
+                    middle[(source, target)] = node
+
+            contracted[node] = 1
+            rank[node] = order
+            order += 1
+
+            # Neighbours lost an edge and may have gained shortcuts
+            for neighbor in neighbors:
+                deleted_neighbors[neighbor] += 1
+                level[neighbor] = max(level[neighbor], level[node] + 1)
+                priorities[neighbor] = priority(neighbor)
+                heapq.heappush(queue, (priorities[neighbor], neighbor))
+
+        return cls(graph, rank, _pack(up_edges, node_count), _pack(down_edges, node_count),
+                   middle, build_seconds=time.perf_counter() - started)
+
+    def query(self, source, target):
+        """
+        Bidirectional upward search
+
+        Returns:
+            tuple: (path node ids or None, total distance, settled node count)
+        """
+        if source == target:
+            record_search(1, 0, 1)
+            return [source], 0.0, 1
+
+        sides = (
+            (self.up_offsets, self.up_targets, self.up_weights),
+            (self.down_offsets, self.down_sources, self.down_weights),
+        )
+        dist = ({source: 0.0}, {target: 0.0})
+        links = ({source: -1}, {target: -1})
+        queues = ([(0.0, source)], [(0.0, target)])
+        best = INF
+        meet = -1
+        settled = relaxed = 0
+        pushes = 2
+
+        while True:
+            top_forward = queues[0][0][0] if queues[0] else INF
+            top_backward = queues[1][0][0] if queues[1] else INF
+            if min(top_forward, top_backward) >= best:
+                break
+
+            side = 0 if top_forward <= top_backward else 1
+            offsets, heads, weights = sides[side]
+            own_dist, other_dist = dist[side], dist[1 - side]
+            pq = queues[side]
+
+            current_dist, node = heapq.heappop(pq)
+            if current_dist > own_dist[node]:
+                continue
+            settled += 1
+
+            total = current_dist + other_dist.get(node, INF)
+            if total < best:
+                best = total
+                meet = node
+
+            relaxed += offsets[node + 1] - offsets[node]
+            for edge in range(offsets[node], offsets[node + 1]):
+                neighbor = heads[edge]
+                new_dist = current_dist + weights[edge]
+                if new_dist < own_dist.get(neighbor, INF):
+                    own_dist[neighbor] = new_dist
+                    links[side][neighbor] = node
+                    heapq.heappush(pq, (new_dist, neighbor))
+                    pushes += 1
+
+        record_search(settled, relaxed, pushes)
+        if meet == -1:
+            return None, INF, settled
+
+        # Hierarchy path: source .. meet (up) then meet .. target (down)
+        packed = []
+        node = meet
+        while node != -1:
+            packed.append(node)
+            node = links[0][node]
+        packed.reverse()
+        node = links[1][meet]
+        while node != -1:
+            packed.append(node)
+            node = links[1][node]
+
+        return self._unpack(packed), best, settled
+
+    def _unpack(self, packed):
+        """Expand shortcuts into original edges"""
+        path = [packed[0]]
+        for source, target in zip(packed, packed[1:]):
+            stack = [(source, target)]
+            while stack:
+                a, b = stack.pop()
+                mid = self.middle.get((a, b))
+                if mid is None:
+                    path.append(b)
+                else:
+                    stack.append((mid, b))
+                    stack.append((a, mid))
+        return path
+
+    def memory_bytes(self):
+        """Approximate size of the hierarchy arrays in bytes"""
+        arrays = (self.rank, self.up_offsets, self.up_targets, self.up_weights,
+                  self.down_offsets, self.down_sources, self.down_weights)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def to_dict(self):
+        """Summary used by status endpoints and the CLI"""
+        return {
+            'version': self.version,
+            'nodes': len(self.rank),
+            'upward_edges': len(self.up_targets),
+            'downward_edges': len(self.down_sources),
+            'shortcuts': len(self.middle),
+            'memory_bytes': self.memory_bytes(),
+            'build_ms': round(self.build_seconds * 1000, 2)
+        }
+
+
+def verify_hierarchy(hierarchy, pairs=200, seed=0, tolerance=1e-6):
+    """
+    Compare CH answers with plain Dijkstra on random origin/destination pairs
+
+    Also checks that every unpacked path is a chain of real edges whose
+    weights add up to the reported distance.
+
+    Returns:
+        dict: Pair count and a list of mismatches (empty when correct)
+    """
+    graph = hierarchy.graph
+    rng = random.Random(seed)
+    mismatches = []
+
+    for _ in range(pairs if graph.node_count else 0):
+        source = rng.randrange(graph.node_count)
+        target = rng.randrange(graph.node_count)
+        dist, pred, _ = dijkstra(graph, source, target)
+        expected = dist[target]
+        path, distance, _ = hierarchy.query(source, target)
+
+        if expected == INF or distance == INF:
+            if expected != distance:
+                mismatches.append({'source': source, 'target': target,
+                                   'dijkstra': expected, 'ch': distance})
+            continue
+
+        walked = 0.0
+        for a, b in zip(path, path[1:]):
+            weight = graph.edge_weight(a, b)
+            walked += INF if weight is None else weight
+
+        if abs(expected - distance) > tolerance or abs(walked - distance) > tolerance:
+            mismatches.append({'source': source, 'target': target, 'dijkstra': expected,
+                               'ch': distance, 'path_length': walked,
+                               'dijkstra_path': reconstruct_path(pred, source, target),
+                               'ch_path': path})
+
+    return {'pairs': pairs, 'mismatches': mismatches}
+
+
+# Filled in the background when CH_WARM_ON_START is set; requests only peek
+hierarchy_cache = DerivedCache(ContractionHierarchy.build)
+
+
+def ch_route(graph, source, target):
+    """
+    Point-to-point query on the snapshot's contraction hierarchy
+
+    Requests never build the hierarchy (seconds to minutes of contraction);
+    it is built in the background for the default snapshot when
+    CH_WARM_ON_START is set, and until then this falls back to
+    bidirectional A*. While path overrides are active the base hierarchy
+    answers pairs whose route avoids the overridden paths and the rest
+    are searched.
+    """
+    hierarchy = hierarchy_cache.peek(base_graph(graph))
+    if hierarchy is not None:
+        path, distance, settled = hierarchy.query(source, target)
+        if avoids_overrides(graph, path):
+            return path, distance, settled
+    return bidirectional_astar(graph, source, target)
+
+
+register_algorithm('ch', ch_route)
@@ -0,0 +1,105 @@
+"""
+Routing Engine
+Single entry point for route queries from the API, scripts and analytics
+"""
+
+from routing.graph import BUILDING
+from routing.profiles import DEFAULT_PROFILE, DEFAULT_METRIC, get_profile_graph
+from routing.search import INF, find_path
+
+
+class RoutingEngine:
+    """
+    Route queries over one shared graph snapshot
+
+    The snapshot comes from the per-worker caches (one per profile and
+    cost metric, rebuilt only when the graph version changes, with the
+    path overlay applied), so an engine is cheap to create per request.
+    Searches go through the ALGORITHMS registry; new engines plug in
+    with routing.search.register_algorithm.
+    """
+
+    def __init__(self, graph=None):
+        self.graph = graph
+
+    @classmethod
+    def current(cls, profile=DEFAULT_PROFILE, metric=DEFAULT_METRIC):
+        """Engine on the cached snapshot of a profile and metric for the current graph version"""
+        return cls(get_profile_graph(profile, metric))
+
+    def load(self, profile=DEFAULT_PROFILE, metric=DEFAULT_METRIC):
+        """Switch to the cached snapshot of a profile and metric"""
+        self.graph = get_profile_graph(profile, metric)
+
+    @property
+    def version(self):
+        return self.graph.version if self.graph is not None else None
+
+    @property
+    def overlay_fingerprint(self):
+        """Fingerprint of the path overrides applied to the snapshot (None without any)"""
+        return getattr(self.graph, 'overlay_fingerprint', None)
+
+    def route(self, source, target, algorithm='dijkstra'):
+        """
+        Route between two dense node ids
+
+        Returns:
+            tuple: (path node ids or None, total cost, settled node count)
+        """
+        if source is None or target is None:
+            return None, INF, 0
+        return find_path(self.graph, source, target, algorithm)
+
+    def route_buildings(self, start_building_id, end_building_id, algorithm='dijkstra'):
+        """
+        Route between two buildings
+
+        Returns:
+            tuple: (path node ids or None, total cost, settled node count)
+        """
+        return self.route(self.graph.building_node(start_building_id),
+                          self.graph.building_node(end_building_id), algorithm)
+
+    def buildings_on(self, path_nodes):
+        """Building ids along a node path, in order"""
+        graph = self.graph
+        return [graph.node_ref[node] for node in path_nodes if graph.node_kind[node] == BUILDING]
+
+    def totals(self, path_nodes):
+        """Walking metres and travel seconds along a node path, summed per edge"""
+        graph = self.graph
+        edges = graph.path_edges(path_nodes)
+        return sum(graph.distances[edge] for edge in edges), sum(graph.times[edge] for edge in edges)
+
+    def route_details(self, path_nodes):
+        """
+        Convert node ids to detailed route information
+
+        Segment distances and path metadata come from the edges of the
+        cached graph, so no further database queries are needed.
+        """
+        if not path_nodes:
+            return []
+
+        graph = self.graph
+        edges = graph.path_edges(path_nodes)
+        route_details = []
+        for i, node_id in enumerate(path_nodes):
+            node_info = graph.node_info(node_id)
+
+            # Outgoing segment details if not last node
+            if i < len(edges) and edges[i] is not None:
+                node_info['distance_to_next'] = graph.distances[edges[i]]
+                node_info['time_to_next'] = round(graph.times[edges[i]], 1)
+                node_info.update(graph.edge_info(edges[i]))
+            else:
+                node_info['distance_to_next'] = 0
+                node_info['time_to_next'] = 0
+                node_info.update({'path_id': None, 'path_type': None, 'accessibility': None})
+
+            node_info['sequence'] = i + 1
+            route_details.append(node_info)
+
+        return route_details
+
@@ -0,0 +1,238 @@
+"""
+Facility Index
+Facility -> building lookups, nearest-target search and evacuation plans
+"""
+
+import heapq
+import re
+import time
+from array import array
+from extensions import db
+from models.building import Building
+from routing.cache import DerivedCache
+from routing.metrics import record_search
+from routing.search import INF
+
+GATE_FACILITY = 'gate'
+GATE_NAME = re.compile(r'\bgate\b', re.IGNORECASE)
+FACILITY_WORD = re.compile(r'[a-z0-9]+')
+
+
+def normalize_facility(name):
+    """Case- and whitespace-insensitive facility key"""
+    return ' '.join(str(name).lower().split())
+
+
+def facility_words(name):
+    """Lower-case words of a facility name with a plural s dropped from each"""
+    return tuple(word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+                 for word in FACILITY_WORD.findall(str(name).lower()))
+
+
+class FacilityIndex:
+    """
+    Maps normalized facility names to building nodes of one snapshot
+
+    Built from Building.facilities once per graph version. Gates are the
+    buildings tagged with a "Gate" facility (set from the gate rows of
+    campus_data.csv) or, for older data, named "... Gate ...".
+    """
+
+    def __init__(self, graph, facilities, gates, build_seconds=0.0):
+        self.graph = graph
+        self.version = graph.version
+        self.facilities = facilities
+        self.gates = gates
+        self.build_seconds = build_seconds
+
+    @classmethod
+    def build(cls, graph):
+        """Load building facilities for the buildings in the snapshot"""
+        started = time.perf_counter()
+        rows = db.session.query(Building.building_id, Building.name, Building.facilities).all()
+
+        facilities = {}
+        gates = []
+        for building_id, name, building_facilities in rows:
+            node = graph.building_node(building_id)
+            if node is None:
+                continue
+            keys = {normalize_facility(f) for f in building_facilities or [] if f}
+            for key in keys:
+                facilities.setdefault(key, []).append(node)
+            if GATE_FACILITY in keys or GATE_NAME.search(name or ''):
+                gates.append(node)
+
+        return cls(graph, facilities, gates, build_seconds=time.perf_counter() - started)
+
+    def buildings_with(self, facility):
+        """
+        Building nodes offering a facility
+
+        Every facility whose name contains the query as whole words matches,
+        compared without plural s, so "restroom" finds both "Restroom" and
+        "Restrooms" and "food" finds "Food Court", but "gate" does not find
+        "Gateway".
+        """
+        key = facility_words(facility)
+        if not key:
+            return []
+        nodes = set()
+        for name, members in self.facilities.items():
+            words = facility_words(name)
+            if any(words[start:start + len(key)] == key for start in range(len(words) - len(key) + 1)):
+                nodes.update(members)
+        return sorted(nodes)
+
+    def to_dict(self):
+        """Summary used by status endpoints"""
+        return {
+            'version': self.version,
+            'facilities': {name: len(nodes) for name, nodes in sorted(self.facilities.items())},
+            'gates': len(self.gates),
+            'build_ms': round(self.build_seconds * 1000, 2)
+        }
+
+
+def nearest_targets(graph, source, targets, k=1, max_distance=INF):
+    """
+    Dijkstra from source that stops once k targets are settled
+
+    One search answers "nearest X" for any number of candidates, and it
+    never leaves the ball around source that holds the k-th hit.
+
+    Args:
+        graph (RoutingGraph): CSR graph snapshot
+        source (int): Dense id of the start node
+        targets (iterable): Candidate destination nodes
+        k (int): Number of hits wanted
+        max_distance (float): Optional cutoff in metres
+
+    Returns:
+        tuple: (list of (node, distance, path) closest first, settled node count)
+    """
+    offsets = graph.offsets
+    heads = graph.targets
+    weights = graph.weights
+
+    remaining = set(targets)
+    dist = {source: 0.0}
+    pred = {source: -1}
+    done = set()
+    pq = [(0.0, source)]
+    hits = []
+    relaxed = 0
+    pushes = 1
+
+    while pq and remaining and len(hits) < k:
+        current_dist, node = heapq.heappop(pq)
+        if current_dist > max_distance:
+            break
+        if node in done:
+            continue
+        done.add(node)
+
+        if node in remaining:
+            remaining.discard(node)
+            path = []
+            step = node
+            while step != -1:
+                path.append(step)
+                step = pred[step]
+            hits.append((node, current_dist, path[::-1]))
+
+        relaxed += offsets[node + 1] - offsets[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = heads[edge]
+            new_dist = current_dist + weights[edge]
+            if new_dist < dist.get(neighbor, INF):
+                dist[neighbor] = new_dist
+                pred[neighbor] = node
+                heapq.heappush(pq, (new_dist, neighbor))
+                pushes += 1
+
+    record_search(len(done), relaxed, pushes)
+    return hits, len(done)
+
+
+class EvacuationPlan:
+    """
+    Nearest exit for every node of one snapshot
+
+    A single multi-source Dijkstra runs backwards from all gates over the
+    reverse adjacency. exit_node[u] is the closest gate reachable from u,
+    exit_dist[u] the walk to it and next_hop[u] the first node on that
+    walk, so an evacuation route is a pointer chase with no search.
+    """
+
+    def __init__(self, graph, gates, exit_node, exit_dist, next_hop, build_seconds=0.0):
+        self.graph = graph
+        self.version = graph.version
+        self.gates = gates
+        self.exit_node = exit_node
+        self.exit_dist = exit_dist
+        self.next_hop = next_hop
+        self.build_seconds = build_seconds
+
+    @classmethod
+    def build(cls, graph):
+        """Run the reverse multi-source search from every gate"""
+        started = time.perf_counter()
+        gates = facility_index_cache.get(graph).gates
+        node_count = graph.node_count
+        rev_offsets = graph.rev_offsets
+        rev_sources = graph.rev_sources
+        rev_weights = graph.rev_weights
+
+        exit_dist = array('d', [INF]) * node_count
+        exit_node = array('i', [-1]) * node_count
+        next_hop = array('i', [-1]) * node_count
+        pq = []
+        for gate in gates:
+            exit_dist[gate] = 0.0
+            exit_node[gate] = gate
+            pq.append((0.0, gate))
+        heapq.heapify(pq)
+
+        while pq:
+            current_dist, node = heapq.heappop(pq)
+            if current_dist > exit_dist[node]:
+                continue
+            for slot in range(rev_offsets[node], rev_offsets[node + 1]):
+                source = rev_sources[slot]
+                new_dist = current_dist + rev_weights[slot]
+                if new_dist < exit_dist[source]:
+                    exit_dist[source] = new_dist
+                    exit_node[source] = exit_node[node]
+                    next_hop[source] = node
+                    heapq.heappush(pq, (new_dist, source))
+
+        return cls(graph, list(gates), exit_node, exit_dist, next_hop,
+                   build_seconds=time.perf_counter() - started)
+
+    def route(self, node):
+        """
+        Walk to the nearest exit from a node
+
+        Returns:
+            tuple: (path node ids or None, total distance)
+        """
+        if self.exit_node[node] == -1:
+            return None, INF
+        path = [node]
+        while self.next_hop[path[-1]] != -1:
+            path.append(self.next_hop[path[-1]])
+        return path, self.exit_dist[node]
+
+    def to_dict(self):
+        """Summary used by status endpoints"""
+        return {
+            'version': self.version,
+            'gates': len(self.gates),
+            'covered_nodes': sum(1 for node in self.exit_node if node != -1),
+            'build_ms': round(self.build_seconds * 1000, 2)
+        }
+
+
+facility_index_cache = DerivedCache(FacilityIndex.build, weight_independent=True)
+evacuation_cache = DerivedCache(EvacuationPlan.build)
@@ -0,0 +1,119 @@
+"""
+Geographic Helpers
+Great-circle distances and route geometry encoding for campus coordinates
+"""
+
+import math
+
+EARTH_RADIUS_M = 6371000  # Earth radius in meters
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """Calculate distance between two GPS coordinates in meters"""
+    lat1_rad = math.radians(float(lat1))
+    lat2_rad = math.radians(float(lat2))
+    delta_lat = lat2_rad - lat1_rad
+    delta_lon = math.radians(float(lon2) - float(lon1))
+
+    a = math.sin(delta_lat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+
+def encode_polyline(points, precision=5):
+    """
+    Encode (lat, lng) points in the Google encoded polyline format
+
+    Each coordinate is stored as the zigzag-encoded delta to the previous
+    point in 5-bit chunks, so closely spaced campus nodes take a few
+    characters each.
+
+    Args:
+        points (iterable): (lat, lng) pairs
+        precision (int): Decimal places kept (5 is the common default)
+
+    Returns:
+        str: Encoded polyline
+    """
+    factor = 10 ** precision
+    chunks = []
+    previous_lat = previous_lng = 0
+    for lat, lng in points:
+        lat, lng = round(lat * factor), round(lng * factor)
+        for delta in (lat - previous_lat, lng - previous_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        previous_lat, previous_lng = lat, lng
+    return ''.join(chunks)
+
+
+def decode_polyline(encoded, precision=5):
+    """Decode a Google encoded polyline into a list of (lat, lng) pairs"""
+    factor = 10 ** precision
+    points = []
+    index = 0
+    coords = [0, 0]
+    while index < len(encoded):
+        for axis in (0, 1):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            coords[axis] += ~(result >> 1) if result & 1 else result >> 1
+        points.append((coords[0] / factor, coords[1] / factor))
+    return points
+
+
+def simplify_polyline(points, tolerance):
+    """
+    Douglas-Peucker simplification of a (lat, lng) line
+
+    Points are projected to local metres (equirectangular, fine at campus
+    scale) and dropped when they lie within tolerance metres of the
+    simplified line. The first and last points are always kept.
+
+    Args:
+        points (list): (lat, lng) pairs
+        tolerance (float): Largest allowed deviation in metres (0 keeps all)
+
+    Returns:
+        list: Indexes of the points kept, in order
+    """
+    count = len(points)
+    if count <= 2 or tolerance <= 0:
+        return list(range(count))
+
+    scale_y = math.radians(1) * EARTH_RADIUS_M
+    scale_x = scale_y * math.cos(math.radians(points[0][0]))
+    xy = [(lng * scale_x, lat * scale_y) for lat, lng in points]
+
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = xy[first], xy[last]
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        worst, worst_index = tolerance, None
+        for i in range(first + 1, last):
+            x, y = xy[i]
+            if length_sq == 0:
+                distance = math.hypot(x - x1, y - y1)
+            else:
+                t = max(0.0, min(1.0, ((x - x1) * dx + (y - y1) * dy) / length_sq))
+                distance = math.hypot(x - x1 - t * dx, y - y1 - t * dy)
+            if distance > worst:
+                worst, worst_index = distance, i
+        if worst_index is not None:
+            keep[worst_index] = True
+            stack.append((first, worst_index))
+            stack.append((worst_index, last))
+
+    return [i for i in range(count) if keep[i]]
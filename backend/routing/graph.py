@@ -0,0 +1,378 @@
+"""
+Routing Graph Snapshot
+Immutable compressed-sparse-row (CSR) graph built once per graph version
+"""
+
+import time
+from array import array
+from extensions import db
+from models.building import Building
+from models.waypoint import Waypoint
+from models.path import Path
+
+BUILDING = 0
+WAYPOINT = 1
+
+NODE_TYPES = ('building', 'waypoint')
+NODE_PREFIXES = ('B', 'W')
+
+# Known Path.path_type values; others are appended per snapshot
+PATH_TYPES = ('walkway', 'road', 'stairs', 'elevator')
+
+WALKING_SPEED = 1.4  # meters per second on a level walkway
+
+# Fraction of walking speed kept on each path type (unknown types walk at 1.0)
+SPEED_FACTORS = {'walkway': 1.0, 'road': 1.0, 'stairs': 0.5, 'elevator': 0.8}
+
+
+def edge_seconds(distance, path_type, estimated_minutes=None):
+    """
+    Traversal time of one path in seconds
+
+    Derived from the distance and the path type's speed factor. Stored
+    Path.estimated_time values are whole minutes generated as
+    max(1, distance / 1.4 m/s), so they only override the derived time
+    when they are larger than that, i.e. when someone marked a path slower.
+    """
+    seconds = distance / (WALKING_SPEED * SPEED_FACTORS.get(path_type, 1.0))
+    if estimated_minutes:
+        stored = estimated_minutes * 60.0
+        if stored > max(60.0, distance / WALKING_SPEED):
+            seconds = max(seconds, stored)
+    return seconds
+
+
+class RoutingGraph:
+    """
+    Read-only snapshot of the campus graph
+
+    Nodes get dense integer ids: buildings first, then waypoints. The
+    outgoing edges of node u are targets[offsets[u]:offsets[u + 1]] with
+    matching weights (metres), exactly as directed in the paths table.
+    Side tables map each integer id back to its building/waypoint row,
+    and per-edge arrays keep the path_id, path type code and
+    accessibility flag of every edge, plus its traversal time in seconds.
+    The reverse adjacency (rev_offsets/rev_sources/rev_weights) lists the
+    incoming edges of each node for backward searches; rev_edges maps each
+    reverse slot to its forward edge index.
+    Routing profiles and cost metrics compile their own snapshot over the
+    same nodes: weights then hold the search cost while distances keeps the
+    walking metres of each edge (for the base graph both are the same array).
+    Snapshots are never mutated after construction, so one instance can
+    be shared by every request thread. Any numeric array may also be a
+    read-only memoryview into a memory-mapped snapshot file (see
+    routing.snapshot).
+    """
+
+    def __init__(self, version, node_kind, node_ref, names, codes, lat, lng,
+                 offsets, targets, weights, path_ids, type_codes, accessible,
+                 path_types=PATH_TYPES, build_seconds=0.0, distances=None, times=None,
+                 profile='default', metric='distance', reverse=None, built_at=None):
+        self.version = version
+        self.profile = profile
+        self.metric = metric
+
+        # Node side tables
+        self.node_kind = node_kind
+        self.node_ref = node_ref
+        self.names = names
+        self.codes = codes
+        self.lat = lat
+        self.lng = lng
+        self.building_index = {}
+        self.waypoint_index = {}
+        for i, (kind, ref) in enumerate(zip(node_kind, node_ref)):
+            if kind == BUILDING:
+                self.building_index[ref] = i
+            else:
+                self.waypoint_index[ref] = i
+
+        # CSR adjacency
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.distances = distances if distances is not None else weights
+
+        # Per-edge metadata
+        self.path_ids = path_ids
+        self.type_codes = type_codes
+        self.accessible = accessible
+        self.path_types = tuple(path_types)
+        if times is None:
+            times = array('d', (edge_seconds(self.distances[edge], self.path_types[type_codes[edge]])
+                                for edge in range(len(targets))))
+        self.times = times
+
+        if reverse is None:
+            self._build_reverse()
+        else:
+            self.rev_offsets, self.rev_sources, self.rev_weights, self.rev_edges = reverse
+
+        # Profile/metric variants loaded ready-made from a binary snapshot
+        self.precompiled = {}
+
+        self.built_at = built_at if built_at is not None else time.time()
+        self.build_seconds = build_seconds
+
+    def __getstate__(self):
+        """Copy memory-mapped arrays so the snapshot can be sent to process pools"""
+        state = dict(self.__dict__)
+        for key, value in state.items():
+            if isinstance(value, memoryview):
+                state[key] = array(value.format, value)
+        if self.distances is self.weights:
+            state['distances'] = state['weights']
+        state['precompiled'] = {}
+        state.pop('_mmap', None)
+        return state
+
+    def _build_reverse(self):
+        """Counting sort of the forward edges by target node"""
+        node_count = len(self.node_kind)
+        edge_count = len(self.targets)
+        rev_offsets = array('i', bytes(4 * (node_count + 1)))
+        for target in self.targets:
+            rev_offsets[target + 1] += 1
+        for i in range(node_count):
+            rev_offsets[i + 1] += rev_offsets[i]
+
+        rev_sources = array('i', bytes(4 * edge_count))
+        rev_weights = array('d', bytes(8 * edge_count))
+        rev_edges = array('i', bytes(4 * edge_count))
+        cursor = array('i', rev_offsets[:node_count])
+        offsets = self.offsets
+        for source in range(node_count):
+            for edge in range(offsets[source], offsets[source + 1]):
+                target = self.targets[edge]
+                slot = cursor[target]
+                rev_sources[slot] = source
+                rev_weights[slot] = self.weights[edge]
+                rev_edges[slot] = edge
+                cursor[target] = slot + 1
+
+        self.rev_offsets = rev_offsets
+        self.rev_sources = rev_sources
+        self.rev_weights = rev_weights
+        self.rev_edges = rev_edges
+
+    @property
+    def variant(self):
+        """(profile, metric) pair identifying this compiled snapshot"""
+        return self.profile, self.metric
+
+    @property
+    def node_count(self):
+        return len(self.node_kind)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    @classmethod
+    def from_rows(cls, version, buildings, waypoints, paths, build_started=None):
+        """
+        Build a snapshot from plain row tuples
+
+        Args:
+            version (int): Graph version the rows belong to
+            buildings (iterable): (building_id, name, code, lat, lng)
+            waypoints (iterable): (waypoint_id, name, code, lat, lng)
+            paths (iterable): (src_building, src_waypoint, dst_building,
+                dst_waypoint, distance[, path_id, path_type, accessibility,
+                estimated_time])
+
+        Returns:
+            RoutingGraph: New immutable snapshot
+        """
+        started = build_started if build_started is not None else time.perf_counter()
+
+        node_kind = array('b')
+        node_ref = array('i')
+        names = []
+        codes = []
+        lat = array('d')
+        lng = array('d')
+        index = ({}, {})
+
+        for kind, rows in ((BUILDING, buildings), (WAYPOINT, waypoints)):
+            for ref, name, code, node_lat, node_lng in rows:
+                index[kind][ref] = len(node_kind)
+                node_kind.append(kind)
+                node_ref.append(ref)
+                names.append(name)
+                codes.append(code)
+                lat.append(float(node_lat))
+                lng.append(float(node_lng))
+
+        # Resolve endpoints to dense ids, dropping dangling paths
+        path_types = list(PATH_TYPES)
+        type_lookup = {name: code for code, name in enumerate(path_types)}
+        edges = []
+        for src_building, src_waypoint, dst_building, dst_waypoint, distance, *meta in paths:
+            if src_building:
+                source = index[BUILDING].get(src_building)
+            elif src_waypoint:
+                source = index[WAYPOINT].get(src_waypoint)
+            else:
+                continue
+
+            if dst_building:
+                dest = index[BUILDING].get(dst_building)
+            elif dst_waypoint:
+                dest = index[WAYPOINT].get(dst_waypoint)
+            else:
+                continue
+
+            if source is None or dest is None:
+                continue
+
+            path_id, path_type, accessibility, estimated_time = (meta + [None] * 4)[:4]
+            path_type = path_type or 'walkway'
+            if path_type not in type_lookup:
+                type_lookup[path_type] = len(path_types)
+                path_types.append(path_type)
+
+            distance = float(distance)
+            edges.append((source, dest, distance,
+                          path_id if path_id is not None else -1,
+                          type_lookup[path_type],
+                          accessibility is not False,
+                          edge_seconds(distance, path_type, estimated_time)))
+
+        # Counting sort of edges by source node
+        node_count = len(node_kind)
+        offsets = array('i', bytes(4 * (node_count + 1)))
+        for edge in edges:
+            offsets[edge[0] + 1] += 1
+        for i in range(node_count):
+            offsets[i + 1] += offsets[i]
+
+        edge_count = len(edges)
+        targets = array('i', bytes(4 * edge_count))
+        weights = array('d', bytes(8 * edge_count))
+        path_ids = array('i', bytes(4 * edge_count))
+        type_codes = array('b', bytes(edge_count))
+        accessible = array('b', bytes(edge_count))
+        times = array('d', bytes(8 * edge_count))
+        cursor = array('i', offsets[:node_count])
+        for source, dest, distance, path_id, type_code, is_accessible, seconds in edges:
+            slot = cursor[source]
+            targets[slot] = dest
+            weights[slot] = distance
+            path_ids[slot] = path_id
+            type_codes[slot] = type_code
+            accessible[slot] = is_accessible
+            times[slot] = seconds
+            cursor[source] = slot + 1
+
+        return cls(version, node_kind, node_ref, names, codes, lat, lng,
+                   offsets, targets, weights, path_ids, type_codes, accessible,
+                   path_types=path_types, build_seconds=time.perf_counter() - started,
+                   times=times)
+
+    @classmethod
+    def from_database(cls, version):
+        """Load buildings, waypoints and paths into a new snapshot"""
+        started = time.perf_counter()
+
+        buildings = db.session.query(
+            Building.building_id, Building.name, Building.code,
+            Building.latitude, Building.longitude
+        ).all()
+        waypoints = db.session.query(
+            Waypoint.waypoint_id, Waypoint.name, Waypoint.code,
+            Waypoint.latitude, Waypoint.longitude
+        ).all()
+        paths = db.session.query(
+            Path.source_building_id, Path.source_waypoint_id,
+            Path.destination_building_id, Path.destination_waypoint_id,
+            Path.distance, Path.path_id, Path.path_type, Path.accessibility,
+            Path.estimated_time
+        ).all()
+
+        return cls.from_rows(version, buildings, waypoints, paths, build_started=started)
+
+    def building_node(self, building_id):
+        """Dense node id for a building, or None if unknown"""
+        try:
+            return self.building_index.get(int(building_id))
+        except (TypeError, ValueError):
+            return None
+
+    def neighbors(self, node):
+        """Iterate (target, weight) pairs for the outgoing edges of a node"""
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return zip(self.targets[start:end], self.weights[start:end])
+
+    def edge_index(self, source, dest):
+        """Index of the cheapest direct edge source -> dest, or None"""
+        best = None
+        targets = self.targets
+        weights = self.weights
+        for edge in range(self.offsets[source], self.offsets[source + 1]):
+            if targets[edge] == dest and (best is None or weights[edge] < weights[best]):
+                best = edge
+        return best
+
+    def edge_weight(self, source, dest):
+        """Weight of the cheapest direct edge source -> dest, or None"""
+        edge = self.edge_index(source, dest)
+        return None if edge is None else self.weights[edge]
+
+    def path_edges(self, path):
+        """Edge indexes used by consecutive hops of a node path"""
+        return [self.edge_index(source, dest) for source, dest in zip(path, path[1:])]
+
+    def path_length(self, path):
+        """Walking metres along a node path (ignores profile penalties)"""
+        return sum(self.distances[edge] for edge in self.path_edges(path) if edge is not None)
+
+    def path_time(self, path):
+        """Traversal seconds along a node path, summed per edge"""
+        return sum(self.times[edge] for edge in self.path_edges(path) if edge is not None)
+
+    def edge_info(self, edge):
+        """Path metadata of one edge in the shape used by route responses"""
+        return {
+            'path_id': self.path_ids[edge] if self.path_ids[edge] != -1 else None,
+            'path_type': self.path_types[self.type_codes[edge]],
+            'accessibility': bool(self.accessible[edge])
+        }
+
+    def node_key(self, node):
+        """Legacy string key ("B12" / "W101") for a dense node id"""
+        return f"{NODE_PREFIXES[self.node_kind[node]]}{self.node_ref[node]}"
+
+    def node_info(self, node):
+        """Node details in the shape used by route responses"""
+        return {
+            'type': NODE_TYPES[self.node_kind[node]],
+            'id': self.node_ref[node],
+            'name': self.names[node],
+            'code': self.codes[node],
+            'lat': self.lat[node],
+            'lng': self.lng[node]
+        }
+
+    def memory_bytes(self):
+        """Approximate size of the numeric arrays in bytes"""
+        arrays = (self.node_kind, self.node_ref, self.lat, self.lng,
+                  self.offsets, self.targets, self.weights,
+                  self.path_ids, self.type_codes, self.accessible, self.times,
+                  self.rev_offsets, self.rev_sources, self.rev_weights, self.rev_edges)
+        if self.distances is not self.weights:
+            arrays += (self.distances,)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def to_dict(self):
+        """Summary used by status endpoints"""
+        return {
+            'version': self.version,
+            'profile': self.profile,
+            'metric': self.metric,
+            'nodes': self.node_count,
+            'edges': self.edge_count,
+            'array_bytes': self.memory_bytes(),
+            'built_at': self.built_at,
+            'build_ms': round(self.build_seconds * 1000, 2)
+        }
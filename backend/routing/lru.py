@@ -0,0 +1,96 @@
+"""
+LRU Cache
+Bounded, thread-safe least-recently-used cache with hit/miss counters
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Least-recently-used mapping with a fixed capacity"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None, valid=None):
+        """
+        Return the cached value and mark it as recently used
+
+        When valid is given, an entry it rejects is dropped and counted
+        as a miss.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if valid is not None and not valid(value):
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries if full"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize):
+        """Change the capacity, evicting entries if it shrank"""
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > max(maxsize, 0):
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (counters are kept)"""
+        with self._lock:
+            self._data.clear()
+
+    def replace_where(self, func):
+        """
+        Swap every value for func(value) in one pass under the lock
+
+        Entries for which func returns None are dropped; returns how many.
+        """
+        with self._lock:
+            dropped = 0
+            for key, value in list(self._data.items()):
+                value = func(value)
+                if value is None:
+                    del self._data[key]
+                    dropped += 1
+                else:
+                    self._data[key] = value
+        return dropped
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Counters for sizing the cache"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,169 @@
+"""
+Routing Metrics
+Per-query search counters and timings, aggregated into histograms
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds; the last bucket catches everything above
+TIME_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+COUNT_BUCKETS = (1, 10, 100, 1000, 10000, 100000, 1000000)
+
+_local = threading.local()
+
+
+class QueryStats:
+    """
+    Counters and timings of one navigation request
+
+    Searches report into the stats of the request running on their thread
+    (see record_search), so engine functions need no extra parameters.
+    """
+
+    def __init__(self):
+        self.counters = {'searches': 0, 'settled_nodes': 0, 'edges_relaxed': 0, 'heap_pushes': 0}
+        self.timings = {}
+        self.started = time.perf_counter()
+
+    def add(self, **counters):
+        """Increase counters by the given amounts"""
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def timer(self, name):
+        """Add the wall time of the block to timings[name] (milliseconds)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + (time.perf_counter() - started) * 1000
+
+    def to_dict(self):
+        """Counters and timings so far, in the shape of the debug response block"""
+        timings = {name: round(value, 3) for name, value in self.timings.items()}
+        timings['total_ms'] = round((time.perf_counter() - self.started) * 1000, 3)
+        return {**self.counters, **timings}
+
+
+def start_query():
+    """Begin collecting stats for the request on this thread"""
+    stats = QueryStats()
+    _local.stats = stats
+    return stats
+
+
+def current_query():
+    """Stats of the request on this thread, or None outside an instrumented request"""
+    return getattr(_local, 'stats', None)
+
+
+def finish_query(endpoint):
+    """Stop collecting on this thread and add the request to the histograms"""
+    stats = current_query()
+    _local.stats = None
+    if stats is not None:
+        metrics_registry.observe(endpoint, stats.to_dict())
+    return stats
+
+
+def record_search(settled, relaxed, pushes):
+    """Report one finished search to the current request, if any"""
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        counters = stats.counters
+        counters['searches'] += 1
+        counters['settled_nodes'] += settled
+        counters['edges_relaxed'] += relaxed
+        counters['heap_pushes'] += pushes
+
+
+class Histogram:
+    """Fixed-bucket histogram with count, sum and max"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.bounds) and value > self.bounds[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (max for the overflow bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': round(self.max, 3),
+            'buckets': [{'le': bound, 'count': count}
+                        for bound, count in zip(self.bounds + ('inf',), self.buckets)]
+        }
+
+
+class MetricsRegistry:
+    """
+    Histograms of every stat per endpoint, for this worker process
+
+    Each worker keeps its own registry; the metrics endpoint reports the
+    pid so samples from several workers can be told apart.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # endpoint -> {stat name -> Histogram}
+        self.started_at = time.time()
+
+    def observe(self, endpoint, values):
+        """Add one request's stats"""
+        with self._lock:
+            histograms = self._histograms.setdefault(endpoint, {})
+            for name, value in values.items():
+                histogram = histograms.get(name)
+                if histogram is None:
+                    bounds = TIME_BUCKETS_MS if name.endswith('_ms') else COUNT_BUCKETS
+                    histogram = histograms[name] = Histogram(bounds)
+                histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self.started_at = time.time()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'since': self.started_at,
+                'endpoints': {
+                    endpoint: {name: histogram.to_dict() for name, histogram in sorted(histograms.items())}
+                    for endpoint, histograms in sorted(self._histograms.items())
+                }
+            }
+
+
+metrics_registry = MetricsRegistry()
@@ -0,0 +1,319 @@
+"""
+Path Overlay
+Temporary closures and re-weights patched onto cached graph snapshots
+"""
+
+import hashlib
+import math
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from extensions import db
+from models.path import Path
+from models.path_override import PathOverride
+from routing.graph import RoutingGraph
+from routing.search import INF
+from routing.version import bump_overlay_version
+
+EDIT_ACTIONS = ('close', 'reweight', 'reopen')
+
+
+class Overlay:
+    """
+    Path overrides active at one moment for one overlay version
+
+    factors maps a path_id to the multiplier applied to the routing cost
+    of its edges (INF for a closed path). Factors are never below 1, so
+    the overlay only makes paths more expensive and every heuristic and
+    precomputed bound of the base graph stays valid. Rows that expire
+    later are kept so the next active set can be derived without a query.
+    fingerprint identifies the active set (it changes when an override
+    expires, which the overlay version does not).
+    """
+
+    def __init__(self, version, rows, now=None):
+        self.version = version
+        self.rows = rows
+        now = now or datetime.utcnow()
+        self.factors = {}
+        self.next_expiry = None
+        for path_id, closed, weight_factor, expires_at in rows:
+            if expires_at is not None:
+                if expires_at <= now:
+                    continue
+                if self.next_expiry is None or expires_at < self.next_expiry:
+                    self.next_expiry = expires_at
+            self.factors[path_id] = INF if closed else max(1.0, weight_factor or 1.0)
+
+        # Same active overrides give the same fingerprint in every worker (None when there are none)
+        self.fingerprint = (hashlib.sha1(repr(sorted(self.factors.items())).encode()).hexdigest()[:16]
+                            if self.factors else None)
+
+    @classmethod
+    def from_database(cls, version):
+        """Load every path override for an overlay version"""
+        rows = db.session.query(
+            PathOverride.path_id, PathOverride.closed,
+            PathOverride.weight_factor, PathOverride.expires_at
+        ).all()
+        return cls(version, [tuple(row) for row in rows])
+
+    def expired(self, now=None):
+        """True once an active override has run out"""
+        return self.next_expiry is not None and (now or datetime.utcnow()) >= self.next_expiry
+
+    def refreshed(self, now=None):
+        """Same rows re-evaluated at a later time"""
+        return Overlay(self.version, self.rows, now)
+
+    def changes(self, previous):
+        """
+        Compare the active factors with an earlier overlay
+
+        Returns:
+            tuple: (path_ids whose cost went up, True if any cost went down)
+        """
+        before = previous.factors if previous is not None else {}
+        raised = set()
+        lowered = False
+        for path_id in before.keys() | self.factors.keys():
+            old, new = before.get(path_id, 1.0), self.factors.get(path_id, 1.0)
+            if new > old:
+                raised.add(path_id)
+            elif new < old:
+                lowered = True
+        return raised, lowered
+
+    def apply(self, graph):
+        """
+        Snapshot with patched weights over the same CSR structure
+
+        Only the forward and reverse weight arrays are copied; nodes,
+        adjacency, distances and times are shared with graph. The patched
+        graph keeps graph as its base and the overridden path ids, so
+        structures that do not depend on weights can stay keyed on the base.
+        """
+        weights = array('d', graph.weights)
+        factors = self.factors
+        for edge, path_id in enumerate(graph.path_ids):
+            factor = factors.get(path_id)
+            if factor is not None:
+                weights[edge] = INF if factor == INF else weights[edge] * factor
+        rev_weights = array('d', (weights[edge] for edge in graph.rev_edges))
+
+        patched = RoutingGraph(
+            graph.version, graph.node_kind, graph.node_ref, graph.names, graph.codes,
+            graph.lat, graph.lng, graph.offsets, graph.targets, weights,
+            graph.path_ids, graph.type_codes, graph.accessible,
+            path_types=graph.path_types, distances=graph.distances, times=graph.times,
+            profile=graph.profile, metric=graph.metric,
+            reverse=(graph.rev_offsets, graph.rev_sources, rev_weights, graph.rev_edges),
+            built_at=graph.built_at
+        )
+        patched.overlay_version = self.version
+        patched.overlay_fingerprint = self.fingerprint
+        patched.base = graph
+        patched.overridden = frozenset(self.factors)
+        return patched
+
+    def to_dict(self):
+        """Summary used by status endpoints"""
+        return {
+            'version': self.version,
+            'closed_paths': sum(1 for factor in self.factors.values() if factor == INF),
+            'reweighted_paths': sum(1 for factor in self.factors.values() if factor != INF),
+            'next_expiry': self.next_expiry.isoformat() if self.next_expiry else None
+        }
+
+
+class OverlayCache:
+    """
+    Keeps the patched copy of each graph variant for the current overlay
+
+    One entry per (profile, metric); an entry is rebuilt when either the
+    underlying snapshot or the overlay object changes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # (profile, metric) -> (graph, overlay, patched graph)
+
+    def get(self, graph, overlay):
+        """Graph with the overlay applied (graph itself when nothing is overridden)"""
+        if overlay is None or not overlay.factors:
+            return graph
+
+        cached_graph, cached_overlay, patched = self._entries.get(graph.variant, (None, None, None))
+        if cached_graph is graph and cached_overlay is overlay:
+            return patched
+
+        with self._lock:
+            cached_graph, cached_overlay, patched = self._entries.get(graph.variant, (None, None, None))
+            if cached_graph is not graph or cached_overlay is not overlay:
+                patched = overlay.apply(graph)
+                self._entries[graph.variant] = (graph, overlay, patched)
+        return patched
+
+
+overlay_cache = OverlayCache()
+
+
+def base_graph(graph):
+    """Unpatched snapshot an overlay graph was derived from (graph itself otherwise)"""
+    return getattr(graph, 'base', graph)
+
+
+def avoids_overrides(graph, path):
+    """
+    True if a shortest path of the base graph is still shortest on graph
+
+    Overrides only make paths more expensive, so a base shortest path
+    whose edges are all untouched keeps its cost and nothing else can
+    get cheaper than it. Used to reuse base-graph precomputation (route
+    table, contraction hierarchy) while an overlay is active.
+    """
+    overridden = getattr(graph, 'overridden', None)
+    if not overridden or not path:
+        return True
+    base = base_graph(graph)
+    return not any(edge is not None and base.path_ids[edge] in overridden
+                   for edge in base.path_edges(path))
+
+
+def parse_expiry(data, now):
+    """expires_at (ISO 8601) or expires_in_minutes from an edit, as naive UTC"""
+    expires_at = data.get('expires_at')
+    minutes = data.get('expires_in_minutes')
+    if expires_at is not None and minutes is not None:
+        raise ValueError('Give either expires_at or expires_in_minutes, not both')
+
+    if minutes is not None:
+        if (not isinstance(minutes, (int, float)) or isinstance(minutes, bool)
+                or not math.isfinite(minutes) or minutes <= 0):
+            raise ValueError('expires_in_minutes must be a positive number')
+        return now + timedelta(minutes=minutes)
+
+    if expires_at is not None:
+        try:
+            expires = datetime.fromisoformat(str(expires_at).replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError('expires_at must be an ISO 8601 timestamp')
+        if expires.tzinfo is not None:
+            expires = expires.astimezone(timezone.utc).replace(tzinfo=None)
+        if expires <= now:
+            raise ValueError('expires_at must be in the future')
+        return expires
+
+    return None
+
+
+def parse_edit(data, now):
+    """
+    Validate one override edit
+
+    Args:
+        data (dict): path_id, action (close/reweight/reopen), weight_factor
+            (reweight only, >= 1), reason, expires_at or expires_in_minutes
+        now (datetime): Naive UTC reference time
+
+    Returns:
+        dict: Normalized edit
+
+    Raises:
+        ValueError: If the edit is malformed
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Each edit must be an object')
+
+    action = data.get('action')
+    if action not in EDIT_ACTIONS:
+        raise ValueError(f"action must be one of: {', '.join(EDIT_ACTIONS)}")
+
+    path_id = data.get('path_id')
+    if not isinstance(path_id, int) or isinstance(path_id, bool):
+        raise ValueError('path_id must be an integer')
+
+    edit = {'path_id': path_id, 'action': action}
+    if action == 'reopen':
+        return edit
+
+    weight_factor = 1.0
+    if action == 'reweight':
+        weight_factor = data.get('weight_factor')
+        if (not isinstance(weight_factor, (int, float)) or isinstance(weight_factor, bool)
+                or not math.isfinite(weight_factor) or weight_factor < 1.0):
+            raise ValueError('weight_factor must be a number >= 1 (edit the path itself to shorten it)')
+
+    reason = data.get('reason')
+    edit.update({
+        'closed': action == 'close',
+        'weight_factor': float(weight_factor),
+        'reason': str(reason)[:200] if reason else None,
+        'expires_at': parse_expiry(data, now)
+    })
+    return edit
+
+
+def apply_path_edits(edits, user_id=None, session=None):
+    """
+    Apply override edits in one transaction with a single overlay version bump
+
+    The caller commits (or rolls back) the session.
+
+    Args:
+        edits (list): Raw edits, see parse_edit
+        user_id (int): Admin making the change
+        session: SQLAlchemy session (defaults to db.session)
+
+    Returns:
+        list: Resulting override dicts, one per edited path (reopened
+            paths as {'path_id': ..., 'reopened': True})
+
+    Raises:
+        ValueError: If an edit is malformed
+        LookupError: If an edit names an unknown path (args[0] lists them)
+    """
+    session = session or db.session
+    now = datetime.utcnow()
+
+    # The batch lands atomically, so only the last edit of each path matters
+    final = {}
+    for edit in edits:
+        edit = parse_edit(edit, now)
+        final.pop(edit['path_id'], None)
+        final[edit['path_id']] = edit
+
+    path_ids = set(final)
+    known = {path_id for (path_id,) in session.query(Path.path_id).filter(Path.path_id.in_(path_ids))}
+    missing = sorted(path_ids - known)
+    if missing:
+        raise LookupError(missing)
+
+    existing = {
+        override.path_id: override
+        for override in session.query(PathOverride).filter(PathOverride.path_id.in_(path_ids))
+    }
+
+    results = []
+    for edit in final.values():
+        override = existing.get(edit['path_id'])
+        if edit['action'] == 'reopen':
+            if override is not None:
+                session.delete(override)
+            results.append({'path_id': edit['path_id'], 'reopened': True})
+            continue
+
+        if override is None:
+            override = PathOverride(path_id=edit['path_id'])
+            session.add(override)
+        override.closed = edit['closed']
+        override.weight_factor = edit['weight_factor']
+        override.reason = edit['reason']
+        override.expires_at = edit['expires_at']
+        override.created_by = user_id
+        override.updated_at = now
+        results.append(override)
+
+    session.flush()
+    bump_overlay_version(session)
+    return [result if isinstance(result, dict) else result.to_dict() for result in results]
@@ -0,0 +1,162 @@
+"""
+Routing Profiles and Cost Metrics
+Per-profile, per-metric graph snapshots compiled from the base CSR graph
+"""
+
+import threading
+import time
+from array import array
+from routing.cache import DerivedCache, graph_cache
+from routing.overlay import overlay_cache
+from routing.graph import RoutingGraph, WALKING_SPEED
+
+DEFAULT_PROFILE = 'default'
+DEFAULT_METRIC = 'distance'
+
+# exclude: path types the profile never uses
+# accessible_only: drop paths flagged as not accessible
+# penalties: cost multipliers per path type (>= 1 so A* stays admissible)
+PROFILES = {
+    'default': {
+        'description': 'Shortest walk on any path'
+    },
+    'wheelchair': {
+        'description': 'Accessible paths only, no stairs',
+        'exclude': ('stairs',),
+        'accessible_only': True
+    },
+    'no_stairs': {
+        'description': 'Avoid stairs (elevators allowed)',
+        'exclude': ('stairs',)
+    },
+    'prefer_walkways': {
+        'description': 'Prefer dedicated walkways over roads and stairs',
+        'penalties': {'road': 1.5, 'stairs': 1.25}
+    }
+}
+
+# Share of travel time in the cost of each metric. Time is expressed in
+# walkway-equivalent metres (seconds * WALKING_SPEED), which is never
+# below the edge length, so the haversine A* heuristic stays admissible.
+METRICS = {
+    'distance': 0.0,
+    'time': 1.0,
+    'balanced': 0.5
+}
+
+
+def edge_costs(graph, metric):
+    """Per-edge base cost of a metric on the base snapshot"""
+    time_share = METRICS[metric]
+    if time_share == 0.0:
+        return graph.distances
+    return array('d', ((1.0 - time_share) * distance + time_share * seconds * WALKING_SPEED
+                       for distance, seconds in zip(graph.distances, graph.times)))
+
+
+def compile_profile(graph, name, metric=DEFAULT_METRIC):
+    """
+    Build the filtered / re-weighted snapshot of one profile and metric
+
+    Args:
+        graph (RoutingGraph): Base snapshot
+        name (str): Key in PROFILES
+        metric (str): Key in METRICS
+
+    Returns:
+        RoutingGraph: Snapshot over the same nodes with the variant's edges
+    """
+    started = time.perf_counter()
+    spec = PROFILES[name]
+    excluded = {code for code, path_type in enumerate(graph.path_types)
+                if path_type in spec.get('exclude', ())}
+    penalties = spec.get('penalties', {})
+    factors = [max(1.0, penalties.get(path_type, 1.0)) for path_type in graph.path_types]
+    accessible_only = spec.get('accessible_only', False)
+    costs = edge_costs(graph, metric)
+
+    offsets = array('i', [0])
+    targets = array('i')
+    weights = array('d')
+    distances = array('d')
+    times = array('d')
+    path_ids = array('i')
+    type_codes = array('b')
+    accessible = array('b')
+
+    for node in range(graph.node_count):
+        for edge in range(graph.offsets[node], graph.offsets[node + 1]):
+            type_code = graph.type_codes[edge]
+            if type_code in excluded or (accessible_only and not graph.accessible[edge]):
+                continue
+            targets.append(graph.targets[edge])
+            weights.append(costs[edge] * factors[type_code])
+            distances.append(graph.distances[edge])
+            times.append(graph.times[edge])
+            path_ids.append(graph.path_ids[edge])
+            type_codes.append(type_code)
+            accessible.append(graph.accessible[edge])
+        offsets.append(len(targets))
+
+    reweighted = bool(penalties) or costs is not graph.distances
+    return RoutingGraph(graph.version, graph.node_kind, graph.node_ref, graph.names, graph.codes,
+                        graph.lat, graph.lng, offsets, targets, weights, path_ids, type_codes,
+                        accessible, path_types=graph.path_types,
+                        build_seconds=time.perf_counter() - started,
+                        distances=distances if reweighted else None, times=times,
+                        profile=name, metric=metric)
+
+
+class ProfileGraphs:
+    """
+    Compiled variants of one base snapshot
+
+    Each (profile, metric) pair is compiled on first use (or taken ready-made
+    from a binary snapshot) and then reused until the base snapshot
+    changes, so switching profile or metric costs nothing per request.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self._lock = threading.Lock()
+        self._graphs = {**base.precompiled, (DEFAULT_PROFILE, DEFAULT_METRIC): base}
+
+    def get(self, profile, metric):
+        graph = self._graphs.get((profile, metric))
+        if graph is not None:
+            return graph
+
+        with self._lock:
+            graph = self._graphs.get((profile, metric))
+            if graph is None:
+                graph = compile_profile(self.base, profile, metric)
+                self._graphs = {**self._graphs, (profile, metric): graph}
+        return graph
+
+    def compiled(self):
+        """Variants built so far"""
+        return [graph.to_dict() for graph in self._graphs.values()]
+
+
+profile_graphs_cache = DerivedCache(ProfileGraphs)
+
+
+def get_profile_graph(profile=DEFAULT_PROFILE, metric=DEFAULT_METRIC):
+    """
+    Shared routing graph of a profile and cost metric for the current graph version
+
+    Variants are compiled from the unpatched base snapshot and the path
+    overlay is applied on top, so an override change never recompiles them.
+    """
+    base = graph_cache.get()
+    graph = base
+    if profile != DEFAULT_PROFILE or metric != DEFAULT_METRIC:
+        graph = profile_graphs_cache.get(base).get(profile, metric)
+    return overlay_cache.get(graph, graph_cache.overlay)
+
+
+def compile_all(base):
+    """Base snapshot followed by every other profile/metric variant"""
+    variants = profile_graphs_cache.get(base)
+    return [base] + [variants.get(profile, metric) for profile in PROFILES for metric in METRICS
+                     if (profile, metric) != (DEFAULT_PROFILE, DEFAULT_METRIC)]
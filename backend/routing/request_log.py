@@ -0,0 +1,228 @@
+"""
+Route Request Log
+Batched, non-blocking record of route lookups and the popularity folded from it
+"""
+
+import atexit
+import threading
+from collections import deque
+from datetime import datetime
+from sqlalchemy import case, func, insert
+from extensions import db
+from models.route_request import RouteRequest, RoutePopularity
+from routing.engine import RoutingEngine
+
+
+class RouteLog:
+    """
+    In-memory buffer of route requests written to route_requests in batches
+
+    record() only appends to a bounded deque, so a request never waits on
+    the database; a daemon thread per worker process inserts the pending
+    entries every flush_seconds, or sooner once batch_size are waiting.
+    When the buffer is full the oldest entries are dropped and counted.
+    """
+
+    def __init__(self, batch_size=500, flush_seconds=5.0, max_pending=10000):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._pending = deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._app = None
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def configure(self, app):
+        """Take batch sizes from the app config and remember the app for the writer thread"""
+        self._app = app
+        self.batch_size = app.config.get('ROUTE_LOG_BATCH_SIZE', self.batch_size)
+        self.flush_seconds = app.config.get('ROUTE_LOG_FLUSH_SECONDS', self.flush_seconds)
+        max_pending = app.config.get('ROUTE_LOG_MAX_PENDING', self._pending.maxlen)
+        with self._lock:
+            self._pending = deque(self._pending, maxlen=max_pending)
+
+    def record(self, start_building_id, end_building_id, profile, metric, algorithm,
+               latency_ms, cache_hit):
+        """Queue one served request (never blocks on I/O)"""
+        entry = {
+            'requested_at': datetime.utcnow(),
+            'start_building_id': start_building_id,
+            'end_building_id': end_building_id,
+            'profile': profile,
+            'metric': metric,
+            'algorithm': algorithm,
+            'latency_ms': latency_ms,
+            'cache_hit': cache_hit
+        }
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append(entry)
+            pending = len(self._pending)
+
+        # Started lazily so every forked worker gets its own writer
+        if self._thread is None or not self._thread.is_alive():
+            self._start()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _start(self):
+        with self._lock:
+            if self._app is None or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._thread = threading.Thread(target=self._run, name='route-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def _take(self):
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+        return batch
+
+    def flush(self):
+        """Write everything pending in one insert; returns the rows written"""
+        batch = self._take()
+        if not batch or self._app is None:
+            return 0
+
+        with self._app.app_context():
+            try:
+                db.session.execute(insert(RouteRequest.__table__), batch)
+                db.session.commit()
+                self.written += len(batch)
+                return len(batch)
+            except Exception as e:
+                db.session.rollback()
+                self.failed += len(batch)
+                print(f"Error writing route request log: {str(e)}")
+                return 0
+            finally:
+                db.session.remove()
+
+    def to_dict(self):
+        """Counters used by status endpoints"""
+        return {
+            'pending': len(self._pending),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batch_size': self.batch_size,
+            'flush_seconds': self.flush_seconds
+        }
+
+
+route_log = RouteLog()
+atexit.register(route_log.flush)
+
+
+def aggregate_route_log(session=None):
+    """
+    Fold logged requests into per-pair popularity and delete them
+
+    Only rows up to the highest id seen at the start are consumed, so
+    entries inserted meanwhile wait for the next run. Requests that
+    started from a GPS position have no origin building and are dropped.
+    The caller commits the session.
+
+    Returns:
+        dict: requests consumed and pairs updated
+    """
+    session = session or db.session
+    last_id = session.query(func.max(RouteRequest.request_id)).scalar()
+    if last_id is None:
+        return {'requests': 0, 'pairs': 0}
+
+    key = (RouteRequest.start_building_id, RouteRequest.end_building_id,
+           RouteRequest.profile, RouteRequest.metric)
+    groups = session.query(
+        *key,
+        func.count(RouteRequest.request_id),
+        func.sum(case((RouteRequest.cache_hit, 1), else_=0)),
+        func.avg(RouteRequest.latency_ms),
+        func.max(RouteRequest.requested_at)
+    ).filter(
+        RouteRequest.request_id <= last_id,
+        RouteRequest.start_building_id.isnot(None)
+    ).group_by(*key).all()
+
+    start_ids = {group[0] for group in groups}
+    existing = {
+        (row.start_building_id, row.end_building_id, row.profile, row.metric): row
+        for row in session.query(RoutePopularity).filter(RoutePopularity.start_building_id.in_(start_ids))
+    } if start_ids else {}
+
+    for start, end, profile, metric, requests, hits, latency, last_requested in groups:
+        row = existing.get((start, end, profile, metric))
+        if row is None:
+            row = RoutePopularity(start_building_id=start, end_building_id=end, profile=profile,
+                                  metric=metric, requests=0, cache_hits=0, avg_latency_ms=0.0)
+            session.add(row)
+        total = row.requests + requests
+        row.avg_latency_ms = (row.avg_latency_ms * row.requests + float(latency) * requests) / total
+        row.requests = total
+        row.cache_hits += int(hits or 0)
+        if row.last_requested_at is None or last_requested > row.last_requested_at:
+            row.last_requested_at = last_requested
+
+    consumed = session.query(RouteRequest).filter(RouteRequest.request_id <= last_id).delete(
+        synchronize_session=False)
+    return {'requests': consumed, 'pairs': len(groups)}
+
+
+def popular_pairs(limit):
+    """Most requested pairs, most popular first"""
+    return RoutePopularity.query.order_by(
+        RoutePopularity.requests.desc(), RoutePopularity.last_requested_at.desc()
+    ).limit(limit).all()
+
+
+def edge_usage(pairs, algorithm='dijkstra'):
+    """
+    Estimated path usage from the popular pairs
+
+    Each pair is routed on the current graph of its profile and metric
+    and its request count is added to every path the route walks.
+
+    Args:
+        pairs (list): RoutePopularity rows
+
+    Returns:
+        list: {path_id, requests, from: [lat, lng], to: [lat, lng]}, busiest first
+    """
+    usage = {}
+    engines = {}
+    for pair in pairs:
+        variant = (pair.profile, pair.metric)
+        engine = engines.get(variant)
+        if engine is None:
+            engine = engines[variant] = RoutingEngine.current(*variant)
+        path, _, _ = engine.route_buildings(pair.start_building_id, pair.end_building_id, algorithm)
+        if path is None:
+            continue
+
+        graph = engine.graph
+        for source, edge in zip(path, graph.path_edges(path)):
+            path_id = graph.path_ids[edge]
+            if path_id == -1:
+                continue
+            entry = usage.get(path_id)
+            if entry is None:
+                target = graph.targets[edge]
+                entry = usage[path_id] = {
+                    'path_id': path_id,
+                    'requests': 0,
+                    'from': [graph.lat[source], graph.lng[source]],
+                    'to': [graph.lat[target], graph.lng[target]]
+                }
+            entry['requests'] += pair.requests
+
+    return sorted(usage.values(), key=lambda entry: -entry['requests'])
@@ -0,0 +1,435 @@
+"""
+Shortest Path Search
+Dijkstra, A* and bidirectional variants over the CSR routing graph
+"""
+
+import heapq
+import math
+from array import array
+from routing.geo import EARTH_RADIUS_M
+from routing.metrics import record_search
+
+INF = float('inf')
+
+# Path distances are haversine metres rounded to 2 decimals, so the
+# straight-line estimate is shrunk slightly to stay a lower bound.
+HEURISTIC_SCALE = 0.99
+
+
+def dijkstra(graph, source, target=None):
+    """
+    Dijkstra's algorithm with lazy decrease-key
+
+    A node is pushed only when its tentative distance improves, and stale
+    heap entries are skipped when popped. The search stops as soon as the
+    target (if any) is settled.
+
+    Args:
+        graph (RoutingGraph): CSR graph snapshot
+        source (int): Dense id of the start node
+        target (int): Dense id of the goal node, or None for a full tree
+
+    Returns:
+        tuple: (dist list, pred array, settled node count)
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+
+    dist = [INF] * graph.node_count
+    pred = array('i', [-1]) * graph.node_count
+    dist[source] = 0.0
+    pq = [(0.0, source)]
+    settled = relaxed = 0
+    pushes = 1
+
+    while pq:
+        current_dist, node = heapq.heappop(pq)
+
+        # Skip stale entries superseded by a shorter distance
+        if current_dist > dist[node]:
+            continue
+
+        settled += 1
+        if node == target:
+            break
+
+        relaxed += offsets[node + 1] - offsets[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            new_dist = current_dist + weights[edge]
+            if new_dist < dist[neighbor]:
+                dist[neighbor] = new_dist
+                pred[neighbor] = node
+                heapq.heappush(pq, (new_dist, neighbor))
+                pushes += 1
+
+    record_search(settled, relaxed, pushes)
+    return dist, pred, settled
+
+
+def one_to_many(graph, source, targets, with_times=False):
+    """
+    Single-source Dijkstra that stops once every target is settled
+
+    Args:
+        graph (RoutingGraph): CSR graph snapshot
+        source (int): Dense id of the start node
+        targets (list): Dense ids of the destination nodes
+        with_times (bool): Also sum the per-edge travel seconds along
+            each shortest path
+
+    Returns:
+        tuple: (distances aligned with targets, settled node count), or
+            (distances, travel seconds, settled node count) with with_times
+    """
+    offsets = graph.offsets
+    heads = graph.targets
+    weights = graph.weights
+    edge_times = graph.times
+
+    remaining = set(targets)
+    dist = [INF] * graph.node_count
+    dist[source] = 0.0
+    elapsed = [INF] * graph.node_count if with_times else None
+    if with_times:
+        elapsed[source] = 0.0
+    pq = [(0.0, source)]
+    settled = relaxed = 0
+    pushes = 1
+
+    while pq and remaining:
+        current_dist, node = heapq.heappop(pq)
+        if current_dist > dist[node]:
+            continue
+
+        settled += 1
+        remaining.discard(node)
+
+        relaxed += offsets[node + 1] - offsets[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = heads[edge]
+            new_dist = current_dist + weights[edge]
+            if new_dist < dist[neighbor]:
+                dist[neighbor] = new_dist
+                if with_times:
+                    elapsed[neighbor] = elapsed[node] + edge_times[edge]
+                heapq.heappush(pq, (new_dist, neighbor))
+                pushes += 1
+
+    record_search(settled, relaxed, pushes)
+    distances = [dist[target] if target not in remaining else INF for target in targets]
+    if with_times:
+        return distances, [elapsed[target] if target not in remaining else INF for target in targets], settled
+    return distances, settled
+
+
+def bounded_dijkstra(graph, source, max_distance, with_totals=False):
+    """
+    Single-source Dijkstra that stops at a cost cutoff
+
+    Distances live in a dict rather than a per-node list, so the cost is
+    proportional to the reachable subgraph instead of the whole campus.
+
+    Args:
+        graph (RoutingGraph): CSR graph snapshot
+        source (int): Dense id of the start node
+        max_distance (float): Cutoff on the graph's weights (metres on the
+            base graph), inclusive
+        with_totals (bool): Also sum the per-edge walking metres and
+            travel seconds along each shortest path
+
+    Returns:
+        tuple: (dict of node id -> cost for every reachable node, settled node count),
+            or (costs, dict of node id -> (metres, seconds), settled node count) with with_totals
+    """
+    offsets = graph.offsets
+    heads = graph.targets
+    weights = graph.weights
+    edge_distances = graph.distances
+    edge_times = graph.times
+
+    dist = {source: 0.0}
+    totals = {source: (0.0, 0.0)}
+    reached = {}
+    pq = [(0.0, source)]
+    relaxed = 0
+    pushes = 1
+
+    while pq:
+        current_dist, node = heapq.heappop(pq)
+        if current_dist > max_distance:
+            break
+        if node in reached:
+            continue
+        reached[node] = current_dist
+
+        relaxed += offsets[node + 1] - offsets[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = heads[edge]
+            new_dist = current_dist + weights[edge]
+            if new_dist <= max_distance and new_dist < dist.get(neighbor, INF):
+                dist[neighbor] = new_dist
+                if with_totals:
+                    metres, seconds = totals[node]
+                    totals[neighbor] = (metres + edge_distances[edge], seconds + edge_times[edge])
+                heapq.heappush(pq, (new_dist, neighbor))
+                pushes += 1
+
+    record_search(len(reached), relaxed, pushes)
+    if with_totals:
+        return reached, {node: totals[node] for node in reached}, len(reached)
+    return reached, len(reached)
+
+
+def haversine_heuristic(graph, target):
+    """
+    Build h(node): scaled great-circle metres from node to target
+
+    Edge weights are at least the straight-line distance between their
+    endpoints, so this never overestimates the remaining walk.
+    """
+    lat = graph.lat
+    lng = graph.lng
+    target_lat = math.radians(lat[target])
+    target_lng = math.radians(lng[target])
+    cos_target = math.cos(target_lat)
+    scale = 2 * EARTH_RADIUS_M * HEURISTIC_SCALE
+
+    def heuristic(node):
+        node_lat = math.radians(lat[node])
+        a = (math.sin((target_lat - node_lat) / 2) ** 2
+             + math.cos(node_lat) * cos_target * math.sin((target_lng - math.radians(lng[node])) / 2) ** 2)
+        return scale * math.asin(math.sqrt(min(1.0, a)))
+
+    return heuristic
+
+
+def astar(graph, source, target):
+    """
+    A* search guided by the haversine heuristic
+
+    Same arrays and stale-entry skipping as dijkstra(); the heap is keyed
+    by g + h so the search is pulled towards the target and settles far
+    fewer nodes on point-to-point queries.
+
+    Returns:
+        tuple: (dist list, pred array, settled node count)
+    """
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    heuristic = haversine_heuristic(graph, target)
+
+    dist = [INF] * graph.node_count
+    pred = array('i', [-1]) * graph.node_count
+    estimate = {}
+    dist[source] = 0.0
+    pq = [(heuristic(source), 0.0, source)]
+    settled = relaxed = 0
+    pushes = 1
+
+    while pq:
+        _, current_dist, node = heapq.heappop(pq)
+
+        if current_dist > dist[node]:
+            continue
+
+        settled += 1
+        if node == target:
+            break
+
+        relaxed += offsets[node + 1] - offsets[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[edge]
+            new_dist = current_dist + weights[edge]
+            if new_dist < dist[neighbor]:
+                dist[neighbor] = new_dist
+                pred[neighbor] = node
+                h = estimate.get(neighbor)
+                if h is None:
+                    h = estimate[neighbor] = heuristic(neighbor)
+                heapq.heappush(pq, (new_dist + h, new_dist, neighbor))
+                pushes += 1
+
+    record_search(settled, relaxed, pushes)
+    return dist, pred, settled
+
+
+def reconstruct_path(pred, source, target):
+    """Walk predecessor links back from target; None if target is unreachable"""
+    if source == target:
+        return [source]
+    if pred[target] == -1:
+        return None
+
+    path = [target]
+    node = target
+    while node != source:
+        node = pred[node]
+        path.append(node)
+    path.reverse()
+    return path
+
+
+def _bidirectional(graph, source, target, potential=None):
+    """
+    Bidirectional search meeting in the middle
+
+    The forward search follows outgoing edges from source, the backward
+    search follows incoming edges (reverse CSR) from target, and the side
+    with the smaller heap key is expanded next. With a potential p the
+    forward keys are g + p(v) and the backward keys g - p(v), which is
+    plain bidirectional Dijkstra on reduced edge costs. The search stops
+    once the two heap tops together can no longer beat the best meeting
+    distance found so far.
+
+    Returns:
+        tuple: (path node ids or None, total distance, settled node count)
+    """
+    if source == target:
+        record_search(1, 0, 1)
+        return [source], 0.0, 1
+
+    if potential is None:
+        def potential(node):
+            return 0.0
+
+    node_count = graph.node_count
+    sides = (
+        (graph.offsets, graph.targets, graph.weights, 1.0),
+        (graph.rev_offsets, graph.rev_sources, graph.rev_weights, -1.0),
+    )
+    dist = ([INF] * node_count, [INF] * node_count)
+    links = (array('i', [-1]) * node_count, array('i', [-1]) * node_count)
+    dist[0][source] = 0.0
+    dist[1][target] = 0.0
+    queues = ([(potential(source), 0.0, source)], [(-potential(target), 0.0, target)])
+
+    best = INF
+    meet = -1
+    settled = relaxed = 0
+    pushes = 2
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        offsets, heads, weights, sign = sides[side]
+        own_dist, other_dist = dist[side], dist[1 - side]
+        own_links = links[side]
+        pq = queues[side]
+
+        _, current_dist, node = heapq.heappop(pq)
+        if current_dist > own_dist[node]:
+            continue
+
+        settled += 1
+        relaxed += offsets[node + 1] - offsets[node]
+        for edge in range(offsets[node], offsets[node + 1]):
+            neighbor = heads[edge]
+            new_dist = current_dist + weights[edge]
+            if new_dist < own_dist[neighbor]:
+                own_dist[neighbor] = new_dist
+                own_links[neighbor] = node
+                heapq.heappush(pq, (new_dist + sign * potential(neighbor), new_dist, neighbor))
+                pushes += 1
+
+                total = new_dist + other_dist[neighbor]
+                if total < best:
+                    best = total
+                    meet = neighbor
+
+    record_search(settled, relaxed, pushes)
+    if meet == -1:
+        return None, INF, settled
+
+    # Forward half via predecessors, backward half via successors
+    path = reconstruct_path(links[0], source, meet)
+    node = meet
+    while node != target:
+        node = links[1][node]
+        path.append(node)
+
+    return path, best, settled
+
+
+def bidirectional_dijkstra(graph, source, target):
+    """Bidirectional Dijkstra on the directed path graph"""
+    return _bidirectional(graph, source, target)
+
+
+def bidirectional_astar(graph, source, target):
+    """
+    Bidirectional A* with the symmetric average potential
+
+    p(v) = (h_target(v) - h_source(v)) / 2 keeps reduced costs consistent
+    in both directions, so the Dijkstra stopping rule still applies.
+    """
+    to_target = haversine_heuristic(graph, target)
+    to_source = haversine_heuristic(graph, source)
+    cache = {}
+
+    def potential(node):
+        value = cache.get(node)
+        if value is None:
+            value = cache[node] = (to_target(node) - to_source(node)) / 2
+        return value
+
+    return _bidirectional(graph, source, target, potential)
+
+
+def _one_way(search):
+    """Adapt a (dist, pred, settled) search to the point-to-point interface"""
+    def run(graph, source, target):
+        dist, pred, settled = search(graph, source, target)
+        path = reconstruct_path(pred, source, target)
+        if path is None:
+            return None, INF, settled
+        return path, dist[target], settled
+    return run
+
+
+ALGORITHMS = {
+    'dijkstra': _one_way(dijkstra),
+    'astar': _one_way(astar),
+    'bidirectional': bidirectional_dijkstra,
+    'bidirectional_astar': bidirectional_astar
+}
+
+
+def register_algorithm(name, search):
+    """
+    Add a point-to-point search to the registry
+
+    Args:
+        name (str): Value accepted as the algorithm request parameter
+        search (callable): search(graph, source, target) returning
+            (path node ids or None, total cost, settled node count)
+    """
+    ALGORITHMS[name] = search
+
+
+def find_path(graph, source, target, algorithm='dijkstra'):
+    """
+    Point-to-point search with a selectable algorithm
+
+    Returns:
+        tuple: (list of dense node ids or None, total distance, settled nodes)
+    """
+    if not (0 <= source < graph.node_count and 0 <= target < graph.node_count):
+        return None, INF, 0
+
+    return ALGORITHMS[algorithm](graph, source, target)
+
+
+def shortest_path(graph, source, target):
+    """
+    Point-to-point shortest path
+
+    Returns:
+        tuple: (list of dense node ids, total distance) or (None, inf)
+    """
+    path, distance, _ = find_path(graph, source, target)
+    return path, distance
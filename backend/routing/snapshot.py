@@ -0,0 +1,181 @@
+"""
+Binary Graph Snapshot
+Versioned on-disk image of the routing graph, loaded via read-only mmap
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+from flask import current_app, has_app_context
+from routing.graph import RoutingGraph
+
+MAGIC = b'CXGRAPH\x00'
+FORMAT_VERSION = 1
+
+# magic, format version, graph version, metadata length
+HEADER = struct.Struct('<8sIqQ')
+
+NODE_ARRAYS = ('node_kind', 'node_ref', 'lat', 'lng')
+EDGE_ARRAYS = ('offsets', 'targets', 'weights', 'distances', 'path_ids', 'type_codes',
+               'accessible', 'times', 'rev_offsets', 'rev_sources', 'rev_weights', 'rev_edges')
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _typecode(values):
+    return values.typecode if isinstance(values, array) else values.format
+
+
+def write_snapshot(path, graphs):
+    """
+    Write graph snapshots sharing one node table to a binary file
+
+    Arrays shared between variants (node tables, distances aliasing
+    weights) are stored once. The file is written next to path and
+    renamed over it, so workers that still map the old file keep a
+    consistent image.
+
+    Args:
+        path (str): Destination file
+        graphs (list): Base snapshot first, then its profile/metric variants
+
+    Returns:
+        int: Bytes written
+    """
+    base = graphs[0]
+    sections = []
+    section_ids = {}
+
+    def add(values):
+        key = id(values)
+        if key not in section_ids:
+            section_ids[key] = len(sections)
+            sections.append(values)
+        return section_ids[key]
+
+    nodes = {name: add(getattr(base, name)) for name in NODE_ARRAYS}
+    variants = []
+    for graph in graphs:
+        variants.append({
+            'profile': graph.profile,
+            'metric': graph.metric,
+            'path_types': list(graph.path_types),
+            'arrays': {name: add(getattr(graph, name)) for name in EDGE_ARRAYS}
+        })
+
+    layout = []
+    offset = 0
+    for values in sections:
+        layout.append([_typecode(values), len(values), offset])
+        offset = _align(offset + len(values) * values.itemsize)
+
+    meta = json.dumps({
+        'built_at': base.built_at,
+        'names': base.names,
+        'codes': base.codes,
+        'nodes': nodes,
+        'variants': variants,
+        'sections': layout
+    }).encode('utf-8')
+
+    data_start = _align(HEADER.size + len(meta))
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, base.version, len(meta)))
+        f.write(meta)
+        for values, (_, _, section_offset) in zip(sections, layout):
+            f.seek(data_start + section_offset)
+            f.write(values.tobytes())
+        size = f.tell()
+    os.replace(temp_path, path)
+    return size
+
+
+def snapshot_version(path):
+    """Graph version stored in a snapshot file header"""
+    with open(path, 'rb') as f:
+        magic, format_version, version, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise ValueError(f'{path} is not a routing graph snapshot (format {FORMAT_VERSION})')
+    return version
+
+
+def load_snapshot(path):
+    """
+    Map a snapshot file read-only and wrap its arrays without copying
+
+    Every worker mapping the same file shares its physical pages; only the
+    name/code lists and the id lookup dicts are built per process.
+
+    Returns:
+        RoutingGraph: Base snapshot with its variants in precompiled
+    """
+    started = time.perf_counter()
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, format_version, version, meta_length = HEADER.unpack_from(mapped, 0)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise ValueError(f'{path} is not a routing graph snapshot (format {FORMAT_VERSION})')
+    meta = json.loads(mapped[HEADER.size:HEADER.size + meta_length])
+
+    view = memoryview(mapped)
+    data_start = _align(HEADER.size + meta_length)
+    sections = []
+    for typecode, length, offset in meta['sections']:
+        start = data_start + offset
+        sections.append(view[start:start + length * array(typecode).itemsize].cast(typecode))
+
+    nodes = {name: sections[index] for name, index in meta['nodes'].items()}
+    graphs = []
+    for variant in meta['variants']:
+        arrays = {name: sections[index] for name, index in variant['arrays'].items()}
+        distances = arrays['distances']
+        graphs.append(RoutingGraph(
+            version, nodes['node_kind'], nodes['node_ref'], meta['names'], meta['codes'],
+            nodes['lat'], nodes['lng'], arrays['offsets'], arrays['targets'], arrays['weights'],
+            arrays['path_ids'], arrays['type_codes'], arrays['accessible'],
+            path_types=variant['path_types'],
+            distances=None if variant['arrays']['distances'] == variant['arrays']['weights'] else distances,
+            times=arrays['times'], profile=variant['profile'], metric=variant['metric'],
+            reverse=(arrays['rev_offsets'], arrays['rev_sources'],
+                     arrays['rev_weights'], arrays['rev_edges']),
+            built_at=meta['built_at']
+        ))
+
+    base = graphs[0]
+    base.precompiled = {graph.variant: graph for graph in graphs[1:]}
+    base._mmap = mapped
+    base.build_seconds = time.perf_counter() - started
+    return base
+
+
+def configured_snapshot_path():
+    """ROUTING_SNAPSHOT_PATH from the app config (None disables snapshots)"""
+    if has_app_context():
+        return current_app.config.get('ROUTING_SNAPSHOT_PATH')
+    return None
+
+
+def load_graph(version):
+    """
+    Graph loader for GraphCache: binary snapshot first, database fallback
+
+    The snapshot is only used when it was compiled for the current graph
+    version; a stale or unreadable file falls back to the database.
+    """
+    path = configured_snapshot_path()
+    if path and os.path.exists(path):
+        try:
+            stored = snapshot_version(path)
+            if stored == version:
+                return load_snapshot(path)
+            print(f"Graph snapshot {path} is stale (version {stored}, current {version}), loading from database")
+        except (OSError, ValueError) as e:
+            print(f"Graph snapshot {path} unusable, loading from database: {str(e)}")
+    return RoutingGraph.from_database(version)
@@ -0,0 +1,143 @@
+"""
+Spatial Index
+Uniform grid over node coordinates for nearest-node snapping
+"""
+
+import heapq
+import math
+import time
+from routing.cache import DerivedCache
+from routing.geo import EARTH_RADIUS_M
+
+# Target occupancy used to size cells when no cell size is given
+NODES_PER_CELL = 2
+MIN_CELL_SIZE_M = 5.0
+MAX_CELL_SIZE_M = 100.0
+
+
+class GridIndex:
+    """
+    Uniform grid of routable nodes in local metric coordinates
+
+    Coordinates are projected equirectangularly around the mean latitude,
+    which is accurate to centimetres at campus scale. k-nearest queries
+    scan rings of cells outwards from the query cell and stop as soon as
+    the next ring cannot contain anything closer than the k-th hit.
+    Only nodes with outgoing edges are indexed, so every hit can start a
+    route.
+    """
+
+    def __init__(self, graph, cell_size=None):
+        started = time.perf_counter()
+        self.graph = graph
+        self.version = graph.version
+
+        offsets = graph.offsets
+        nodes = [node for node in range(graph.node_count) if offsets[node + 1] > offsets[node]]
+        mean_lat = sum(graph.lat[node] for node in nodes) / len(nodes) if nodes else 0.0
+        self.y_scale = math.radians(1) * EARTH_RADIUS_M
+        self.x_scale = self.y_scale * math.cos(math.radians(mean_lat))
+        points = [self._project(graph.lat[node], graph.lng[node]) + (node,) for node in nodes]
+
+        # Size cells for a few nodes each unless told otherwise
+        if cell_size is None:
+            cell_size = MAX_CELL_SIZE_M
+            if len(points) > 1:
+                width = max(p[0] for p in points) - min(p[0] for p in points)
+                height = max(p[1] for p in points) - min(p[1] for p in points)
+                cell_size = math.sqrt(max(width * height, 1.0) * NODES_PER_CELL / len(points))
+            cell_size = min(max(cell_size, MIN_CELL_SIZE_M), MAX_CELL_SIZE_M)
+        self.cell_size = cell_size
+
+        self.cells = {}
+        for x, y, node in points:
+            self.cells.setdefault(self._cell(x, y), []).append((x, y, node))
+
+        if self.cells:
+            cell_xs = [cx for cx, _ in self.cells]
+            cell_ys = [cy for _, cy in self.cells]
+            self.bounds = (min(cell_xs), min(cell_ys), max(cell_xs), max(cell_ys))
+        else:
+            self.bounds = None
+        self.node_count = len(nodes)
+        self.build_seconds = time.perf_counter() - started
+
+    def _project(self, lat, lng):
+        return float(lng) * self.x_scale, float(lat) * self.y_scale
+
+    def _cell(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def nearest(self, lat, lng, k=1, max_distance=None):
+        """
+        Find the k nearest indexed nodes
+
+        Args:
+            lat (float): Query latitude
+            lng (float): Query longitude
+            k (int): Number of nodes to return
+            max_distance (float): Optional search radius in metres
+
+        Returns:
+            list: (node id, distance in metres) pairs, closest first
+        """
+        if self.bounds is None or k <= 0:
+            return []
+
+        x, y = self._project(lat, lng)
+        cx, cy = self._cell(x, y)
+        min_x, min_y, max_x, max_y = self.bounds
+        last_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy)
+        limit_sq = max_distance ** 2 if max_distance is not None else math.inf
+        best = []  # max-heap via negated squared distance
+
+        # Rings that lie entirely outside the grid hold no nodes
+        ring = max(0, min_x - cx, cx - max_x, min_y - cy, cy - max_y)
+        while ring <= last_ring:
+            for cell in self._ring(cx, cy, ring):
+                for node_x, node_y, node in self.cells.get(cell, ()):
+                    dist_sq = (node_x - x) ** 2 + (node_y - y) ** 2
+                    if dist_sq > limit_sq:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-dist_sq, node))
+                    elif dist_sq < -best[0][0]:
+                        heapq.heapreplace(best, (-dist_sq, node))
+
+            # Everything outside rings 0..ring is at least ring * cell_size away
+            reach = ring * self.cell_size
+            if len(best) == k and reach * reach >= -best[0][0]:
+                break
+            if reach * reach > limit_sq:
+                break
+            ring += 1
+
+        return [(node, math.sqrt(-neg)) for neg, node in sorted(best, reverse=True)]
+
+    def _ring(self, cx, cy, ring):
+        """Cells at Chebyshev distance ring from (cx, cy), clipped to the grid"""
+        if ring == 0:
+            yield (cx, cy)
+            return
+        min_x, min_y, max_x, max_y = self.bounds
+        for y in (cy - ring, cy + ring):
+            if min_y <= y <= max_y:
+                for x in range(max(cx - ring, min_x), min(cx + ring, max_x) + 1):
+                    yield (x, y)
+        for x in (cx - ring, cx + ring):
+            if min_x <= x <= max_x:
+                for y in range(max(cy - ring + 1, min_y), min(cy + ring - 1, max_y) + 1):
+                    yield (x, y)
+
+    def to_dict(self):
+        """Summary used by status endpoints"""
+        return {
+            'version': self.version,
+            'nodes': self.node_count,
+            'cells': len(self.cells),
+            'cell_size_m': self.cell_size,
+            'build_ms': round(self.build_seconds * 1000, 2)
+        }
+
+
+spatial_index_cache = DerivedCache(GridIndex, weight_independent=True)
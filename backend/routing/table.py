@@ -0,0 +1,200 @@
+"""
+Building Route Table
+Precomputed building-to-building distances and shortest-path trees
+"""
+
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app, has_app_context
+from routing.cache import DerivedCache
+from routing.graph import BUILDING
+from routing.overlay import avoids_overrides, base_graph
+from routing.search import INF, bidirectional_astar, dijkstra, reconstruct_path, register_algorithm
+
+# Below this many buildings a process pool costs more than it saves
+PARALLEL_MIN_BUILDINGS = 32
+
+_worker_graph = None
+
+
+def _init_worker(graph):
+    """Process pool initializer: receive the graph once per worker"""
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _shortest_path_tree(source, graph=None, building_nodes=None):
+    """Full single-source search; returns building distances and the pred tree"""
+    graph = graph if graph is not None else _worker_graph
+    dist, pred, _ = dijkstra(graph, source)
+    nodes = building_nodes if building_nodes is not None else _building_nodes(graph)
+    return array('d', (dist[node] for node in nodes)), pred
+
+
+def _building_nodes(graph):
+    return [node for node in range(graph.node_count) if graph.node_kind[node] == BUILDING]
+
+
+class RouteTable:
+    """
+    All-pairs table over the buildings of one graph snapshot
+
+    dist holds a flattened building x building distance matrix and
+    trees[i] the predecessor array of the shortest-path tree rooted at
+    building row i, so a lookup is a matrix read plus a walk of the
+    path length. Unreachable pairs are stored as infinity.
+    """
+
+    def __init__(self, graph, building_nodes, dist, trees, build_seconds=0.0, workers=1):
+        self.graph = graph
+        self.version = graph.version
+        self.building_nodes = building_nodes
+        self.rows = {node: row for row, node in enumerate(building_nodes)}
+        self.dist = dist
+        self.trees = trees
+        self.build_seconds = build_seconds
+        self.workers = workers
+
+    @classmethod
+    def build(cls, graph, workers=1):
+        """
+        Run one single-source search per building
+
+        Args:
+            graph (RoutingGraph): Snapshot to precompute
+            workers (int): Process pool size; 1 runs in-process
+
+        Returns:
+            RouteTable: Table bound to this snapshot
+        """
+        started = time.perf_counter()
+        building_nodes = _building_nodes(graph)
+
+        if workers > 1 and len(building_nodes) >= PARALLEL_MIN_BUILDINGS:
+            chunksize = max(1, len(building_nodes) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(graph,)) as pool:
+                results = list(pool.map(_shortest_path_tree, building_nodes, chunksize=chunksize))
+        else:
+            workers = 1
+            results = [_shortest_path_tree(node, graph, building_nodes) for node in building_nodes]
+
+        dist = array('d')
+        trees = []
+        for row_dist, pred in results:
+            dist.extend(row_dist)
+            trees.append(pred)
+
+        return cls(graph, building_nodes, dist, trees,
+                   build_seconds=time.perf_counter() - started, workers=workers)
+
+    def covers(self, source, target):
+        """True if both nodes are buildings in this table"""
+        return source in self.rows and target in self.rows
+
+    def distance(self, source, target):
+        """Stored shortest distance between two building nodes"""
+        return self.dist[self.rows[source] * len(self.building_nodes) + self.rows[target]]
+
+    def route(self, source, target):
+        """
+        Look up a building-to-building route without searching
+
+        Returns:
+            tuple: (path node ids or None, total distance)
+        """
+        distance = self.distance(source, target)
+        if distance == INF:
+            return None, INF
+        return reconstruct_path(self.trees[self.rows[source]], source, target), distance
+
+    def memory_bytes(self):
+        """Size of the distance matrix and predecessor trees in bytes"""
+        return (self.dist.itemsize * len(self.dist)
+                + sum(tree.itemsize * len(tree) for tree in self.trees))
+
+    def to_dict(self):
+        """Summary used by status endpoints and the CLI"""
+        return {
+            'version': self.version,
+            'buildings': len(self.building_nodes),
+            'memory_bytes': self.memory_bytes(),
+            'build_ms': round(self.build_seconds * 1000, 2),
+            'workers': self.workers
+        }
+
+
+def verify_route_table(table, pairs=200, seed=0, tolerance=1e-6):
+    """
+    Compare route table lookups with plain Dijkstra on random building pairs
+
+    Returns:
+        dict: Pair count and a list of mismatches (empty when correct)
+    """
+    graph = table.graph
+    rng = random.Random(seed)
+    mismatches = []
+
+    for _ in range(pairs if table.building_nodes else 0):
+        source = rng.choice(table.building_nodes)
+        target = rng.choice(table.building_nodes)
+        dist, _, _ = dijkstra(graph, source, target)
+        expected = dist[target]
+        path, distance = table.route(source, target)
+
+        if expected == INF or distance == INF:
+            if expected != distance:
+                mismatches.append({'source': source, 'target': target,
+                                   'dijkstra': expected, 'table': distance})
+            continue
+
+        walked = 0.0
+        for a, b in zip(path, path[1:]):
+            weight = graph.edge_weight(a, b)
+            walked += INF if weight is None else weight
+
+        if abs(expected - distance) > tolerance or abs(walked - distance) > tolerance:
+            mismatches.append({'source': source, 'target': target, 'dijkstra': expected,
+                               'table': distance, 'path_length': walked, 'table_path': path})
+
+    return {'pairs': pairs, 'mismatches': mismatches}
+
+
+def configured_workers():
+    """ROUTE_TABLE_WORKERS from the app config (0 means one per CPU)"""
+    workers = 1
+    if has_app_context():
+        workers = current_app.config.get('ROUTE_TABLE_WORKERS', 1)
+    return workers or os.cpu_count() or 1
+
+
+# Filled at startup and after each graph rebuild when ROUTE_TABLE_WARM_ON_START is set; requests only peek
+route_table_cache = DerivedCache(lambda graph: RouteTable.build(graph, workers=configured_workers()))
+
+
+def table_route(graph, source, target):
+    """
+    Point-to-point lookup in the building route table
+
+    Requests never build the table (that takes one full search per
+    building), so this falls back to bidirectional A* while the table for
+    this snapshot is missing or still being rebuilt, or when an endpoint
+    is not a building. While path overrides are active the
+    base snapshot's table answers every pair whose route avoids the
+    overridden paths; only the others are searched.
+
+    Returns:
+        tuple: (path node ids or None, total distance, settled node count)
+    """
+    table = route_table_cache.peek(base_graph(graph))
+    if table is not None and table.covers(source, target):
+        path, distance = table.route(source, target)
+        if avoids_overrides(graph, path):
+            return path, distance, 0
+    return bidirectional_astar(graph, source, target)
+
+
+register_algorithm('table', table_route)
@@ -0,0 +1,224 @@
+"""
+Tour Planning
+Visiting order for a set of stops over the routing distance matrix
+"""
+
+import time
+from routing.search import INF, find_path, one_to_many
+from routing.table import route_table_cache
+
+# Largest stop count solved exactly (Held-Karp is O(2^n * n^2))
+EXACT_MAX_STOPS = 11
+
+
+def stop_matrix(graph, nodes):
+    """
+    Directed distance matrix between stops
+
+    Read from the building route table when it is already built; otherwise
+    one one-to-many search per stop, in-process (a request is capped at
+    TOUR_MAX_STOPS, far too few for a process pool to pay off).
+
+    Args:
+        graph (RoutingGraph): CSR graph snapshot
+        nodes (list): Dense ids of the stops
+
+    Returns:
+        list: Rows of distances (inf when unreachable)
+    """
+    table = route_table_cache.peek(graph)
+    if table is not None and all(node in table.rows for node in nodes):
+        return [[table.distance(source, target) for target in nodes] for source in nodes]
+
+    return [one_to_many(graph, source, nodes)[0] for source in nodes]
+
+
+def tour_cost(matrix, order, round_trip=False):
+    """Total distance of visiting stops in order"""
+    cost = sum(matrix[a][b] for a, b in zip(order, order[1:]))
+    if round_trip and len(order) > 1:
+        cost += matrix[order[-1]][order[0]]
+    return cost
+
+
+def solve_exact(matrix, round_trip=False):
+    """
+    Held-Karp dynamic programme over subsets of the stops after the first
+
+    Returns:
+        list: Optimal visiting order starting at stop 0
+    """
+    count = len(matrix)
+    if count <= 2:
+        return list(range(count))
+
+    rest = count - 1
+    full = (1 << rest) - 1
+    # best[mask * rest + j]: cheapest walk from stop 0 through mask ending at stop j + 1
+    best = [INF] * ((1 << rest) * rest)
+    parent = [-1] * ((1 << rest) * rest)
+    for j in range(rest):
+        best[(1 << j) * rest + j] = matrix[0][j + 1]
+
+    for mask in range(1, full + 1):
+        base = mask * rest
+        for j in range(rest):
+            cost = best[base + j]
+            if cost == INF or not mask & (1 << j):
+                continue
+            row = matrix[j + 1]
+            for k in range(rest):
+                if mask & (1 << k):
+                    continue
+                slot = (mask | (1 << k)) * rest + k
+                new_cost = cost + row[k + 1]
+                if new_cost < best[slot]:
+                    best[slot] = new_cost
+                    parent[slot] = j
+
+    base = full * rest
+    closing = [matrix[j + 1][0] if round_trip else 0.0 for j in range(rest)]
+    last = min(range(rest), key=lambda j: best[base + j] + closing[j])
+
+    order = []
+    mask = full
+    while last != -1:
+        order.append(last + 1)
+        previous = parent[mask * rest + last]
+        mask &= ~(1 << last)
+        last = previous
+    order.append(0)
+    order.reverse()
+    return order
+
+
+def nearest_neighbour(matrix):
+    """Greedy order: always walk to the closest unvisited stop"""
+    order = [0]
+    unvisited = set(range(1, len(matrix)))
+    while unvisited:
+        row = matrix[order[-1]]
+        stop = min(unvisited, key=lambda j: (row[j], j))
+        order.append(stop)
+        unvisited.remove(stop)
+    return order
+
+
+def improve(matrix, order, round_trip=False):
+    """
+    Local search with 2-opt and Or-opt moves until no move helps
+
+    The matrix is directed, so moves are scored by recomputing the tour
+    cost rather than by the symmetric 2-opt delta. Stop 0 stays first.
+    """
+    best_cost = tour_cost(matrix, order, round_trip)
+    count = len(order)
+    improved = True
+
+    while improved:
+        improved = False
+
+        # 2-opt: reverse order[i:j]
+        for i in range(1, count - 1):
+            for j in range(i + 2, count + 1):
+                candidate = order[:i] + order[i:j][::-1] + order[j:]
+                cost = tour_cost(matrix, candidate, round_trip)
+                if cost < best_cost:
+                    order, best_cost, improved = candidate, cost, True
+
+        # Or-opt: move a run of 1-3 stops elsewhere
+        for length in (1, 2, 3):
+            for i in range(1, count - length + 1):
+                segment = order[i:i + length]
+                remainder = order[:i] + order[i + length:]
+                for j in range(1, len(remainder) + 1):
+                    if j == i:
+                        continue
+                    candidate = remainder[:j] + segment + remainder[j:]
+                    cost = tour_cost(matrix, candidate, round_trip)
+                    if cost < best_cost:
+                        order, best_cost, improved = candidate, cost, True
+                        break
+
+    return order
+
+
+def solve_tour(matrix, round_trip=False):
+    """
+    Visiting order starting at stop 0
+
+    Exact for up to EXACT_MAX_STOPS stops, otherwise nearest neighbour
+    refined by 2-opt and Or-opt.
+
+    Returns:
+        tuple: (order as matrix indexes, total distance, method name)
+    """
+    if len(matrix) <= EXACT_MAX_STOPS:
+        order, method = solve_exact(matrix, round_trip), 'exact'
+    else:
+        order, method = improve(matrix, nearest_neighbour(matrix), round_trip), 'heuristic'
+    return order, tour_cost(matrix, order, round_trip), method
+
+
+def stitch_route(graph, stops):
+    """
+    Full node path visiting stops in order
+
+    Legs come from the route table when it is built, otherwise from
+    bidirectional A*.
+
+    Returns:
+        list: Dense node ids, or None if a leg is unreachable
+    """
+    table = route_table_cache.peek(graph)
+    path = [stops[0]]
+    for source, target in zip(stops, stops[1:]):
+        if source == target:
+            continue
+        if table is not None and table.covers(source, target):
+            leg, _ = table.route(source, target)
+        else:
+            leg, _, _ = find_path(graph, source, target, 'bidirectional_astar')
+        if leg is None:
+            return None
+        path.extend(leg[1:])
+    return path
+
+
+def plan_tour(graph, nodes, round_trip=False):
+    """
+    Order stops and stitch the walking route through them
+
+    Args:
+        graph (RoutingGraph): CSR graph snapshot
+        nodes (list): Dense ids of the stops, the first one is the start
+        round_trip (bool): Return to the first stop at the end
+
+    Returns:
+        dict: order (stop nodes), path, cost, method and timings, or None
+            if some stop cannot be reached
+    """
+    started = time.perf_counter()
+    matrix = stop_matrix(graph, nodes)
+    matrix_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    order, cost, method = solve_tour(matrix, round_trip)
+    solve_seconds = time.perf_counter() - started
+    if cost == INF:
+        return None
+
+    stops = [nodes[i] for i in order]
+    path = stitch_route(graph, stops + stops[:1] if round_trip else stops)
+    if path is None:
+        return None
+
+    return {
+        'order': stops,
+        'path': path,
+        'cost': cost,
+        'legs': [matrix[a][b] for a, b in zip(order, order[1:] + (order[:1] if round_trip else []))],
+        'method': method,
+        'matrix_ms': round(matrix_seconds * 1000, 2),
+        'solve_ms': round(solve_seconds * 1000, 2)
+    }
@@ -0,0 +1,98 @@
+"""
+Graph Version Tracking
+Bumps the shared graph version whenever routing tables change
+"""
+
+from datetime import datetime
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from extensions import db
+from models.building import Building
+from models.waypoint import Waypoint
+from models.path import Path
+from models.graph_version import GraphVersion
+
+# Models whose rows make up the routing graph
+GRAPH_MODELS = (Building, Waypoint, Path)
+
+GRAPH_VERSION_ROW_ID = 1
+OVERLAY_VERSION_ROW_ID = 2
+
+
+def get_graph_version():
+    """Return the current graph version (0 if it was never bumped)"""
+    version = db.session.execute(
+        select(GraphVersion.version).where(GraphVersion.id == GRAPH_VERSION_ROW_ID)
+    ).scalar()
+    return version or 0
+
+
+def get_graph_versions():
+    """Return (graph version, path overlay version) in one query (0 if never bumped)"""
+    versions = dict(db.session.execute(
+        select(GraphVersion.id, GraphVersion.version)
+        .where(GraphVersion.id.in_((GRAPH_VERSION_ROW_ID, OVERLAY_VERSION_ROW_ID)))
+    ).all())
+    return versions.get(GRAPH_VERSION_ROW_ID) or 0, versions.get(OVERLAY_VERSION_ROW_ID) or 0
+
+
+def _bump(connection, row_id=GRAPH_VERSION_ROW_ID):
+    """Increment a version row on the given connection"""
+    table = GraphVersion.__table__
+    result = connection.execute(
+        table.update()
+        .where(table.c.id == row_id)
+        .values(version=table.c.version + 1, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        connection.execute(
+            table.insert().values(id=row_id, version=1, updated_at=datetime.utcnow())
+        )
+
+
+def bump_graph_version(session=None):
+    """
+    Mark the routing graph as changed
+
+    Needed after bulk operations (bulk_save_objects, raw SQL) that bypass
+    the ORM events below. The bump joins the session's transaction, so it
+    becomes visible together with the data change on commit.
+    """
+    session = session or db.session
+    _bump(session.connection())
+
+
+def bump_overlay_version(session=None):
+    """
+    Mark the path overlay (closures and re-weights) as changed
+
+    Workers then patch their cached graph instead of rebuilding it.
+    """
+    session = session or db.session
+    _bump(session.connection(), OVERLAY_VERSION_ROW_ID)
+
+
+def _touches_graph(objects):
+    return any(isinstance(obj, GRAPH_MODELS) for obj in objects)
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_on_flush(session, flush_context):
+    """Bump the version when graph rows are inserted, updated or deleted"""
+    changed = (
+        _touches_graph(session.new)
+        or _touches_graph(session.deleted)
+        or any(isinstance(obj, GRAPH_MODELS) and session.is_modified(obj) for obj in session.dirty)
+    )
+    if changed:
+        _bump(session.connection())
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_on_bulk_statement(orm_execute_state):
+    """Bump the version for Query.delete()/update() on graph models"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ in GRAPH_MODELS:
+        _bump(orm_execute_state.session.connection())
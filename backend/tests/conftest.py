@@ -0,0 +1,85 @@
+"""
+Test configuration
+Makes the backend modules importable when pytest runs from the repository root
+and provides a navigation API client over a throwaway SQLite campus
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def campus_client(tmp_path):
+    """
+    Factory for an admin-session test client of the navigation API
+
+    Call it with building rows (building_id, name, code, lat, lng),
+    waypoint rows (waypoint_id, name, code, lat, lng) and path rows
+    (path_id, source, destination, distance, path_type) where source and
+    destination are 'B<id>' / 'W<id>' keys; keyword arguments override
+    app config values. The process-wide graph and route caches are reset
+    so every test starts from its own campus.
+    """
+    from flask import Flask
+    from config import TestingConfig
+    from extensions import db
+    import models  # noqa: F401 - registers every table for create_all
+    from models.building import Building
+    from models.path import Path
+    from models.waypoint import Waypoint
+    from routes.navigation import navigation_bp, route_cache
+    from routing.cache import graph_cache
+
+    apps = []
+
+    def endpoint(key):
+        node_id = int(key[1:])
+        return (node_id, None) if key[0] == 'B' else (None, node_id)
+
+    def make(buildings, paths, waypoints=(), **config):
+        app = Flask(__name__)
+        app.config.from_object(TestingConfig)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'campus.db'}"
+        app.config.update(config)
+        db.init_app(app)
+        app.register_blueprint(navigation_bp)
+
+        with app.app_context():
+            db.create_all()
+            for building_id, name, code, lat, lng in buildings:
+                db.session.add(Building(building_id=building_id, name=name, code=code,
+                                        latitude=lat, longitude=lng))
+            for waypoint_id, name, code, lat, lng in waypoints:
+                db.session.add(Waypoint(waypoint_id=waypoint_id, name=name, code=code, latitude=lat,
+                                        longitude=lng, waypoint_type='intersection'))
+            for path_id, source, destination, distance, path_type in paths:
+                source_building, source_waypoint = endpoint(source)
+                destination_building, destination_waypoint = endpoint(destination)
+                db.session.add(Path(path_id=path_id, source_building_id=source_building,
+                                    source_waypoint_id=source_waypoint,
+                                    destination_building_id=destination_building,
+                                    destination_waypoint_id=destination_waypoint,
+                                    distance=distance, path_type=path_type, accessibility=True))
+            db.session.commit()
+
+        graph_cache.invalidate()
+        route_cache.clear()
+        apps.append(app)
+
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = 1
+            session['user_role'] = 'admin'
+        return client
+
+    yield make
+
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+    graph_cache.invalidate()
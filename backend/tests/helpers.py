@@ -0,0 +1,36 @@
+"""
+Test Helpers
+Small hand-made campuses shared by the routing tests
+"""
+
+from routing.graph import RoutingGraph
+
+
+def grid_campus(side=6):
+    """
+    side x side grid of buildings about 100 m apart, linked both ways
+
+    Returns:
+        tuple: (building rows, path rows) in the campus_client format
+    """
+    buildings = [(row * side + col + 1, f'Building {row}-{col}', f'G{row}{col}',
+                  12.9630 + row * 0.0009, 77.5050 + col * 0.0009)
+                 for row in range(side) for col in range(side)]
+    paths = []
+    for row in range(side):
+        for col in range(side):
+            here = row * side + col + 1
+            for there in ((here + 1) if col + 1 < side else None, (here + side) if row + 1 < side else None):
+                if there is not None:
+                    distance = 100.0 + (here * 7 + there) % 13
+                    paths.append((len(paths) + 1, f'B{here}', f'B{there}', distance, 'walkway'))
+                    paths.append((len(paths) + 1, f'B{there}', f'B{here}', distance, 'walkway'))
+    return buildings, paths
+
+
+def grid_graph(side=6):
+    """In-memory RoutingGraph of grid_campus"""
+    buildings, paths = grid_campus(side)
+    rows = [(int(source[1:]), None, int(destination[1:]), None, distance, path_id, path_type, True)
+            for path_id, source, destination, distance, path_type in paths]
+    return RoutingGraph.from_rows(1, buildings, [], rows)
@@ -0,0 +1,74 @@
+"""
+Alternative Routes Tests
+Location: backend/tests/test_alternatives.py
+"""
+
+from routing.alternatives import alternative_routes, overlap_ratio
+from routing.search import dijkstra
+from tests.helpers import grid_campus, grid_graph
+
+
+def assert_loopless_and_distinct(graph, paths):
+    edge_lists = [tuple(graph.path_edges(path)) for path in paths]
+    for path in paths:
+        assert len(set(path)) == len(path)
+    assert len(set(edge_lists)) == len(edge_lists)
+
+
+def test_routes_are_loopless_distinct_and_shortest_first():
+    graph = grid_graph()
+    source, target = graph.building_node(1), graph.building_node(36)
+
+    routes, stats = alternative_routes(graph, source, target, k=4, max_overlap=0.7)
+
+    assert len(routes) == 4
+    paths = [path for path, _ in routes]
+    assert_loopless_and_distinct(graph, paths)
+    assert all(path[0] == source and path[-1] == target for path in paths)
+    assert routes[0][1] == dijkstra(graph, source, target)[0][target]
+    assert all(cost >= routes[0][1] for _, cost in routes[1:])
+
+
+def test_alternatives_respect_overlap_limit():
+    graph = grid_graph()
+    source, target = graph.building_node(1), graph.building_node(36)
+
+    routes, _ = alternative_routes(graph, source, target, k=4, max_overlap=0.5)
+
+    shortest_edges = graph.path_edges(routes[0][0])
+    for path, _ in routes[1:]:
+        assert overlap_ratio(graph, graph.path_edges(path), [(None, None, shortest_edges)]) <= 0.5
+
+
+def test_spur_search_cap_bounds_the_query():
+    graph = grid_graph()
+    source, target = graph.building_node(1), graph.building_node(36)
+
+    routes, stats = alternative_routes(graph, source, target, k=4, max_overlap=0.1, max_spur_searches=3)
+
+    assert stats['spur_searches'] + stats['penalty_searches'] <= 3
+    assert_loopless_and_distinct(graph, [path for path, _ in routes])
+
+
+def test_route_endpoint_returns_distinct_alternatives(campus_client):
+    client = campus_client(*grid_campus())
+
+    response = client.post('/api/navigation/route', json={'start_building_id': 1, 'end_building_id': 36,
+                                                          'alternatives': 2})
+
+    assert response.status_code == 200
+    data = response.get_json()
+    routes = [data['route']] + [alternative['route'] for alternative in data['alternatives']]
+    assert len(routes) == 3
+    keys = [tuple(step['id'] for step in route) for route in routes]
+    assert all(len(set(key)) == len(key) for key in keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_route_endpoint_rejects_boolean_alternatives(campus_client):
+    client = campus_client(*grid_campus())
+
+    for value in (True, False, -1, 4, 'two'):
+        response = client.post('/api/navigation/route', json={'start_building_id': 1, 'end_building_id': 36,
+                                                              'alternatives': value})
+        assert response.status_code == 400, value
@@ -0,0 +1,38 @@
+"""
+Contraction Hierarchy Routing Tests
+Location: backend/tests/test_ch.py
+"""
+
+import time
+from routing.ch import ch_route, hierarchy_cache
+from routing.search import dijkstra
+from tests.helpers import grid_graph
+
+
+def wait_until_ready(graph, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while hierarchy_cache.state(graph) != 'ready' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return hierarchy_cache.state(graph)
+
+
+def test_ch_request_falls_back_without_building():
+    graph = grid_graph()
+    source, target = graph.building_node(1), graph.building_node(36)
+
+    path, distance, _ = ch_route(graph, source, target)
+
+    assert distance == dijkstra(graph, source, target)[0][target]
+    assert path[0] == source and path[-1] == target
+    assert hierarchy_cache.state(graph) in ('missing', 'stale')
+
+
+def test_background_build_serves_ch_queries():
+    graph = grid_graph()
+    hierarchy_cache.build_in_background(graph)
+
+    assert wait_until_ready(graph) == 'ready'
+    for source, target in ((1, 36), (6, 31), (14, 23)):
+        source, target = graph.building_node(source), graph.building_node(target)
+        _, distance, _ = ch_route(graph, source, target)
+        assert abs(distance - dijkstra(graph, source, target)[0][target]) < 1e-9
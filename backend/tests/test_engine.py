@@ -0,0 +1,81 @@
+"""
+Routing Engine Tests
+Location: backend/tests/test_engine.py
+
+Checks the unified RoutingEngine (and the utils.algorithms wrapper now
+built on it) against the building-to-building Dijkstra that
+utils.algorithms used to run over the raw path rows.
+"""
+
+import heapq
+import pytest
+from routing.engine import RoutingEngine
+from routing.search import ALGORITHMS
+from tests.helpers import grid_campus
+from utils.algorithms import dijkstra_shortest_path
+
+PAIRS = [(1, 36), (6, 31), (14, 23), (2, 2), (36, 1), (8, 29)]
+
+
+def legacy_shortest_path(paths, start, end):
+    """Distance found by the former utils.algorithms search (every path walkable both ways)"""
+    graph = {}
+    for _, source, destination, distance, _ in paths:
+        source, destination = int(source[1:]), int(destination[1:])
+        graph.setdefault(source, []).append((destination, distance))
+        graph.setdefault(destination, []).append((source, distance))
+    if start not in graph or end not in graph:
+        return None
+
+    distances = {start: 0.0}
+    pq = [(0.0, start)]
+    done = set()
+    while pq:
+        distance, node = heapq.heappop(pq)
+        if node in done:
+            continue
+        done.add(node)
+        if node == end:
+            return distance
+        for neighbor, weight in graph[node]:
+            if distance + weight < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance + weight
+                heapq.heappush(pq, (distance + weight, neighbor))
+    return None
+
+
+@pytest.fixture
+def campus(campus_client):
+    buildings, paths = grid_campus()
+    client = campus_client(buildings, paths)
+    with client.application.app_context():
+        yield paths
+
+
+def walked(paths, building_ids):
+    lengths = {(int(source[1:]), int(destination[1:])): distance
+               for _, source, destination, distance, _ in paths}
+    return sum(lengths[hop] for hop in zip(building_ids, building_ids[1:]))
+
+
+def test_wrapper_matches_legacy_distances(campus):
+    for start, end in PAIRS:
+        building_ids, distance = dijkstra_shortest_path(start, end)
+        assert distance == pytest.approx(legacy_shortest_path(campus, start, end))
+        assert building_ids[0] == start and building_ids[-1] == end
+        assert walked(campus, building_ids) == pytest.approx(distance)
+
+
+def test_every_algorithm_matches_legacy(campus):
+    engine = RoutingEngine.current()
+    for algorithm in ALGORITHMS:
+        for start, end in PAIRS:
+            path, distance, _ = engine.route_buildings(start, end, algorithm)
+            assert distance == pytest.approx(legacy_shortest_path(campus, start, end)), algorithm
+            assert engine.buildings_on(path)[-1] == end
+
+
+def test_unknown_building_has_no_route(campus):
+    assert dijkstra_shortest_path(1, 999) == (None, None)
+    path, _, _ = RoutingEngine.current().route_buildings(999, 1)
+    assert path is None
@@ -0,0 +1,65 @@
+"""
+Facility Index Tests
+Location: backend/tests/test_facilities.py
+"""
+
+from routing.facilities import FacilityIndex, nearest_targets
+from routing.graph import RoutingGraph
+
+
+def build_graph():
+    """Start building with a library 309 m away and a canteen 302 m away"""
+    buildings = [(1, 'Main Block', 'MAIN', 12.9630, 77.5050),
+                 (2, 'Library', 'LIB', 12.9650, 77.5050),
+                 (3, 'Canteen', 'CAN', 12.9610, 77.5050)]
+    paths = [(1, None, 2, None, 309.0), (2, None, 1, None, 309.0),
+             (1, None, 3, None, 302.0), (3, None, 1, None, 302.0)]
+    return RoutingGraph.from_rows(1, buildings, [], paths)
+
+
+def build_index(graph):
+    node = graph.building_node
+    facilities = {'restroom': [node(2)], 'restrooms': [node(3)], 'food court': [node(3)]}
+    return FacilityIndex(graph, facilities, gates=[])
+
+
+def test_singular_and_plural_tags_both_match():
+    graph = build_graph()
+    index = build_index(graph)
+    expected = sorted([graph.building_node(2), graph.building_node(3)])
+
+    assert index.buildings_with('restroom') == expected
+    assert index.buildings_with('Restrooms') == expected
+    assert index.buildings_with('  RESTROOM ') == expected
+
+
+def test_nearest_restroom_considers_plural_tag():
+    graph = build_graph()
+    index = build_index(graph)
+
+    hits, _ = nearest_targets(graph, graph.building_node(1), index.buildings_with('restroom'))
+
+    node, distance, _ = hits[0]
+    assert node == graph.building_node(3)
+    assert distance == 302.0
+
+
+def test_substring_match_and_miss():
+    graph = build_graph()
+    index = build_index(graph)
+
+    assert index.buildings_with('food') == [graph.building_node(3)]
+    assert index.buildings_with('gym') == []
+
+
+def test_query_matches_whole_words_only():
+    graph = build_graph()
+    node = graph.building_node
+    index = FacilityIndex(graph, {'gateway': [node(1)], 'label printer': [node(2)], 'lab': [node(3)],
+                                  'main gate': [node(3)]}, gates=[])
+
+    assert index.buildings_with('gate') == [node(3)]
+    assert index.buildings_with('lab') == [node(3)]
+    assert index.buildings_with('label') == [node(2)]
+    assert index.buildings_with('court') == []
+    assert index.buildings_with('main gates') == [node(3)]
@@ -0,0 +1,46 @@
+"""
+Isochrone Tests
+Location: backend/tests/test_isochrone.py
+"""
+
+BUILDINGS = [(1, 'Main Block', 'MAIN', 12.9630, 77.5050),
+             (2, 'Library', 'LIB', 12.9648, 77.5050),
+             (3, 'Canteen', 'CAN', 12.9612, 77.5050)]
+
+# 200 m each way: stairs walk at half speed (about 4.8 minutes), the walkway in about 2.4
+PATHS = [(1, 'B1', 'B2', 200.0, 'stairs'), (2, 'B2', 'B1', 200.0, 'stairs'),
+         (3, 'B1', 'B3', 200.0, 'walkway'), (4, 'B3', 'B1', 200.0, 'walkway')]
+
+
+def reached(response):
+    return {building['name']: building for building in response.get_json()['buildings']}
+
+
+def test_minutes_cutoff_uses_travel_time(campus_client):
+    client = campus_client(BUILDINGS, PATHS)
+
+    response = client.get('/api/navigation/isochrone?building_id=1&minutes=3')
+
+    assert response.status_code == 200
+    buildings = reached(response)
+    assert 'Library' not in buildings
+    assert buildings['Canteen']['time_minutes'] == 2.4
+    assert all(building['time_minutes'] <= 3 for building in buildings.values())
+
+
+def test_minutes_cutoff_includes_slow_path_once_long_enough(campus_client):
+    client = campus_client(BUILDINGS, PATHS)
+
+    buildings = reached(client.get('/api/navigation/isochrone?building_id=1&minutes=5'))
+
+    assert buildings['Library']['time_minutes'] == 4.8
+    assert buildings['Library']['distance'] == 200.0
+
+
+def test_distance_cutoff_reports_summed_times(campus_client):
+    client = campus_client(BUILDINGS, PATHS)
+
+    buildings = reached(client.get('/api/navigation/isochrone?building_id=1&max_distance=250'))
+
+    assert buildings['Library']['distance'] == 200.0
+    assert buildings['Library']['time_minutes'] == 4.8
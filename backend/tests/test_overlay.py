@@ -0,0 +1,116 @@
+"""
+Path Overlay Tests
+Location: backend/tests/test_overlay.py
+"""
+
+from datetime import datetime
+import pytest
+from routing.overlay import Overlay, parse_edit
+from routing.search import INF
+
+BUILDINGS = [(1, 'Main Block', 'MAIN', 12.9630, 77.5050),
+             (2, 'Library', 'LIB', 12.9648, 77.5050),
+             (3, 'Canteen', 'CAN', 12.9612, 77.5050),
+             (4, 'Hostel', 'HOS', 12.9630, 77.5080),
+             (5, 'Gym', 'GYM', 12.9648, 77.5080)]
+
+# Main -> Library is direct over paths 1/2 (100 m) or 160 m through the Canteen;
+# Hostel -> Gym never goes near either
+PATHS = [(1, 'B1', 'B2', 100.0, 'walkway'), (2, 'B2', 'B1', 100.0, 'walkway'),
+         (3, 'B1', 'B3', 80.0, 'walkway'), (4, 'B3', 'B1', 80.0, 'walkway'),
+         (5, 'B3', 'B2', 80.0, 'walkway'), (6, 'B2', 'B3', 80.0, 'walkway'),
+         (7, 'B4', 'B5', 120.0, 'walkway'), (8, 'B5', 'B4', 120.0, 'walkway'),
+         (9, 'B1', 'B4', 300.0, 'walkway'), (10, 'B4', 'B1', 300.0, 'walkway')]
+
+
+def route(client, start, end):
+    """X-Route-Cache header, path ids walked and body of a GET /route"""
+    response = client.get(f'/api/navigation/route?from={start}&to={end}')
+    assert response.status_code == 200
+    body = response.get_json()
+    path_ids = [segment['path_id'] for segment in body['route'] if segment['path_id'] is not None]
+    return response.headers['X-Route-Cache'], path_ids, body
+
+
+def test_closing_a_path_only_drops_routes_using_it(campus_client):
+    client = campus_client(BUILDINGS, PATHS)
+    _, direct, original = route(client, 1, 2)
+    assert direct == [1]
+    route(client, 4, 5)
+    assert route(client, 1, 2)[0] == 'HIT'
+
+    response = client.put('/api/navigation/paths/1/override', json={'action': 'close'})
+    assert response.status_code == 200
+
+    cache, detour, body = route(client, 1, 2)
+    assert cache == 'MISS'
+    assert detour == [3, 5]
+    assert body['total_distance'] == 160.0
+    # The unrelated route was re-stamped for the new overlay instead of recomputed
+    cache, unrelated, _ = route(client, 4, 5)
+    assert cache == 'HIT'
+    assert unrelated == [7]
+
+    assert client.delete('/api/navigation/paths/1/override').status_code == 200
+
+    cache, reopened, body = route(client, 1, 2)
+    assert cache == 'MISS'
+    assert reopened == [1]
+    assert body['total_distance'] == original['total_distance']
+
+
+def test_batch_edit_lands_as_one_overlay_change(campus_client):
+    client = campus_client(BUILDINGS, PATHS)
+    route(client, 1, 2)
+    route(client, 4, 5)
+
+    response = client.post('/api/navigation/paths/overrides', json={'edits': [
+        {'path_id': 3, 'action': 'close'},
+        {'path_id': 7, 'action': 'reweight', 'weight_factor': 2.0},
+        {'path_id': 3, 'action': 'reweight', 'weight_factor': 3.0}
+    ]})
+    assert response.status_code == 200
+    assert {override['path_id'] for override in response.get_json()['overrides']} == {3, 7}
+
+    overrides = client.get('/api/navigation/paths/overrides').get_json()['overrides']
+    assert {override['path_id']: override['closed'] for override in overrides} == {3: False, 7: False}
+    # Path 3 is not on the cached Main -> Library route, path 7 is on Hostel -> Gym
+    assert route(client, 1, 2)[0] == 'HIT'
+    cache, unrelated, _ = route(client, 4, 5)
+    assert cache == 'MISS'
+    assert unrelated == [7]
+
+
+def test_batch_edit_rejects_unknown_paths_atomically(campus_client):
+    client = campus_client(BUILDINGS, PATHS)
+
+    response = client.post('/api/navigation/paths/overrides', json={'edits': [
+        {'path_id': 1, 'action': 'close'}, {'path_id': 99, 'action': 'close'}
+    ]})
+
+    assert response.status_code == 404
+    assert response.get_json()['path_ids'] == [99]
+    assert client.get('/api/navigation/paths/overrides').get_json()['overrides'] == []
+
+
+def test_fingerprint_follows_active_factors():
+    now = datetime.utcnow()
+    closed = Overlay(1, [(1, True, 1.0, None)], now)
+
+    assert Overlay(1, [], now).fingerprint is None
+    assert closed.factors == {1: INF}
+    assert Overlay(2, [(1, True, 1.0, None)], now).fingerprint == closed.fingerprint
+    assert Overlay(2, [(1, False, 2.0, None)], now).fingerprint != closed.fingerprint
+    assert Overlay(3, [(1, False, 2.0, None)], now).changes(closed) == (set(), True)
+    assert closed.changes(Overlay(0, [], now)) == ({1}, False)
+
+
+@pytest.mark.parametrize('edit', [
+    {'path_id': 1, 'action': 'reweight', 'weight_factor': 0.5},
+    {'path_id': 1, 'action': 'reweight', 'weight_factor': True},
+    {'path_id': True, 'action': 'close'},
+    {'path_id': 1, 'action': 'demolish'}
+])
+def test_malformed_edits_are_rejected(edit):
+    with pytest.raises(ValueError):
+        parse_edit(edit, datetime.utcnow())
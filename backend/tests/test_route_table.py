@@ -0,0 +1,59 @@
+"""
+Route Table Rebuild Tests
+Location: backend/tests/test_route_table.py
+"""
+
+import time
+from extensions import db
+from models.path import Path
+
+BUILDINGS = [(1, 'Main Block', 'MAIN', 12.9630, 77.5050),
+             (2, 'Library', 'LIB', 12.9648, 77.5050),
+             (3, 'Canteen', 'CAN', 12.9612, 77.5050)]
+
+PATHS = [(1, 'B1', 'B2', 200.0, 'walkway'), (2, 'B2', 'B1', 200.0, 'walkway'),
+         (3, 'B1', 'B3', 200.0, 'walkway'), (4, 'B3', 'B1', 200.0, 'walkway')]
+
+
+def table_status(client, timeout=10.0):
+    """Route table part of /status once its build has settled"""
+    deadline = time.monotonic() + timeout
+    while True:
+        status = client.get('/api/navigation/status').get_json()
+        table = status['route_table']
+        if table['state'] != 'building' or time.monotonic() > deadline:
+            return status['graph']['version'], table
+        time.sleep(0.01)
+
+
+def test_table_is_rebuilt_after_graph_change(campus_client):
+    client = campus_client(BUILDINGS, PATHS, ROUTE_TABLE_WARM_ON_START=True)
+
+    version, table = table_status(client)
+    assert table['state'] == 'ready'
+    assert table['version'] == version
+
+    with client.application.app_context():
+        db.session.add(Path(path_id=5, source_building_id=2, destination_building_id=3,
+                            distance=150.0, path_type='walkway', accessibility=True))
+        db.session.commit()
+
+    new_version, table = table_status(client)
+    assert new_version > version
+    assert table['state'] == 'ready'
+    assert table['version'] == new_version
+
+    response = client.post('/api/navigation/route', json={'start_building_id': 2, 'end_building_id': 3,
+                                                          'algorithm': 'table'})
+    assert response.get_json()['total_distance'] == 150.0
+
+    metrics = client.get('/api/navigation/metrics').get_json()
+    assert metrics['precomputed']['route_table'] == 'ready'
+
+
+def test_table_reported_missing_when_not_opted_in(campus_client):
+    client = campus_client(BUILDINGS, PATHS)
+
+    _, table = table_status(client)
+
+    assert table == {'state': 'missing'} or table['state'] == 'stale'
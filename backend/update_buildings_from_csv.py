@@ -121,7 +121,7 @@ def update_buildings(buildings_data):
                 longitude=data['longitude'],
                 code=None,
                 floor_count=1,
-                facilities=None,
+                facilities=['Gate'] if data['type'] == 'gate' else None,
                 image_url=None
             )
             new_buildings.append(building)